@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Streaming anomaly sink for run.py.
+Writes each row's anomaly record to disk as soon as the row is finished,
+so memory use does not grow with the number of flagged rows.
+"""
+
+import json
+
+ANOMALY_FORMATS = ("json", "ndjson")
+
+
+class AnomalyWriter:
+    """
+    Incremental writer for anomaly records.
+
+    Formats
+    -------
+    json : a single JSON array, byte-identical to json.dump(records, f, indent=2)
+    ndjson : one compact JSON object per line
+
+    `path` may also be an open text stream (e.g. a pipe on another fd);
+    close() then finishes the output and flushes it without closing it.
+    """
+
+    def __init__(self, path, fmt="json"):
+        if fmt not in ANOMALY_FORMATS:
+            raise ValueError(f"Unknown anomaly format: {fmt}")
+        self.fmt = fmt
+        self.count = 0
+        self._owned = not hasattr(path, "write")
+        self._f = open(path, "w") if self._owned else path
+        self._closed = False
+
+    def write(self, record):
+        if self.fmt == "ndjson":
+            self._f.write(json.dumps(record, separators=(",", ":")))
+            self._f.write("\n")
+        else:
+            # Nest the record one level inside the array, as json.dump would
+            text = json.dumps(record, indent=2).replace("\n", "\n  ")
+            self._f.write("[\n  " if self.count == 0 else ",\n  ")
+            self._f.write(text)
+        self.count += 1
+
+    def flush(self):
+        self._f.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self.fmt == "json":
+            self._f.write("\n]" if self.count else "[]")
+        if self._owned:
+            self._f.close()
+        else:
+            self._f.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
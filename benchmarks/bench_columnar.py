@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: columnar NumPy ip/mac validation vs the scalar validators.
+Uses a mix of clean, padded, malformed and empty values, checks both paths
+agree on every value, and reports values/sec for each.
+
+Usage: python benchmarks/bench_columnar.py [--values N] [--bad-rate F]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from columnar_validation import _mac_scalar, ipv4_validate_batch, mac_validate_batch, np  # noqa: E402
+from run_ipv4_validation import ipv4_parse  # noqa: E402
+
+BAD_IPS = ["999.1.1.1", "10.0.0", "10..0.1", "fe80::1", "10.0.0.-1", "1.2.3.++4", "abc", ""]
+BAD_MACS = ["AA:BB:CC", "aa-bb:cc-dd-ee-ff", "GG:HH:II:JJ:KK:LL", "", "001122334455667788"]
+
+
+def build_values(n, bad_rate, seed=0):
+    rng = random.Random(seed)
+    ips, macs = [], []
+    for _ in range(n):
+        if rng.random() < bad_rate:
+            ips.append(rng.choice(BAD_IPS))
+            macs.append(rng.choice(BAD_MACS))
+            continue
+        ip = ".".join(str(rng.randint(0, 255)) for _ in range(4))
+        ips.append(f" {ip} " if rng.random() < 0.1 else ip)
+        octets = [f"{rng.randint(0, 255):02x}" for _ in range(6)]
+        macs.append(rng.choice([":", "-", ""]).join(octets))
+    return ips, macs
+
+
+def timed(fn, values, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(values)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--values", type=int, default=200_000)
+    parser.add_argument("--bad-rate", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if np is None:
+        sys.exit("numpy is not installed; the columnar path falls back to the scalar code")
+
+    ips, macs = build_values(args.values, args.bad_rate)
+    cases = [
+        ("ip", ips, lambda vs: [ipv4_parse(v) for v in vs], ipv4_validate_batch),
+        ("mac", macs, lambda vs: [_mac_scalar(v) for v in vs], mac_validate_batch),
+    ]
+    print(f"values={args.values} bad_rate={args.bad_rate}")
+    print(f"{'field':>5}  {'scalar/sec':>11}  {'columnar/sec':>12}  {'speedup':>7}")
+    for field, values, scalar, columnar in cases:
+        scalar_time, expected = timed(scalar, values, args.repeat)
+        columnar_time, actual = timed(columnar, values, args.repeat)
+        if actual != expected:
+            sys.exit(f"{field}: columnar results differ from the scalar validator")
+        print(f"{field:>5}  {args.values / scalar_time:>11,.0f}  "
+              f"{args.values / columnar_time:>12,.0f}  {scalar_time / columnar_time:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
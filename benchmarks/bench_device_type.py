@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: compiled device_type matcher vs the sequential re.search loop.
+Uses a mix of exact hits, substring/model hits and misses (the misses are
+the values that go on to the LLM path) and checks both agree on every value,
+comparing the legacy step text with the rendered step codes.
+
+Usage: python benchmarks/bench_device_type.py [--values N] [--miss-rate F]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run_device_type_validation import (  # noqa: E402
+    _DEVICE_TYPE_KEYWORDS,
+    deterministic_device_type_parse,
+)
+from step_codes import STEP_SEPARATOR, render_verbose  # noqa: E402
+
+EXACT_HITS = ["server", "Router", "switch", "AP", "fw", "printer", "laptop", "srv", "VM"]
+MODEL_HITS = [
+    "Cisco Catalyst 3850", "Nexus 9300", "Palo Alto PA-220", "HP LaserJet M404",
+    "Polycom VVX 411", "NetApp FAS2750", "F5 BigIP 4000", "MacBook Pro 14",
+    "Aruba AP-515", "edge router 2",
+]
+MISSES = [
+    "iot", "Bob's old machine", "xyzabc123", "thermostat", "badge reader lobby",
+    "Dell PowerEdge R740 rack unit", "ups", "kiosk", "unknown device in closet 3",
+    "raspberry pi", "hvac controller",
+]
+
+
+def legacy_parse(device_raw, notes, steps):
+    """The original per-pattern loop, kept here as the reference."""
+    if device_raw is None or str(device_raw).strip() == "":
+        return ("", "low")
+    value = str(device_raw).strip().lower()
+    steps.append("device_type: lowercased")
+    for pattern, canonical, confidence in _DEVICE_TYPE_KEYWORDS:
+        if re.search(pattern, value, re.IGNORECASE):
+            steps.append(f"device_type: matched pattern '{pattern}' → {canonical}")
+            return (canonical, confidence)
+    return (value, "low")
+
+
+def build_values(count, miss_rate, seed):
+    rng = random.Random(seed)
+    hits = EXACT_HITS + MODEL_HITS
+    return [
+        rng.choice(MISSES) if rng.random() < miss_rate else rng.choice(hits)
+        for _ in range(count)
+    ]
+
+
+def time_parser(parse, values, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            parse(value, "", [])
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--values", type=int, default=100_000)
+    parser.add_argument("--miss-rate", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    values = build_values(args.values, args.miss_rate, args.seed)
+
+    for value in values:
+        legacy_steps, compiled_steps = [], []
+        expected = legacy_parse(value, "", legacy_steps)
+        actual = deterministic_device_type_parse(value, "", compiled_steps)
+        legacy_text = STEP_SEPARATOR.join(legacy_steps)
+        compiled_text = render_verbose(compiled_steps)
+        if (expected, legacy_text) != (actual, compiled_text):
+            raise SystemExit(f"mismatch for {value!r}: {expected} {legacy_text!r} != "
+                             f"{actual} {compiled_text!r}")
+
+    print(f"values={args.values} miss_rate={args.miss_rate}")
+    results = {}
+    for name, parse in (("loop", legacy_parse), ("compiled", deterministic_device_type_parse)):
+        elapsed = time_parser(parse, values, args.repeat)
+        results[name] = elapsed
+        print(f"{name:>9}: {elapsed:.3f}s  {args.values / elapsed:>10.0f} values/sec")
+    print(f"  speedup: {results['loop'] / results['compiled']:.2f}x")
+
+    for name, sample in (("misses only", MISSES), ("hits only", EXACT_HITS + MODEL_HITS)):
+        loop = time_parser(legacy_parse, sample * 1000, args.repeat)
+        compiled = time_parser(deterministic_device_type_parse, sample * 1000, args.repeat)
+        print(f"{name:>12}: {loop / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Measure incremental re-processing with a row manifest.
+Generates a seeded inventory, edits a fraction of its rows (plus a few
+deletions and additions), and times a full run of the edited file against
+an incremental run that reuses the manifest from the original file. LLM
+fallbacks go to the local stub endpoint with injected latency. Both runs
+must produce identical outputs.
+
+Usage: python benchmarks/bench_incremental.py [--rows N] [--change-rate F]
+           [--latency S] [--workers N]
+"""
+
+import argparse
+import csv
+import filecmp
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HERE))
+
+import llm_utils  # noqa: E402
+import run  # noqa: E402
+from generate_inventory import FIELDNAMES, generate_rows  # noqa: E402
+from llm_stub_server import StubLLMServer  # noqa: E402
+from manifest import RowManifest  # noqa: E402
+
+
+def write_rows(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def edit_rows(rows, change_rate, seed=0):
+    """Copy of rows with change_rate of them edited, 0.1% dropped and 0.1% added."""
+    rng = random.Random(seed)
+    rows = [dict(r) for r in rows]
+    for row in rng.sample(rows, int(len(rows) * change_rate)):
+        field = rng.choice(["owner", "site", "ip", "notes"])
+        row[field] = f"{row[field]} changed-{rng.randrange(1000)}"
+    dropped = set(rng.sample(range(len(rows)), len(rows) // 1000))
+    rows = [r for i, r in enumerate(rows) if i not in dropped]
+    for i in range(len(dropped)):
+        rows.append(dict(rng.choice(rows), source_row_id=f"new-{i}"))
+    return rows
+
+
+def timed_run(server, input_csv, out_stem, workers, manifest=None):
+    calls = server.stats["calls"]
+    start = time.perf_counter()
+    summary = run.process(str(input_csv), f"{out_stem}.csv", f"{out_stem}.json",
+                          workers=workers, llm_backend=llm_utils.HTTPBackend(server.url),
+                          manifest=manifest)
+    return time.perf_counter() - start, server.stats["calls"] - calls, summary.get("manifest")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--change-rate", type=float, default=0.02)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="stub endpoint seconds per request (default: 0.05)")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        llm_utils.PROMPTS_MD_PATH = tmp / "prompts.md"
+        original = list(generate_rows(args.rows, seed=0))
+        write_rows(tmp / "day1.csv", original)
+        write_rows(tmp / "day2.csv", edit_rows(original, args.change_rate))
+
+        # One endpoint for every run: the manifest is tied to the backend URL
+        manifest = RowManifest(tmp / "manifest.sqlite")
+        with StubLLMServer(latency=args.latency) as server:
+            cold = timed_run(server, tmp / "day1.csv", tmp / "cold", args.workers, manifest)
+            full = timed_run(server, tmp / "day2.csv", tmp / "full", args.workers)
+            incremental = timed_run(server, tmp / "day2.csv", tmp / "incremental",
+                                    args.workers, manifest)
+        manifest.close()
+        for suffix in (".csv", ".json"):
+            if not filecmp.cmp(tmp / f"full{suffix}", tmp / f"incremental{suffix}",
+                               shallow=False):
+                sys.exit(f"incremental{suffix} differs from the full run")
+
+    print(f"rows={args.rows} change_rate={args.change_rate} latency={args.latency} "
+          f"workers={args.workers}")
+    print(f"{'run':>22}  {'seconds':>8}  {'llm_calls':>9}  {'reused':>7}  {'validated':>9}")
+    for name, (seconds, calls, counts) in (("day 1, manifest cold", cold),
+                                           ("day 2, full", full),
+                                           ("day 2, incremental", incremental)):
+        counts = counts or {"reused": "-", "validated": "-"}
+        print(f"{name:>22}  {seconds:>8.2f}  {calls:>9}  {counts['reused']:>7}  "
+              f"{counts['validated']:>9}")
+    print(f"speedup: {full[0] / incremental[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
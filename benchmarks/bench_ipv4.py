@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: IPv4 subnet/classification/PTR derivation from packed ints
+vs the original string path (split + int for classification, again for the
+subnet, and once more for the PTR). Checks both agree on every address.
+
+Usage: python benchmarks/bench_ipv4.py [--values N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run_ipv4_validation import (  # noqa: E402
+    ipv4_default_subnet,
+    ipv4_parse,
+    ipv4_reverse_ptr,
+    ipv4_validate_and_normalize,
+)
+
+FIRST_OCTETS = [10, 172, 192, 169, 127, 8, 203]
+
+
+def legacy_classify(ip):
+    """The original string-based classify_ipv4_type, kept here as the reference."""
+    o = list(map(int, ip.split(".")))
+    if o[0] == 10:
+        return "private_rfc1918"
+    if o[0] == 172 and 16 <= o[1] <= 31:
+        return "private_rfc1918"
+    if o[0] == 192 and o[1] == 168:
+        return "private_rfc1918"
+    if o[0] == 169 and o[1] == 254:
+        return "link_local_apipa"
+    if o[0] == 127:
+        return "loopback"
+    return "public_or_other"
+
+
+def legacy_derive(raw):
+    valid, ip, _ = ipv4_validate_and_normalize(raw)
+    subnet = ""
+    if legacy_classify(ip) == "private_rfc1918":
+        parts = list(map(int, ip.split(".")))
+        subnet = f"{parts[0]}.{parts[1]}.{parts[2]}.0/24"
+    parts = ip.split(".")
+    ptr = f"{parts[3]}.{parts[2]}.{parts[1]}.{parts[0]}.in-addr.arpa."
+    return subnet, ptr
+
+
+def packed_derive(raw):
+    _, _, _, packed = ipv4_parse(raw)
+    return ipv4_default_subnet(packed), ipv4_reverse_ptr(packed)
+
+
+def build_values(n, seed=0):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(n):
+        first = rng.choice(FIRST_OCTETS)
+        second = rng.choice([16, 31, 168, 254, rng.randint(0, 255)])
+        values.append(f"{first}.{second}.{rng.randint(0, 255)}.{rng.randint(0, 255)}")
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--values", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    values = build_values(args.values)
+    timings = {}
+    outputs = {}
+    for name, derive in (("string", legacy_derive), ("packed", packed_derive)):
+        start = time.perf_counter()
+        outputs[name] = [derive(v) for v in values]
+        timings[name] = time.perf_counter() - start
+    if outputs["string"] != outputs["packed"]:
+        sys.exit("packed derivation differs from the string path")
+
+    print(f"values={args.values}")
+    for name, seconds in timings.items():
+        print(f"{name:>7}: {seconds:6.2f}s  {args.values / seconds:>11,.0f} addresses/sec")
+    print(f"speedup: {timings['string'] / timings['packed']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark fallback throughput: blocking HTTPBackend vs the asyncio client.
+Runs run.process against the local mock endpoint with injected latency and
+errors, on an input with many distinct ambiguous values, and reports wall
+time, requests, retries and failures for each configuration.
+
+Usage: python benchmarks/bench_llm_client.py [--rows N] [--latency S] [--error-rate F]
+"""
+
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import llm_utils  # noqa: E402
+import run  # noqa: E402
+from llm_client import AsyncHTTPBackend  # noqa: E402
+from llm_stub_server import StubLLMServer  # noqa: E402
+
+FIELDNAMES = ["source_row_id", "ip", "hostname", "fqdn", "mac", "owner",
+              "device_type", "site", "notes"]
+
+
+def build_input(path, rows, distinct):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
+        for i in range(rows):
+            k = i % distinct
+            writer.writerow([i + 1, f"10.{k // 65536 % 256}.{k // 256 % 256}.{k % 256}",
+                             f"host-{i}", "", "", f"ops{k}", f"gadget{k}", f"Room {k}?", ""])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--distinct", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--batch-values", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        llm_utils.PROMPTS_MD_PATH = tmp / "prompts.md"
+        input_csv = tmp / "input.csv"
+        build_input(input_csv, args.rows, args.distinct)
+
+        configs = [("blocking", lambda url: llm_utils.HTTPBackend(url))]
+        for in_flight in (1, 4, 16, 64):
+            configs.append((
+                f"async x{in_flight}",
+                lambda url, n=in_flight: AsyncHTTPBackend(url, max_in_flight=n, backoff_base=0.05),
+            ))
+
+        print(f"rows={args.rows} distinct={args.distinct} latency={args.latency}s "
+              f"error_rate={args.error_rate}")
+        print(f"{'backend':>12}  {'seconds':>7}  {'rows/sec':>9}  {'requests':>8}  "
+              f"{'retries':>7}  {'failed':>6}  {'server_max_conc':>15}")
+        for name, make_backend in configs:
+            with StubLLMServer(latency=args.latency, jitter=args.jitter,
+                               error_rate=args.error_rate) as server:
+                backend = make_backend(server.url)
+                start = time.perf_counter()
+                summary = run.process(str(input_csv), str(tmp / "clean.csv"),
+                                      str(tmp / "anomalies.json"), llm_backend=backend,
+                                      llm_batch_values=args.batch_values)
+                elapsed = time.perf_counter() - start
+                client_stats = getattr(backend, "stats", {})
+                if hasattr(backend, "close"):
+                    backend.close()
+                server_stats = dict(server.stats)
+            print(f"{name:>12}  {elapsed:>7.2f}  {args.rows / elapsed:>9.0f}  "
+                  f"{summary['llm']['requests']:>8}  {client_stats.get('retries', '-'):>7}  "
+                  f"{summary['llm']['errors']:>6}  {server_stats['max_concurrent']:>15}")
+
+
+if __name__ == "__main__":
+    main()
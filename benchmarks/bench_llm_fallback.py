@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Measure LLM calls and tokens saved by deduplicated, batched fallback resolution.
+Runs the validator chain against the local stub endpoint three ways:
+one request per row, batched without dedup, and batched with dedup.
+
+Usage: python benchmarks/bench_llm_fallback.py [--rows N]
+"""
+
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import llm_utils  # noqa: E402
+import run  # noqa: E402
+from llm_fallback import DEFAULT_LLM_BATCH_ROWS, FallbackResolver  # noqa: E402
+from llm_stub_server import StubLLMServer  # noqa: E402
+from row_record import RowLayout  # noqa: E402
+
+MODES = (
+    ("per-row", dict(dedupe=False, values_per_request=1)),
+    ("batched", dict(dedupe=False)),
+    ("deduped+batched", dict(dedupe=True)),
+)
+
+
+def load_rows(count):
+    with open(ROOT / "inventory_raw.csv", newline="") as f:
+        reader = csv.DictReader(f)
+        layout = RowLayout(reader.fieldnames)
+        seed_rows = list(reader)
+    rows = []
+    for i in range(count):
+        row = dict(seed_rows[i % len(seed_rows)])
+        row["source_row_id"] = str(i + 1)
+        rows.append(layout.from_mapping(row))
+    return rows
+
+
+def run_mode(rows, backend, resolver_kwargs):
+    fallback = FallbackResolver(backend, **resolver_kwargs)
+    outputs = []
+    for start in range(0, len(rows), DEFAULT_LLM_BATCH_ROWS):
+        batch = rows[start:start + DEFAULT_LLM_BATCH_ROWS]
+        outputs.extend(run.validate_batch(batch, fallback))
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        llm_utils.PROMPTS_MD_PATH = Path(tmp) / "prompts.md"
+        rows = load_rows(args.rows)
+
+        print(f"rows={args.rows}")
+        print(f"{'mode':>16}  {'calls':>7}  {'values':>7}  {'prompt_tok':>10}  "
+              f"{'compl_tok':>9}  {'seconds':>7}")
+        reference = None
+        for name, kwargs in MODES:
+            with StubLLMServer() as server:
+                start = time.perf_counter()
+                outputs = run_mode(rows, llm_utils.HTTPBackend(server.url), kwargs)
+                elapsed = time.perf_counter() - start
+                stats = dict(server.stats)
+            if reference is None:
+                reference = outputs
+            elif outputs != reference:
+                raise SystemExit(f"{name}: output differs from per-row mode")
+            print(f"{name:>16}  {stats['calls']:>7}  {stats['values']:>7}  "
+                  f"{stats['prompt_tokens']:>10}  {stats['completion_tokens']:>9}  {elapsed:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
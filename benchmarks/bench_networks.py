@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: longest-prefix-match lookups in network_trie.NetworkTrie.
+Builds random nested prefix sets (containers /8-/16, subnets /17-/30) of
+increasing size, checks the trie against a per-prefix-length hash table
+reference, and reports load time and lookups/sec for each size, which
+should stay flat as the prefix count grows.
+
+Usage: python benchmarks/bench_networks.py [--sizes 1k,10k,100k,500k]
+           [--lookups N] [--seed S]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from network_trie import Network, NetworkTrie, _mask  # noqa: E402
+from run_ipv4_validation import ipv4_format  # noqa: E402
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def build_prefixes(count, rng):
+    """count distinct (key, bits) prefixes, nested the way IPAM containers are."""
+    prefixes = set()
+    containers = []
+    while len(prefixes) < count:
+        if not containers or rng.random() < 0.02:
+            bits = rng.randint(8, 16)
+            key = rng.getrandbits(32) & _mask(bits)
+            containers.append((key, bits))
+        else:
+            parent, parent_bits = rng.choice(containers)
+            bits = rng.randint(max(parent_bits + 1, 17), 30)
+            key = (parent | rng.getrandbits(32 - parent_bits)) & _mask(bits)
+        prefixes.add((key, bits))
+    return list(prefixes)
+
+
+def reference_lookup(tables, packed):
+    for bits, table in tables:
+        network = table.get(packed & _mask(bits))
+        if network is not None:
+            return network
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1k,10k,100k,500k")
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'prefixes':>9}  {'load_s':>7}  {'lookups/sec':>12}  {'matched':>8}")
+    for size in map(parse_size, args.sizes.split(",")):
+        rng = random.Random(args.seed)
+        prefixes = build_prefixes(size, rng)
+        networks = {p: Network(f"{ipv4_format(p[0])}/{p[1]}", {}) for p in prefixes}
+
+        start = time.perf_counter()
+        trie = NetworkTrie()
+        for (key, bits), network in networks.items():
+            trie.insert(key, bits, network)
+        load = time.perf_counter() - start
+
+        # Half the addresses fall inside a loaded prefix, half are random
+        addresses = []
+        for _ in range(args.lookups):
+            key, bits = rng.choice(prefixes)
+            inside = key | (rng.getrandbits(32) & ~_mask(bits) & 0xFFFFFFFF)
+            addresses.append(inside if rng.random() < 0.5 else rng.getrandbits(32))
+
+        start = time.perf_counter()
+        results = [trie.lookup(a) for a in addresses]
+        elapsed = time.perf_counter() - start
+
+        tables = {}
+        for (key, bits), network in networks.items():
+            tables.setdefault(bits, {})[key] = network
+        tables = sorted(tables.items(), reverse=True)
+        for address, result in zip(addresses[:20_000], results):
+            if result is not reference_lookup(tables, address):
+                sys.exit(f"{ipv4_format(address)}: trie disagrees with the reference")
+
+        matched = sum(r is not None for r in results) / len(results)
+        print(f"{len(trie):>9}  {load:>7.2f}  {len(addresses) / elapsed:>12,.0f}  {matched:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: owner string scans vs the original chain of regex passes.
+Fuzzes random strings built from emails, tags, "Team:" prefixes, stray
+delimiters and unusual whitespace. First the parity check: on every value
+_lex_owner's extraction must equal extract_owner_regex's, the original
+chain kept here as the reference, and deterministic_owner_parse must match
+the original implementation in result and step log. Any mismatch exits
+nonzero. Then it times both on an owner-heavy feed, the parser alone
+without the field cache in front of it.
+
+Usage: python benchmarks/bench_owner.py [--values N] [--fuzz N] [--seed S]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HERE))
+
+from generate_inventory import FIRST_NAMES, LAST_NAMES, TEAMS, _owner  # noqa: E402
+from run_owner_validation import (  # noqa: E402
+    KNOWN_SINGLE_TOKEN_TEAMS, _lex_owner, deterministic_owner_parse,
+)
+from step_codes import (  # noqa: E402
+    OWNER_AMBIGUOUS, OWNER_EMAIL_EXTRACTED, OWNER_EMAIL_FOUND, OWNER_EMPTY,
+    OWNER_MULTI_WORD_NAME, OWNER_NAME_EXTRACTED, OWNER_NAME_FROM_EMAIL, OWNER_TEAM_BRACKETS,
+    OWNER_TEAM_PARENS, OWNER_TEAM_PREFIX, OWNER_TEAM_TAG, OWNER_TRIMMED, OWNER_WHITELIST_TEAM,
+)
+
+_EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+_TEAM_BRACKET_PATTERN = re.compile(r"\[([^\]]+)\]")
+_TEAM_PAREN_PATTERN = re.compile(r"\(([^)]+)\)")
+_TEAM_PREFIX_PATTERN = re.compile(r"(?:team\s*:\s*)(.+)", re.IGNORECASE)
+
+
+def extract_owner_regex(value):
+    """
+    Email and team extraction by the original chain of regex passes, the
+    reference for _lex_owner. Returns (value, owner_email, owner_team,
+    team_tag_extracted, steps).
+    """
+    steps = []
+    owner_email = owner_team = ""
+    team_tag_extracted = False
+    email_match = _EMAIL_PATTERN.search(value)
+    if email_match:
+        owner_email = email_match.group(0)
+        steps.append((OWNER_EMAIL_EXTRACTED, owner_email))
+        value = value.replace(owner_email, "").strip()
+    team_match = _TEAM_BRACKET_PATTERN.search(value)
+    if team_match:
+        owner_team = team_match.group(1).strip()
+        team_tag_extracted = True
+        steps.append((OWNER_TEAM_BRACKETS, owner_team))
+        value = _TEAM_BRACKET_PATTERN.sub("", value).strip()
+    if not owner_team:
+        team_match = _TEAM_PAREN_PATTERN.search(value)
+        if team_match:
+            owner_team = team_match.group(1).strip()
+            team_tag_extracted = True
+            steps.append((OWNER_TEAM_PARENS, owner_team))
+            value = _TEAM_PAREN_PATTERN.sub("", value).strip()
+    if not owner_team:
+        team_match = _TEAM_PREFIX_PATTERN.search(value)
+        if team_match:
+            owner_team = team_match.group(1).strip()
+            team_tag_extracted = True
+            steps.append((OWNER_TEAM_PREFIX, owner_team))
+            value = _TEAM_PREFIX_PATTERN.sub("", value).strip()
+    value = re.sub(r"[<>]", "", value).strip()
+    value = re.sub(r"\s+", " ", value).strip()
+    return value, owner_email, owner_team, team_tag_extracted, steps
+
+
+def legacy_parse(owner_raw, notes, steps):
+    """The original deterministic_owner_parse, kept here as the reference."""
+    if owner_raw is None or str(owner_raw).strip() == "":
+        return ("", "", "", False)
+    value = str(owner_raw).strip()
+    steps.append(OWNER_TRIMMED)
+    owner = ""
+    value, owner_email, owner_team, team_tag_extracted, extracted = extract_owner_regex(value)
+    steps.extend(extracted)
+    if owner_email:
+        steps.append(OWNER_EMAIL_FOUND)
+        if value:
+            owner = value.title()
+            steps.append((OWNER_NAME_EXTRACTED, owner))
+        else:
+            owner = re.sub(r"[._]", " ", owner_email.split("@")[0]).title()
+            steps.append((OWNER_NAME_FROM_EMAIL, owner))
+        return (owner, owner_email, owner_team, True)
+    if team_tag_extracted:
+        steps.append(OWNER_TEAM_TAG)
+        if value:
+            owner = value.title()
+            steps.append((OWNER_NAME_EXTRACTED, owner))
+        return (owner, owner_email, owner_team, True)
+    tokens = value.split()
+    if len(tokens) >= 2 and all(re.match(r"^[A-Za-z]+$", t) for t in tokens):
+        owner = value.title()
+        steps.append((OWNER_MULTI_WORD_NAME, owner))
+        return (owner, owner_email, owner_team, True)
+    if len(tokens) == 1 and tokens[0].lower() in KNOWN_SINGLE_TOKEN_TEAMS:
+        owner_team = tokens[0].title()
+        steps.append((OWNER_WHITELIST_TEAM, owner_team))
+        return ("unknown", owner_email, owner_team, True)
+    steps.append((OWNER_AMBIGUOUS, value) if value else OWNER_EMPTY)
+    return (owner, owner_email, owner_team, False)
+
+
+# Fuzz fragments: well-formed pieces plus every delimiter on its own
+FRAGMENTS = [
+    "jane", "Doe", "j.doe_2", "jane@corp.example.com", "ops+x@a.io", "x@y", "@", "a@b.c",
+    "a@b.com.1", "x@.io", "y@..io", "b@c.d.e", "Jane@CORP.IO", "@x.io",
+    "[", "]", "(", ")", "<", ">", ":", "[Platform]", "(Network Ops)", "[ ]", "()", "[]",
+    "[[", "))", "Team:", "team :", "TEAM:", "Steam:", "team", "tEaM\n:", "te", "am",
+    " ", "  ", "\t", "\n", "\r", "\x1c", "\u2003", ".", "_", "-", "%",
+    "é", "K", "42", "platform", "it", "Security",
+]
+
+
+def fuzz_values(count, rng):
+    return ["".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 7)))
+            for _ in range(count)]
+
+
+def feed_values(count, rng):
+    """Owner strings as inventory feeds spell them, generator shapes included."""
+    def extra():
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        team = rng.choice(TEAMS).title()
+        return rng.choice([
+            f"{first.title()} {last.title()} <{first}.{last}@corp.example.com>",
+            f"{first}.{last}@corp.example.com ({team})",
+            f"  {first.title()}   {last.title()} [{team}] ",
+            f"team: {team} Engineering",
+            f"{first[0].upper()}. {last.title()}",
+            f"{first}_{last}",
+        ])
+    return [_owner(rng) if rng.random() < 0.6 else extra() for _ in range(count)]
+
+
+def check_lexer(values):
+    """_lex_owner must extract exactly what the regex chain does."""
+    for value in values:
+        value = value.strip()
+        if not value:
+            continue
+        expected, actual = extract_owner_regex(value), _lex_owner(value)
+        if actual != expected:
+            sys.exit(f"lexer/regex mismatch for {value!r}:\n  regex {expected}\n  lexer {actual}")
+
+
+def check(values):
+    for value in values:
+        expected_steps, actual_steps = [], []
+        expected = legacy_parse(value, "", expected_steps)
+        actual = deterministic_owner_parse(value, "", actual_steps)
+        if (expected, expected_steps) != (actual, actual_steps):
+            sys.exit(f"mismatch for {value!r}:\n  {expected} {expected_steps}\n"
+                     f"  {actual} {actual_steps}")
+
+
+def time_parser(parse, values, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            parse(value, "", [])
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--values", type=int, default=100_000)
+    parser.add_argument("--fuzz", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fuzz = fuzz_values(args.fuzz, rng)
+    feed = feed_values(args.values, rng)
+    check_lexer(fuzz)
+    check_lexer(feed)
+    check(fuzz)
+    check(feed)
+    print(f"fuzz: {len(fuzz)} values identical to the regex chain")
+
+    legacy = time_parser(legacy_parse, feed)
+    lexer = time_parser(deterministic_owner_parse, feed)
+    print(f"feed: values={len(feed)}")
+    print(f"  regex chain: {legacy:.3f}s  {len(feed) / legacy:>10.0f} values/sec")
+    print(f"  scans:       {lexer:.3f}s  {len(feed) / lexer:>10.0f} values/sec")
+    print(f"  speedup: {legacy / lexer:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
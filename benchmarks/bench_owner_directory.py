@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark owner lookups in a local people/team directory (owner_directory).
+Writes a synthetic directory export of N people in teams with aliases, as
+CSV and LDIF, and reports the load time of each, lookups/sec for owner
+values spelled as usernames, email local parts, names, team aliases,
+truncated usernames and unknown tokens, and the share of each that
+resolves. Then cleans an inventory whose owners are spelled that way with
+and without the directory and reports how many rows still fall back to
+the LLM. Exits nonzero if loading either export, indexes included, takes
+longer than --max-load seconds.
+
+Usage: python benchmarks/bench_owner_directory.py [--people N] [--lookups N]
+           [--rows N] [--seed S] [--max-load SECONDS]
+"""
+
+import argparse
+import csv
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HERE))
+
+import llm_utils  # noqa: E402
+import run  # noqa: E402
+from generate_inventory import write_inventory  # noqa: E402
+from owner_directory import load_directory  # noqa: E402
+
+TEAM_WORDS = ["platform", "security", "network", "storage", "data", "identity", "edge",
+              "payments", "search", "build", "release", "observability", "database", "mobile"]
+
+
+def _word(rng, low, high):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def build_directory(people, rng):
+    """(person rows, team rows): (name, username, email, team) and (team, aliases)."""
+    teams = {}
+    while len(teams) < max(10, people // 2000):
+        words = rng.sample(TEAM_WORDS, 2)
+        name = " ".join(words).title() + f" {len(teams)}"
+        teams[name] = [f"{words[0][:3]}{words[1][:3]}{len(teams)}", f"{words[0]}-{len(teams)}"]
+    team_names = list(teams)
+    firsts = [_word(rng, 3, 8) for _ in range(max(50, people // 50))]
+    rows = []
+    seen = set()
+    while len(rows) < people:
+        first, last = rng.choice(firsts), _word(rng, 4, 10)
+        username = f"{first[0]}{last}"
+        if username in seen:
+            continue
+        seen.add(username)
+        rows.append((f"{first.title()} {last.title()}", username,
+                     f"{first}.{last}@corp.example.com", rng.choice(team_names)))
+    return rows, list(teams.items())
+
+
+def write_csv(path, rows, teams):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "username", "email", "team", "aliases"])
+        writer.writerows(row + ("",) for row in rows)
+        writer.writerows(("", "", "", team, ";".join(aliases)) for team, aliases in teams)
+
+
+def write_ldif(path, rows, teams):
+    with open(path, "w") as f:
+        for team, _ in teams:
+            f.write(f"dn: ou={team},dc=corp\nobjectClass: organizationalUnit\nou: {team}\n\n")
+        for name, username, email, team in rows:
+            f.write(f"dn: uid={username},ou={team},dc=corp\nobjectClass: inetOrgPerson\n"
+                    f"cn: {name}\nuid: {username}\nmail: {email}\nou: {team}\n\n")
+
+
+def owner_values(rows, teams, count, rng):
+    """{kind: [owner values]} spelled the ways inventory feeds spell owners."""
+    spellings = {
+        "username": lambda r: r[1],
+        "email_local": lambda r: r[2].partition("@")[0],
+        "name": lambda r: r[0].upper(),
+        "team_alias": lambda r: rng.choice(rng.choice(teams)[1]),
+        "prefix": lambda r: r[1][:-2] if len(r[1]) > 5 else r[1],
+        "unknown": lambda r: _word(rng, 6, 12) + "9",
+    }
+    return {kind: [spell(rng.choice(rows)) for _ in range(count)]
+            for kind, spell in spellings.items()}
+
+
+def time_lookups(directory, values):
+    start = time.perf_counter()
+    results = [directory.resolve(value) for value in values]
+    return time.perf_counter() - start, sum(r is not None for r in results) / len(results)
+
+
+def owner_fallbacks(tmp, input_csv, directory):
+    """Rows whose owner went to the LLM fallback."""
+    run.process(str(input_csv), str(tmp / "clean.csv"), str(tmp / "anomalies.json"),
+                owner_directory=directory)
+    with open(tmp / "clean.csv", newline="") as f:
+        return sum("owner: llm_" in row["normalization_steps"] for row in csv.DictReader(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--people", type=int, default=500_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-load", type=float, default=1.0,
+                        help="load time target per export, in seconds")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows, teams = build_directory(args.people, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        llm_utils.PROMPTS_MD_PATH = tmp / "prompts.md"
+        write_csv(tmp / "directory.csv", rows, teams)
+        write_ldif(tmp / "directory.ldif", rows, teams)
+
+        print(f"people={len(rows)} teams={len(teams)}")
+        slow = []
+        for name in ("directory.ldif", "directory.csv"):
+            start = time.perf_counter()
+            directory = load_directory(tmp / name)
+            load = time.perf_counter() - start
+            print(f"  load {name:<15} {load:>6.2f}s  people={len(directory)} "
+                  f"team keys={len(directory.teams)}")
+            if load > args.max_load:
+                slow.append(f"{name} {load:.2f}s")
+
+        print(f"{'owner spelled as':<16} {'lookups/sec':>12}  {'resolved':>8}")
+        for kind, values in owner_values(rows, teams, args.lookups, rng).items():
+            elapsed, resolved = time_lookups(directory, values)
+            print(f"{kind:<16} {len(values) / elapsed:>12,.0f}  {resolved:>8.1%}")
+
+        # An inventory whose owners are directory spellings the rules cannot parse
+        input_csv = tmp / "input.csv"
+        write_inventory(tmp / "generated.csv", args.rows, seed=args.seed, fallback_rate=0)
+        spellings = owner_values(rows, teams, args.rows, rng)
+        kinds = list(spellings)
+        with open(tmp / "generated.csv", newline="") as f, \
+                open(input_csv, "w", newline="") as g:
+            reader = csv.DictReader(f)
+            writer = csv.DictWriter(g, fieldnames=reader.fieldnames)
+            writer.writeheader()
+            for i, row in enumerate(reader):
+                if rng.random() < 0.3:
+                    row["owner"] = spellings[kinds[i % len(kinds)]][i]
+                writer.writerow(row)
+        without = owner_fallbacks(tmp, input_csv, None)
+        with_directory = owner_fallbacks(tmp, input_csv, directory)
+        print(f"rows={args.rows} owner LLM fallbacks: without directory={without} "
+              f"with directory={with_directory} "
+              f"({1 - with_directory / max(1, without):.0%} fewer)")
+    if slow:
+        sys.exit(f"load over the {args.max_load:g}s target: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-row containers of the validator chain, dicts vs records.
+Pushes a generated inventory through the containers run.process used to
+allocate per row (a csv.DictReader dict, one result dict per validator, a
+clean row dict for csv.DictWriter) and through the fixed-layout ones that
+replace them (a row_record.RawRow, result tuples and lists, a clean row
+list for csv.writer), with the validators themselves left out. Reports
+rows/sec, the memory held per in-flight row of a batch, and end-to-end
+run.process throughput on the same file.
+
+Usage: python benchmarks/bench_row_records.py [--rows N] [--batch-rows N] [--seed S]
+"""
+
+import argparse
+import csv
+import io
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HERE))
+
+import llm_utils  # noqa: E402
+import run  # noqa: E402
+from generate_inventory import write_inventory  # noqa: E402
+from row_record import CORE_FIELDS, RowLayout  # noqa: E402
+
+
+def dict_rows(f, batch_rows):
+    """The per-row dicts of the DictReader/DictWriter pipeline, batch by batch."""
+    reader = csv.DictReader(f)
+    extra_fields = [c for c in reader.fieldnames if c not in CORE_FIELDS]
+    batch = []
+    for row in reader:
+        mac = {"mac": row.get("mac"), "mac_valid": True}
+        hostname = {"hostname": row.get("hostname"), "hostname_valid": True}
+        fqdn = {"fqdn": row.get("fqdn"), "fqdn_consistent": "true", "reverse_ptr": ""}
+        owner = {"owner": row.get("owner", ""), "owner_email": "", "owner_team": ""}
+        device_type = {"device_type": row.get("device_type", ""), "device_type_confidence": "high"}
+        site = {"site": row.get("site", ""), "site_normalized": ""}
+        clean_row = {
+            "ip": row.get("ip", ""), "ip_valid": "true", "ip_version": "4", "subnet_cidr": "",
+            "mac": mac["mac"], "mac_valid": str(mac["mac_valid"]).lower(),
+            "hostname": hostname["hostname"],
+            "hostname_valid": str(hostname["hostname_valid"]).lower(),
+            "fqdn": fqdn["fqdn"], "fqdn_consistent": fqdn["fqdn_consistent"],
+            "reverse_ptr": fqdn["reverse_ptr"],
+            "owner": owner["owner"], "owner_email": owner["owner_email"],
+            "owner_team": owner["owner_team"],
+            "device_type": device_type["device_type"],
+            "device_type_confidence": device_type["device_type_confidence"],
+            "site": site["site"], "site_normalized": site["site_normalized"],
+            "normalization_steps": "", "source_row_id": row.get("source_row_id", ""),
+        }
+        for k in extra_fields:
+            clean_row[k] = row.get(k, "")
+        batch.append((row, clean_row))
+        if len(batch) >= batch_rows:
+            yield CORE_FIELDS + extra_fields, batch
+            batch = []
+    if batch:
+        yield CORE_FIELDS + extra_fields, batch
+
+
+def record_rows(f, batch_rows):
+    """The same rows as RawRows, result tuples/lists and clean row lists."""
+    reader = csv.reader(f)
+    layout = RowLayout(next(reader))
+    batch = []
+    for row in layout.records(reader):
+        mac = (row.mac, True)
+        hostname = (row.hostname, True)
+        fqdn = (row.fqdn, "true", "")
+        owner = [row.owner, "", ""]
+        device_type = [row.device_type, "high"]
+        site = [row.site, ""]
+        clean_row = [
+            row.ip, "true", "4", "",
+            mac[0], "true" if mac[1] else "false",
+            hostname[0], "true" if hostname[1] else "false",
+            *fqdn, *owner, *device_type, *site,
+            "", row.source_row_id,
+        ]
+        clean_row += layout.extra_values(row.values)
+        batch.append((row, clean_row))
+        if len(batch) >= batch_rows:
+            yield layout.fieldnames, batch
+            batch = []
+    if batch:
+        yield layout.fieldnames, batch
+
+
+def write_dicts(out, fieldnames, batch):
+    writer = csv.DictWriter(out, fieldnames=fieldnames)
+    for _, clean_row in batch:
+        writer.writerow(clean_row)
+
+
+def write_records(out, fieldnames, batch):
+    csv.writer(out).writerows(clean_row for _, clean_row in batch)
+
+
+def run_layer(input_csv, rows_of, write, batch_rows):
+    """(rows/sec, CSV text) for reading, building and writing every row."""
+    out = io.StringIO()
+    count = 0
+    start = time.perf_counter()
+    with open(input_csv, newline="") as f:
+        for fieldnames, batch in rows_of(f, batch_rows):
+            write(out, fieldnames, batch)
+            count += len(batch)
+    return count / (time.perf_counter() - start), out.getvalue()
+
+
+def batch_bytes(input_csv, rows_of, batch_rows):
+    """Bytes held per row by one full batch of rows and their clean rows."""
+    with open(input_csv, newline="") as f:
+        batches = rows_of(f, batch_rows)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        _, batch = next(batches)
+        held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+    return held / len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-rows", type=int, default=run.DEFAULT_LLM_BATCH_ROWS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        llm_utils.PROMPTS_MD_PATH = tmp / "prompts.md"
+        input_csv = tmp / "input.csv"
+        write_inventory(input_csv, args.rows, seed=args.seed)
+
+        dict_rate, dict_csv = run_layer(input_csv, dict_rows, write_dicts, args.batch_rows)
+        record_rate, record_csv = run_layer(input_csv, record_rows, write_records,
+                                            args.batch_rows)
+        if dict_csv != record_csv:
+            sys.exit("record layer wrote a different CSV than the dict layer")
+        dict_bytes = batch_bytes(input_csv, dict_rows, args.batch_rows)
+        record_bytes = batch_bytes(input_csv, record_rows, args.batch_rows)
+
+        start = time.perf_counter()
+        run.process(str(input_csv), str(tmp / "clean.csv"), str(tmp / "anomalies.json"))
+        process_rate = args.rows / (time.perf_counter() - start)
+
+    print(f"rows={args.rows} batch_rows={args.batch_rows}")
+    print(f"{'containers':>10}  {'rows/sec':>10}  {'bytes/row':>9}")
+    print(f"{'dicts':>10}  {dict_rate:>10,.0f}  {dict_bytes:>9,.0f}")
+    print(f"{'records':>10}  {record_rate:>10,.0f}  {record_bytes:>9,.0f}")
+    print(f"speedup: {record_rate / dict_rate:.2f}x, "
+          f"memory per in-flight row: {record_bytes / dict_bytes:.0%}")
+    print(f"run.process: {process_rate:,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark request latency of the long-lived validation service (service.py).
+Starts the service in this process on a Unix socket and a local TCP port,
+sends single-row requests (POST /rows) and 10k-row CSV requests
+(POST /csv), and reports the first (cold cache) request and the
+p50/p95 of the warm ones. For comparison, the same payloads are cleaned
+by a fresh interpreter per job, as a one-shot run.py call does. Checks the
+service's CSV matches run.process output for the same input.
+
+Usage: python benchmarks/bench_service.py [--rows N] [--single-requests N]
+           [--bulk-requests N] [--cold-runs N] [--seed S]
+"""
+
+import argparse
+import csv
+import io
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HERE))
+
+import llm_utils  # noqa: E402
+import run  # noqa: E402
+from field_cache import clear_field_caches  # noqa: E402
+from generate_inventory import write_inventory  # noqa: E402
+from service import ServiceClient, ValidationService, make_server  # noqa: E402
+
+# One-shot job: interpreter start, imports and one run.process call
+COLD_JOB = """
+import sys
+sys.path.insert(0, {root!r})
+import llm_utils
+llm_utils.PROMPTS_MD_PATH = {prompts!r}
+import run
+run.process({input!r}, {output!r}, {anomalies!r})
+"""
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def latencies(fn, payload, count):
+    """(first request seconds, warm request seconds) for count requests."""
+    first, _ = timed(fn, payload)
+    return first, [timed(fn, payload)[0] for _ in range(count - 1)]
+
+
+def cold_job(tmp, text, runs):
+    """Median seconds for a fresh interpreter to clean text."""
+    input_csv = tmp / "cold.csv"
+    with open(input_csv, "w", newline="") as f:
+        f.write(text)
+    code = COLD_JOB.format(root=str(ROOT), prompts=str(tmp / "cold_prompts.md"),
+                           input=str(input_csv), output=str(tmp / "cold_clean.csv"),
+                           anomalies=str(tmp / "cold_anomalies.json"))
+    times = [timed(subprocess.run, [sys.executable, "-c", code])[0] for _ in range(runs)]
+    return statistics.median(times)
+
+
+def report(label, rows, first, warm, cold):
+    ms = [t * 1000 for t in warm]
+    p95 = statistics.quantiles(ms, n=20)[-1] if len(ms) > 1 else ms[0]
+    print(f"{label:<18} {rows:>6}  {first * 1000:>9.1f}  {statistics.median(ms):>8.1f}  "
+          f"{p95:>8.1f}  {cold * 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--single-requests", type=int, default=500)
+    parser.add_argument("--bulk-requests", type=int, default=10)
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        llm_utils.PROMPTS_MD_PATH = tmp / "prompts.md"
+        input_csv = tmp / "input.csv"
+        write_inventory(input_csv, args.rows, seed=args.seed)
+        with open(input_csv, newline="") as f:
+            bulk = f.read()
+            f.seek(0)
+            reader = csv.DictReader(f)
+            single_row = next(reader)
+        single = io.StringIO(newline="")
+        writer = csv.DictWriter(single, fieldnames=reader.fieldnames)
+        writer.writeheader()
+        writer.writerow(single_row)
+        single = single.getvalue()
+
+        run.process(str(input_csv), str(tmp / "clean.csv"), str(tmp / "anomalies.json"))
+        with open(tmp / "clean.csv", newline="") as f:
+            expected_csv = f.read()
+        expected_anomalies = json.loads((tmp / "anomalies.json").read_text())
+
+        cold_single = cold_job(tmp, single, args.cold_runs)
+        cold_bulk = cold_job(tmp, bulk, args.cold_runs)
+
+        print(f"rows={args.rows} single_requests={args.single_requests} "
+              f"bulk_requests={args.bulk_requests}")
+        print(f"{'request':<18} {'rows':>6}  {'first_ms':>9}  {'p50_ms':>8}  {'p95_ms':>8}  "
+              f"{'cold_ms':>9}")
+        for address in (f"unix:{tmp / 'service.sock'}", "127.0.0.1:0"):
+            # A fresh service per transport, starting with cold caches
+            clear_field_caches()
+            server = make_server(address, ValidationService())
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            transport = "unix" if address.startswith("unix:") else "tcp"
+            try:
+                with ServiceClient(server.address) as client:
+                    first, warm = latencies(client.validate_rows, [single_row],
+                                            args.single_requests)
+                    report(f"{transport} /rows", 1, first, warm, cold_single)
+                    first, warm = latencies(client.validate_csv, bulk, args.bulk_requests)
+                    report(f"{transport} /csv", args.rows, first, warm, cold_bulk)
+                    answer = client.validate_csv(bulk)
+                    if (answer["csv"] != expected_csv
+                            or answer["anomalies"] != expected_anomalies):
+                        sys.exit("service output differs from run.process")
+            finally:
+                server.shutdown()
+                server.server_close()
+        print("service output identical to run.process: yes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass site token rewriter vs the original per-pattern re.sub chain.
+Checks both produce the same site_normalized on every value, then shows how
+the rewriter scales as the phrase dictionary grows.
+
+Usage: python benchmarks/bench_site.py [--values N]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run_site_validation import (  # noqa: E402
+    _ABBREVIATIONS,
+    _CITY_CODES,
+    SiteTokenRewriter,
+    deterministic_site_parse,
+)
+
+SITES = [
+    "HQ Bldg 1", "BLR Campus", "HQ-BUILDING-1", "HQ", "Lab-1", "DC-1", "N/A", "",
+    "san francisco data center", "SanFrancisco DC", "Headquarters", "main office",
+    "NY office", "LA_warehouse.2", "wh-3", "Data Center 4", "remote", "Tokyo Lab",
+    "  sf  hq ", "Chicago #2", "laboratory", "Headqaurters Bldg 2", "Seattle DC 2",
+]
+
+
+def _legacy_pattern(phrase):
+    return r"\b" + r"\s*".join(re.escape(w) for w in phrase.split()) + r"\b"
+
+
+LEGACY_CITY_CODES = [(_legacy_pattern(p), c) for p, c in _CITY_CODES]
+LEGACY_ABBREVIATIONS = [(_legacy_pattern(p), c) for p, c in _ABBREVIATIONS]
+
+
+def legacy_normalize(site_raw, city_codes=LEGACY_CITY_CODES, abbreviations=LEGACY_ABBREVIATIONS):
+    """The original re.sub chain from deterministic_site_parse, kept as the reference."""
+    value = str(site_raw).strip()
+    if value == "" or value.upper() in ("N/A", "NA", "NONE", "UNKNOWN", "-"):
+        return ""
+    value = value.upper()
+    value = re.sub(r"[\s_\.]+", "-", value)
+    value = re.sub(r"-+", "-", value)
+    value = value.strip("-")
+    for pattern, code in city_codes:
+        value = re.sub(pattern, code, value, flags=re.IGNORECASE)
+    for pattern, abbrev in abbreviations:
+        value = re.sub(pattern, abbrev, value, flags=re.IGNORECASE)
+    value = re.sub(r"-+", "-", value)
+    return value.strip("-")
+
+
+def time_it(fn, values, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            fn(value)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def synthetic_table(size, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        ("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))), f"S{i:05d}")
+        for i in range(size)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--values", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    values = [rng.choice(SITES) for _ in range(args.values)]
+
+    for value in set(values):
+        expected = legacy_normalize(value)
+        actual = deterministic_site_parse(value, "", [])[1]
+        if expected != actual:
+            raise SystemExit(f"mismatch for {value!r}: {expected!r} != {actual!r}")
+
+    legacy = time_it(legacy_normalize, values)
+    rewriter = time_it(lambda v: deterministic_site_parse(v, "", []), values)
+    print(f"values={args.values}")
+    print(f"  re.sub chain: {legacy:.3f}s  {args.values / legacy:>10.0f} values/sec")
+    print(f"  token trie:   {rewriter:.3f}s  {args.values / rewriter:>10.0f} values/sec")
+    print(f"  speedup: {legacy / rewriter:.2f}x")
+
+    print("dictionary growth (values/sec):")
+    print(f"{'entries':>8}  {'token trie':>10}  {'re.sub chain':>12}")
+    sample = [v.upper() for v in values[:5000]]
+    for size in (30, 300, 3_000, 30_000):
+        table = synthetic_table(size, rng)
+        trie = SiteTokenRewriter(_CITY_CODES, _ABBREVIATIONS, table)
+        trie_rate = len(sample) / time_it(trie.rewrite, sample)
+        if size <= 300:
+            patterns = LEGACY_CITY_CODES + LEGACY_ABBREVIATIONS + [(_legacy_pattern(p), c) for p, c in table]
+            chain_rate = 500 / time_it(lambda v: legacy_normalize(v, patterns, []), sample[:500], repeat=1)
+            chain = f"{chain_rate:>12.0f}"
+        else:
+            chain = f"{'(skipped)':>12}"
+        print(f"{size:>8}  {trie_rate:>10.0f}  {chain}")
+
+
+if __name__ == "__main__":
+    main()
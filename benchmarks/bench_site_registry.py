@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark fuzzy site matching against a canonical site registry (site_registry).
+Writes a synthetic registry of N sites (code, name and alias per site) and
+reports its load time. Checks the trigram index against a brute-force
+edit-distance scan on a sample of typo'd and unknown keys, requiring the
+same distance and matches. Then reports per-lookup latency (p50, p99, max)
+and the share that resolves for exact spellings, typo'd names and unknown
+values. Last, it cleans an inventory with many typo'd sites with and without
+the registry, and reports the site LLM fallbacks and the site_normalized
+codes that are not registered sites.
+
+Usage: python benchmarks/bench_site_registry.py [--sites N] [--lookups N]
+           [--check N] [--rows N] [--seed S]
+"""
+
+import argparse
+import csv
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HERE))
+
+import llm_utils  # noqa: E402
+import run  # noqa: E402
+from generate_inventory import _typo, write_inventory  # noqa: E402
+from run_site_validation import deterministic_site_parse  # noqa: E402
+from site_registry import (  # noqa: E402
+    _numbers, edit_distance, load_site_registry, max_distance, site_key,
+)
+
+# (code word, name word) of the kinds of synthetic sites
+KINDS = [("BLDG", "Building"), ("CAMPUS", "Campus"), ("DC", "Data Center"),
+         ("OFFICE", "Office"), ("LAB", "Lab"), ("WH", "Warehouse")]
+
+# The generator's site spellings, by the code they name
+INVENTORY_SITES = [
+    ("HQ", []), ("HQ-BLDG-1", ["HQ Bldg 1", "HQ Building 1"]),
+    ("HQ-BLDG-2", ["Headquarters Building 2"]), ("BLR-CAMPUS", ["Bangalore Campus"]),
+    ("DC-1", ["Data Center 1"]), ("SFO", ["San Francisco"]), ("SFO-2", []),
+    ("LAB-1", []), ("NYC-OFFICE", ["New York Office"]),
+]
+
+
+def build_registry(count, rng):
+    """[(code, name, alias)] of count synthetic sites."""
+    cities = {}
+    while len(cities) < max(10, count // 20):
+        city = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+        code = city[:3].upper() + rng.choice(string.ascii_uppercase)
+        if code not in cities.values():
+            cities[city.title()] = code
+    sites, seen = [], set()
+    city_names = list(cities)
+    while len(sites) < count:
+        city = rng.choice(city_names)
+        code_word, name_word = rng.choice(KINDS)
+        number = rng.randint(1, 40)
+        code = f"{cities[city]}-{code_word}-{number}"
+        if code in seen:
+            continue
+        seen.add(code)
+        sites.append((code, f"{city} {name_word} {number}", f"{city} {code_word} {number}"))
+    return sites
+
+
+def write_registry(path, sites):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["site", "name", "aliases"])
+        writer.writerows(sites)
+        writer.writerows((code, "", ";".join(aliases)) for code, aliases in INVENTORY_SITES)
+
+
+def site_values(sites, count, rng):
+    """{kind: [site values]} as exact spellings, typo'd names and unknown sites."""
+    spellings = {
+        "exact": lambda s: rng.choice(s),
+        "typo": lambda s: _typo(rng, s[1]),
+        "typo_x2": lambda s: _typo(rng, _typo(rng, s[1])),
+        "unknown": lambda s: f"{rng.choice(string.ascii_uppercase)}{s[1][1:].lower()}x "
+                             f"Annex {rng.randint(41, 99)}",
+    }
+    return {kind: [spell(rng.choice(sites)) for _ in range(count)]
+            for kind, spell in spellings.items()}
+
+
+def brute_closest(partitions, key, limit):
+    """_FuzzyIndex.closest() by scanning every key with the same numbers."""
+    if limit <= 0:
+        return None
+    best, found = limit + 1, []
+    for candidate in partitions.get(_numbers(key), ()):
+        distance = edit_distance(key, candidate, limit)
+        if distance < best:
+            best, found = distance, [candidate]
+        elif distance == best:
+            found.append(candidate)
+    return None if best > limit else (best, sorted(found))
+
+
+def check(registry, values):
+    index = registry._spelling_index
+    partitions = {}
+    for key in index._keys:
+        partitions.setdefault(_numbers(key), []).append(key)
+    for value in values:
+        key = site_key(value)
+        expected = brute_closest(partitions, key, max_distance(key))
+        actual = index.closest(key, max_distance(key))
+        if actual is not None:
+            actual = (actual[0], sorted(actual[1]))
+        if expected != actual:
+            sys.exit(f"mismatch for {value!r}:\n  brute force {expected}\n  index {actual}")
+
+
+def time_lookups(registry, values):
+    """
+    (sorted per-lookup seconds, share resolved to a registered code, by the
+    rules alone or by the registry), bypassing the memo.
+    """
+    latencies, resolved = [], 0
+    clock = time.perf_counter
+    for value in values:
+        normalized = deterministic_site_parse(value, "", [])[1]
+        start = clock()
+        result = registry._lookup(value, normalized)
+        latencies.append(clock() - start)
+        resolved += result is not None or normalized in registry.codes
+    latencies.sort()
+    return latencies, resolved / len(values)
+
+
+def site_outcomes(tmp, input_csv, registry, codes):
+    """(site LLM fallbacks, rows whose site_normalized is not one of codes)."""
+    run.process(str(input_csv), str(tmp / "clean.csv"), str(tmp / "anomalies.json"),
+                site_registry=registry)
+    fallbacks = unregistered = 0
+    with open(tmp / "clean.csv", newline="") as f:
+        for row in csv.DictReader(f):
+            fallbacks += "site: llm_" in row["normalization_steps"]
+            unregistered += row["site_normalized"] not in codes
+    return fallbacks, unregistered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sites", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--check", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sites = build_registry(args.sites, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        llm_utils.PROMPTS_MD_PATH = tmp / "prompts.md"
+        write_registry(tmp / "sites.csv", sites)
+        start = time.perf_counter()
+        registry = load_site_registry(tmp / "sites.csv")
+        print(f"sites={len(registry)} spellings={len(registry._spelling_index._keys)} "
+              f"load={time.perf_counter() - start:.2f}s")
+
+        values = site_values(sites, args.lookups, rng)
+        sample = [v for kind in ("typo", "typo_x2", "unknown") for v in values[kind][:args.check]]
+        check(registry, sample)
+        print(f"check: {len(sample)} keys match a brute-force scan of every spelling")
+
+        print(f"{'site spelled as':<16} {'p50 us':>8} {'p99 us':>8} {'max us':>8}  {'resolved':>8}")
+        for kind, kind_values in values.items():
+            latencies, resolved = time_lookups(registry, kind_values)
+            p50, p99 = latencies[len(latencies) // 2], latencies[len(latencies) * 99 // 100]
+            print(f"{kind:<16} {p50 * 1e6:>8.1f} {p99 * 1e6:>8.1f} {latencies[-1] * 1e6:>8.1f}"
+                  f"  {resolved:>8.1%}")
+
+        input_csv = tmp / "input.csv"
+        write_inventory(input_csv, args.rows, seed=args.seed, site_typo_rate=0.5,
+                        fallback_rate=0)
+        without, without_unregistered = site_outcomes(tmp, input_csv, None, registry.codes)
+        with_registry, unregistered = site_outcomes(tmp, input_csv, registry,
+                                                    registry.codes)
+        print(f"rows={args.rows} (half the sites typo'd)")
+        print(f"  site LLM fallbacks: without registry={without} with registry={with_registry} "
+              f"({1 - with_registry / max(1, without):.0%} fewer)")
+        print(f"  unregistered site_normalized: without registry={without_unregistered} "
+              f"with registry={unregistered}")
+
+
+if __name__ == "__main__":
+    main()
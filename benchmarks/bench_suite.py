@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark suite.
+For each size, generates a seeded inventory (benchmarks/generate_inventory.py),
+times every validator module over it and the end-to-end run.process, and
+appends rows/sec and peak RSS per stage to a JSON-lines results file tagged
+with the current commit, so runs can be compared across commits. Each stage
+runs in its own child process so its peak RSS is measured in isolation.
+
+Usage: python benchmarks/bench_suite.py [--sizes 10k,1m,10m] [--workers N]
+           [--seed S] [--results benchmarks/results.jsonl]
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HERE))
+
+from generate_inventory import write_inventory  # noqa: E402
+
+DEFAULT_SIZES = "10k,1m,10m"
+DEFAULT_RESULTS = HERE / "results.jsonl"
+# Rows per validator timing chunk; bounds memory at any size
+_CHUNK_ROWS = 10_000
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def _iter_chunks(reader):
+    chunk = []
+    for row in reader:
+        chunk.append(row)
+        if len(chunk) >= _CHUNK_ROWS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ---------------------------------------------------------------------------
+# Child-process stages
+# ---------------------------------------------------------------------------
+
+def time_validators(input_csv):
+    """Seconds spent in each validator module over input_csv, plus the fallback stage."""
+    from llm_fallback import FallbackResolver
+    from row_record import RowLayout
+    from run_device_type_validation import validate_device_type_field
+    from run_fqdn_validation import validate_fqdn_field
+    from run_hostname_validation import validate_hostname_field
+    from run_ipv4_validation import ipv4_parse
+    from run_mac_validator import validate_mac_field
+    from run_owner_validation import validate_owner_field
+    from run_site_validation import validate_site_field
+
+    fallback = FallbackResolver()
+    totals = dict.fromkeys(
+        ["ipv4", "mac", "hostname", "fqdn", "owner", "device_type", "site", "llm_fallback"], 0.0
+    )
+    clock = time.perf_counter
+    with open(input_csv, newline="") as f:
+        reader = csv.reader(f)
+        layout = RowLayout(next(reader))
+        for rows in _iter_chunks(layout.records(reader)):
+            anomalies, steps = [], []
+            start = clock()
+            for row in rows:
+                ipv4_parse(row.ip)
+            totals["ipv4"] += clock() - start
+
+            start = clock()
+            for row in rows:
+                validate_mac_field(row, anomalies, steps)
+            totals["mac"] += clock() - start
+
+            start = clock()
+            hostnames = [validate_hostname_field(row, anomalies, steps) for row in rows]
+            totals["hostname"] += clock() - start
+
+            start = clock()
+            for row, hostname_result in zip(rows, hostnames):
+                validate_fqdn_field(row, hostname_result, anomalies, steps)
+            totals["fqdn"] += clock() - start
+
+            for name, validate in (("owner", validate_owner_field),
+                                   ("device_type", validate_device_type_field),
+                                   ("site", validate_site_field)):
+                start = clock()
+                for row in rows:
+                    validate(row, anomalies, steps, fallback)
+                totals[name] += clock() - start
+
+            start = clock()
+            fallback.resolve()
+            totals["llm_fallback"] += clock() - start
+    return totals
+
+
+def time_process(input_csv, workers):
+    import run
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        run.process(input_csv, str(Path(tmp) / "clean.csv"), str(Path(tmp) / "anomalies.json"),
+                    workers=workers)
+        return {"process": time.perf_counter() - start}
+
+
+def _child_main(stage, input_csv, workers):
+    import llm_utils
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the suite from appending to TEMPLATES/prompts.md
+        llm_utils.PROMPTS_MD_PATH = Path(tmp) / "prompts.md"
+        if stage == "validators":
+            timings = time_validators(input_csv)
+        else:
+            timings = time_process(input_csv, workers)
+    json.dump(timings, sys.stdout)
+
+
+def _run_child(stage, input_csv, workers):
+    """Run one stage in a child process; return (timings, peak RSS in bytes)."""
+    proc = subprocess.Popen(
+        [sys.executable, __file__, "--child", stage, "--input", str(input_csv),
+         "--workers", str(workers)],
+        stdout=subprocess.PIPE,
+    )
+    output = proc.stdout.read()
+    proc.stdout.close()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        sys.exit(f"{stage} stage failed with exit code {proc.returncode}")
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return json.loads(output), usage.ru_maxrss * scale
+
+
+# ---------------------------------------------------------------------------
+# Results file
+# ---------------------------------------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+            text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _previous_results(path, commit):
+    """Latest rows/sec per (stage, rows, workers) recorded for another commit."""
+    previous = {}
+    if not path.exists():
+        return previous
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record["commit"] != commit:
+                key = (record["stage"], record["rows"], record["workers"])
+                previous[key] = (record["commit"], record["rows_per_sec"])
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"comma-separated row counts, k/m suffixes allowed "
+                             f"(default: {DEFAULT_SIZES})")
+    parser.add_argument("--workers", type=int, default=1, help="--workers for run.process")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS)
+    parser.add_argument("--child", choices=("validators", "process"), help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child_main(args.child, args.input, args.workers)
+        return
+
+    commit = _git_commit()
+    previous = _previous_results(args.results, commit)
+    base = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "workers": args.workers,
+    }
+    print(f"commit={commit} seed={args.seed} workers={args.workers} -> {args.results}")
+    print(f"{'rows':>10}  {'stage':>12}  {'seconds':>8}  {'rows/sec':>11}  {'peak_rss_mb':>11}  "
+          f"{'previous':>20}")
+
+    with tempfile.TemporaryDirectory() as tmp, open(args.results, "a") as results:
+        for size in map(parse_size, args.sizes.split(",")):
+            input_csv = Path(tmp) / f"inventory_{size}.csv"
+            write_inventory(input_csv, size, seed=args.seed)
+            for child_stage in ("validators", "process"):
+                timings, peak_rss = _run_child(child_stage, input_csv, args.workers)
+                for stage, seconds in timings.items():
+                    record = dict(base, stage=stage, rows=size, seconds=round(seconds, 4),
+                                  rows_per_sec=round(size / seconds) if seconds else None,
+                                  peak_rss_mb=round(peak_rss / 2**20, 1))
+                    results.write(json.dumps(record) + "\n")
+                    prev = previous.get((stage, size, args.workers))
+                    prev_text = f"{prev[1]:,} @ {prev[0]}" if prev else "-"
+                    print(f"{size:>10}  {stage:>12}  {seconds:>8.2f}  "
+                          f"{record['rows_per_sec'] or 0:>11,}  {record['peak_rss_mb']:>11}  "
+                          f"{prev_text:>20}")
+            input_csv.unlink()
+
+
+if __name__ == "__main__":
+    main()
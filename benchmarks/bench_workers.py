@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark run.process scaling across --workers settings.
+Builds a synthetic input by replicating inventory_raw.csv, runs the serial
+path and each worker count, and checks the outputs are byte-identical.
+With --split-input, workers parse their own byte ranges of the input.
+
+Usage: python benchmarks/bench_workers.py [--rows N] [--max-workers N] [--split-input]
+"""
+
+import argparse
+import csv
+import filecmp
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import llm_utils  # noqa: E402
+import run  # noqa: E402
+
+
+def build_input(path, rows):
+    with open(ROOT / "inventory_raw.csv", newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        seed_rows = list(reader)
+
+    with open(path, "w", newline="") as g:
+        writer = csv.DictWriter(g, fieldnames=fieldnames)
+        writer.writeheader()
+        for i in range(rows):
+            row = dict(seed_rows[i % len(seed_rows)])
+            row["source_row_id"] = str(i + 1)
+            writer.writerow(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=run.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--split-input", action="store_true",
+                        help="memory-map the input and split it into byte ranges per task")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # Keep the benchmark from appending to TEMPLATES/prompts.md
+        llm_utils.PROMPTS_MD_PATH = tmp / "prompts.md"
+
+        input_csv = tmp / "input.csv"
+        build_input(input_csv, args.rows)
+
+        print(f"rows={args.rows} chunk_size={args.chunk_size} split_input={args.split_input}")
+        print(f"{'workers':>7}  {'seconds':>8}  {'rows/sec':>10}  {'speedup':>7}  identical")
+
+        baseline = None
+        for workers in range(1, args.max_workers + 1):
+            out_csv = tmp / f"clean_{workers}.csv"
+            anomalies_json = tmp / f"anomalies_{workers}.json"
+
+            start = time.perf_counter()
+            run.process(str(input_csv), str(out_csv), str(anomalies_json),
+                        workers=workers, chunk_size=args.chunk_size,
+                        split_input=args.split_input and workers > 1)
+            elapsed = time.perf_counter() - start
+
+            if baseline is None:
+                baseline = (elapsed, out_csv, anomalies_json)
+            identical = (
+                filecmp.cmp(baseline[1], out_csv, shallow=False)
+                and filecmp.cmp(baseline[2], anomalies_json, shallow=False)
+            )
+            print(f"{workers:>7}  {elapsed:>8.2f}  {args.rows / elapsed:>10.0f}  "
+                  f"{baseline[0] / elapsed:>6.2f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic inventory generator.
+Produces rows shaped like inventory_raw.csv: padded and zero-padded IPs,
+MACs in every delimiter style, owners with emails/brackets/parentheses,
+device models and site spellings, plus tunable rates of duplicate rows,
+malformed IPs and MACs, typo'd sites and rows whose owner, device_type or
+site needs the LLM fallback. The same seed always yields the same file.
+
+Usage: python benchmarks/generate_inventory.py OUT.csv --rows N [--seed S]
+           [--duplicate-rate F] [--bad-ip-rate F] [--bad-mac-rate F]
+           [--site-typo-rate F] [--fallback-rate F] [--fallback-distinct N]
+"""
+
+import argparse
+import csv
+import random
+
+FIELDNAMES = ["source_row_id", "ip", "hostname", "fqdn", "mac", "owner",
+              "device_type", "site", "notes"]
+
+DOMAINS = ["corp.example.com", "lab.example.com", "local"]
+FIRST_NAMES = ["priya", "jane", "bob", "wei", "amara", "lucas", "fatima", "ken"]
+LAST_NAMES = ["sharma", "doe", "smith", "chen", "okafor", "silva", "khan", "sato"]
+TEAMS = ["platform", "security", "network", "infrastructure", "systems", "devops", "support"]
+DEVICE_TYPES = [
+    "server", "Server", "switch", "router", "printer", "firewall", "laptop", "AP",
+    "srv", "fw", "sw", "workstation", "access point", "Cisco Catalyst 3850",
+    "Nexus 9300", "Palo Alto PA-220", "HP LaserJet M404", "MacBook Pro 14",
+]
+SITES = [
+    "HQ", "HQ Bldg 1", "HQ-BUILDING-1", "BLR Campus", "BLR campus", "DC-1",
+    "San Francisco", "SFO-2", "Lab-1", "NYC Office", "Headquarters Building 2",
+]
+NOTES = ["", "", "", "db host", "edge gw?", "camera PoE on port 3", "Potential broadcast"]
+
+# Values the deterministic rules cannot resolve, by field
+FALLBACK_VALUES = {
+    "owner": lambda k: f"ops{k}",
+    "device_type": lambda k: f"gadget {k}",
+    "site": lambda k: f"Room {k}?",
+}
+
+BAD_IPS = [
+    "10.0.1.300", "10.0.1", "10.0.1.1.2", "fe80::1%eth0", "abc.def.ghi.jkl",
+    "192.168.1.-1", "N/A", "", "10..0.1", "1.2.3.++4",
+]
+BAD_MACS = [
+    "AA:BB:CC", "aa-bb:cc-dd-ee-ff", "GG:HH:II:JJ:KK:LL", "", "00112233445566778899",
+    "00:11:22:33:44", "zz-zz-zz-zz-zz-zz",
+]
+
+
+def _ip(rng):
+    kind = rng.random()
+    if kind < 0.4:
+        octets = [10, rng.randint(0, 255), rng.randint(0, 255), rng.randint(1, 254)]
+    elif kind < 0.6:
+        octets = [172, rng.randint(16, 31), rng.randint(0, 255), rng.randint(1, 254)]
+    elif kind < 0.8:
+        octets = [192, 168, rng.randint(0, 255), rng.randint(1, 254)]
+    elif kind < 0.85:
+        octets = [169, 254, rng.randint(0, 255), rng.randint(1, 254)]
+    elif kind < 0.87:
+        octets = [127, 0, 0, 1]
+    else:
+        octets = [rng.randint(1, 223), rng.randint(0, 255), rng.randint(0, 255), rng.randint(1, 254)]
+    style = rng.random()
+    if style < 0.05:
+        return ".".join(f"{o:03d}" for o in octets)
+    ip = ".".join(map(str, octets))
+    return f"  {ip}  " if style < 0.1 else ip
+
+
+def _mac(rng):
+    octets = [f"{rng.randint(0, 255):02x}" for _ in range(6)]
+    if rng.random() < 0.5:
+        octets = [o.upper() for o in octets]
+    style = rng.randrange(4)
+    if style == 3:
+        flat = "".join(octets)
+        return ".".join(flat[i:i + 4] for i in range(0, 12, 4))
+    return [":", "-", ""][style].join(octets)
+
+
+def _owner(rng):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    team = rng.choice(TEAMS)
+    return rng.choice([
+        f"{first}@corp.example.com",
+        f"{first} ({team}) {first}@corp.example.com",
+        f"[{team}] {first.title()} {last.title()}",
+        f"Team: {team}",
+        f"{first.title()} {last.title()}",
+        team,
+    ])
+
+
+def _typo(rng, text):
+    i = rng.randrange(len(text))
+    op = rng.randrange(3)
+    if op == 0:
+        return text[:i] + text[i + 1:]
+    if op == 1:
+        return text[:i] + text[i] + text[i:]
+    j = min(i + 1, len(text) - 1)
+    return text[:i] + text[j] + text[i] + text[j + 1:]
+
+
+def generate_rows(rows, seed=0, duplicate_rate=0.05, bad_ip_rate=0.1, bad_mac_rate=0.1,
+                  site_typo_rate=0.05, fallback_rate=0.05, fallback_distinct=1000):
+    """
+    Yield `rows` inventory rows as dicts keyed by FIELDNAMES.
+
+    duplicate_rate re-emits an earlier row's ip/mac/hostname under a new
+    source_row_id. fallback_rate is the fraction of rows with one ambiguous
+    owner, device_type or site value, drawn from fallback_distinct values per
+    field so the fallback stage has something to deduplicate.
+    """
+    rng = random.Random(seed)
+    recent = []
+    for i in range(rows):
+        if recent and rng.random() < duplicate_rate:
+            row = dict(rng.choice(recent))
+            row["source_row_id"] = str(i + 1)
+            yield row
+            continue
+
+        hostname = f"{rng.choice(['srv', 'host', 'sw', 'ap', 'prn'])}-{rng.randrange(100_000):05d}"
+        if rng.random() < 0.1:
+            hostname = hostname.upper()
+        fqdn = ""
+        if rng.random() < 0.5:
+            fqdn = f"{hostname.lower()}.{rng.choice(DOMAINS)}"
+        site = rng.choice(SITES)
+        if rng.random() < site_typo_rate:
+            site = _typo(rng, site)
+
+        row = {
+            "source_row_id": str(i + 1),
+            "ip": rng.choice(BAD_IPS) if rng.random() < bad_ip_rate else _ip(rng),
+            "hostname": hostname,
+            "fqdn": fqdn,
+            "mac": rng.choice(BAD_MACS) if rng.random() < bad_mac_rate else _mac(rng),
+            "owner": _owner(rng),
+            "device_type": rng.choice(DEVICE_TYPES),
+            "site": site,
+            "notes": rng.choice(NOTES),
+        }
+        if rng.random() < fallback_rate:
+            field = rng.choice(list(FALLBACK_VALUES))
+            row[field] = FALLBACK_VALUES[field](rng.randrange(fallback_distinct))
+
+        if len(recent) < 1000:
+            recent.append(row)
+        else:
+            recent[rng.randrange(1000)] = row
+        yield row
+
+
+def write_inventory(path, rows, **options):
+    """Write generate_rows(rows, **options) to path as CSV."""
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(generate_rows(rows, **options))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_csv")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    parser.add_argument("--bad-ip-rate", type=float, default=0.1)
+    parser.add_argument("--bad-mac-rate", type=float, default=0.1)
+    parser.add_argument("--site-typo-rate", type=float, default=0.05)
+    parser.add_argument("--fallback-rate", type=float, default=0.05)
+    parser.add_argument("--fallback-distinct", type=int, default=1000)
+    args = parser.parse_args()
+
+    write_inventory(args.out_csv, args.rows, seed=args.seed,
+                    duplicate_rate=args.duplicate_rate, bad_ip_rate=args.bad_ip_rate,
+                    bad_mac_rate=args.bad_mac_rate, site_typo_rate=args.site_typo_rate,
+                    fallback_rate=args.fallback_rate, fallback_distinct=args.fallback_distinct)
+
+
+if __name__ == "__main__":
+    main()
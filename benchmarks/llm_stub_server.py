@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Local stub LLM endpoint speaking llm_utils.HTTPBackend's protocol.
+Answers every value with the template's "unknown" answer and counts calls
+and (estimated) tokens, so fallback savings can be measured offline.
+Can inject latency, HTTP 503 errors and dropped connections.
+
+Usage: python benchmarks/llm_stub_server.py [--port 8765] [--latency S]
+           [--jitter S] [--error-rate F] [--drop-rate F]
+Stats: GET /stats
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_fallback import estimate_tokens  # noqa: E402
+
+STUB_ANSWERS = {
+    "owner": {"owner": "unknown", "owner_email": None, "owner_team": "unknown"},
+    "device_type": {"device_type": "unknown", "device_type_confidence": "low"},
+    "site": {"site": "", "site_normalized": "UNKNOWN"},
+}
+
+
+class StubLLMServer:
+    """
+    Threaded stub server; use as a context manager or call start()/stop().
+
+    Each request sleeps latency + uniform(0, jitter) seconds, then fails with
+    HTTP 503 with probability error_rate, or drops the connection without a
+    response with probability drop_rate.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, drop_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.stats = {"calls": 0, "values": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                      "errors": 0, "drops": 0, "max_concurrent": 0}
+        self._rng = random.Random(seed)
+        self._active = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/complete"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, payload, status=200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/stats":
+                    with server._lock:
+                        self._reply(dict(server.stats))
+                else:
+                    self._reply({"error": "not found"}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length))
+                with server._lock:
+                    server._active += 1
+                    server.stats["max_concurrent"] = max(server.stats["max_concurrent"],
+                                                         server._active)
+                    delay = server.latency + server._rng.uniform(0, server.jitter)
+                    roll = server._rng.random()
+                try:
+                    time.sleep(delay)
+                    if roll < server.drop_rate:
+                        with server._lock:
+                            server.stats["drops"] += 1
+                        self.close_connection = True
+                        return
+                    if roll < server.drop_rate + server.error_rate:
+                        with server._lock:
+                            server.stats["errors"] += 1
+                        self._reply({"error": "injected failure"}, 503)
+                        return
+                    self._answer(request)
+                finally:
+                    with server._lock:
+                        server._active -= 1
+
+            def _answer(self, request):
+                field, count = request["field"], request["count"]
+                completion = json.dumps([STUB_ANSWERS[field]] * count)
+                with server._lock:
+                    server.stats["calls"] += 1
+                    server.stats["values"] += count
+                    server.stats["prompt_tokens"] += estimate_tokens(request["prompt"])
+                    server.stats["completion_tokens"] += estimate_tokens(completion)
+                self._reply({"completion": completion})
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction dropped")
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, drop_rate=args.drop_rate)
+    print(f"Stub LLM endpoint at {server.url} (stats at /stats)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
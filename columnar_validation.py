@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Columnar batch validation of the ip and mac fields.
+Validates a whole column chunk at once with NumPy byte-array operations and
+returns exactly what the scalar validators would: ipv4_parse and
+validate_mac_value remain the reference implementations, and values the
+byte path does not cover (non-ASCII, NUL bytes, very long strings, non-str
+values) are handed to them one by one. Without NumPy, or for small batches,
+everything goes through the scalar code.
+"""
+
+from run_ipv4_validation import ipv4_format, ipv4_parse
+from run_mac_validator import validate_mac_value
+from step_codes import MAC_NORMALIZED, MAC_TRIMMED
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+# Values per NumPy pass; bounds the size of the temporary byte matrices
+DEFAULT_COLUMN_CHUNK = 65536
+# Below this many values the scalar validators are faster
+MIN_COLUMN_BATCH = 64
+# Longer values take the scalar path
+_MAX_WIDTH = 48
+
+# Characters str.strip() removes within ASCII
+_ASCII_WHITESPACE = b" \t\n\x0b\x0c\r\x1c\x1d\x1e\x1f"
+
+# IPv4 reason codes by index; 0 is success
+_IP_REASONS = (
+    "ok",
+    "empty_octet",
+    "non_numeric_or_negative",
+    "non_decimal_format",
+    "octet_out_of_range",
+    "wrong_part_count",
+    "ipv6_or_non_ipv4",
+)
+_IP_WRONG_PART_COUNT = 5
+_IP_IPV6 = 6
+# Decided by the scalar validator instead
+_IP_SCALAR = -1
+_IP_FAILURES = [(False, None, reason, None) for reason in _IP_REASONS]
+
+# MAC outcomes by index; 0 is success
+_MAC_ISSUES = (None, "mac_missing", "mac_mixed_delimiters", "mac_wrong_length", "mac_invalid_chars")
+_MAC_MISSING = 1
+
+if np is not None:
+    _IS_WHITESPACE = np.zeros(256, dtype=bool)
+    _IS_WHITESPACE[list(_ASCII_WHITESPACE)] = True
+    _IS_DIGIT = np.zeros(256, dtype=bool)
+    _IS_DIGIT[ord("0"):ord("9") + 1] = True
+    _IS_HEX = _IS_DIGIT.copy()
+    _IS_HEX[ord("a"):ord("f") + 1] = True
+    _IS_HEX[ord("A"):ord("F") + 1] = True
+    _UPPER = np.arange(256, dtype=np.uint8)
+    _UPPER[ord("a"):ord("z") + 1] -= 32
+
+
+# ---------------------------------------------------------------------------
+# Byte matrix helpers
+# ---------------------------------------------------------------------------
+
+def _byte_path_ok(value):
+    return type(value) is str and value.isascii() and len(value) <= _MAX_WIDTH and "\0" not in value
+
+
+def _split_by_path(values):
+    """Return (indexes for the byte path, indexes for the scalar path)."""
+    fast, slow = [], []
+    for i, v in enumerate(values):
+        (fast if _byte_path_ok(v) else slow).append(i)
+    return fast, slow
+
+
+def _byte_matrix(strings):
+    """
+    Pack ASCII strings into an (n, width) uint8 matrix.
+    Returns (matrix, inside, start, end, lengths, has_content): inside marks
+    the bytes left by str.strip(), [start, end) is that span per row and
+    has_content is False for empty or all-whitespace values.
+    """
+    width = max(1, max(map(len, strings)))
+    matrix = np.array([s.encode("ascii") for s in strings], dtype=f"S{width}")
+    matrix = matrix.view(np.uint8).reshape(len(strings), width)
+    positions = np.arange(width)
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+
+    content = (positions < lengths[:, None]) & ~_IS_WHITESPACE[matrix]
+    has_content = content.any(axis=1)
+    start = content.argmax(axis=1)
+    end = width - content[:, ::-1].argmax(axis=1)
+    trimmed = (positions >= start[:, None]) & (positions < end[:, None]) & has_content[:, None]
+    return matrix, trimmed, start, end, lengths, has_content
+
+
+def _chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+# ---------------------------------------------------------------------------
+# IPv4
+# ---------------------------------------------------------------------------
+
+def _ipv4_codes(strings):
+    """
+    Return (reason codes, packed addresses, zero-padded flags) for ASCII strings.
+    Valid values without zero-padded octets are already canonical once
+    stripped. Only the whole-value rejects and the common shape (four runs of 1-3
+    digits separated by dots) are decided here; anything else gets code
+    _IP_SCALAR and is left to ipv4_parse.
+    """
+    matrix, inside, start, end, _, _ = _byte_matrix(strings)
+    n = len(strings)
+
+    is_colon = (inside & (matrix == ord(":"))).any(axis=1)
+    dots = inside & (matrix == ord("."))
+    n_dots = dots.sum(axis=1)
+    plain = ~(inside & ~dots & ~_IS_DIGIT[matrix]).any(axis=1)
+
+    codes = np.full(n, _IP_SCALAR, dtype=np.int8)
+    codes[n_dots != 3] = _IP_WRONG_PART_COUNT
+    codes[is_colon] = _IP_IPV6
+    packed = np.zeros(n, dtype=np.int64)
+    padded = np.zeros(n, dtype=bool)
+
+    rows = np.flatnonzero(~is_colon & (n_dots == 3) & plain)
+    if len(rows) == 0:
+        return codes, packed, padded
+    # Row-major nonzero() lists each row's three dot columns in order
+    dot_cols = np.nonzero(dots[rows])[1].reshape(-1, 3)
+    bounds = np.column_stack([start[rows] - 1, dot_cols, end[rows]])
+    lengths = np.diff(bounds, axis=1) - 1
+    shaped = ((lengths >= 1) & (lengths <= 3)).all(axis=1)
+
+    rows, bounds, lengths = rows[shaped], bounds[shaped], lengths[shaped]
+    digits = matrix[rows].astype(np.int64) - ord("0")
+    values = np.zeros((len(rows), 4), dtype=np.int64)
+    # Add the ones, tens and hundreds digit of every octet
+    for place, weight in enumerate((1, 10, 100)):
+        column = np.maximum(bounds[:, 1:] - 1 - place, 0)
+        present = lengths > place
+        values += np.where(present, np.take_along_axis(digits, column, axis=1) * weight, 0)
+
+    leading = np.take_along_axis(digits, bounds[:, :4] + 1, axis=1)
+    codes[rows] = np.where((values > 255).any(axis=1), 4, 0)
+    packed[rows] = (values[:, 0] << 24) | (values[:, 1] << 16) | (values[:, 2] << 8) | values[:, 3]
+    padded[rows] = ((leading == 0) & (lengths > 1)).any(axis=1)
+    return codes, packed, padded
+
+
+def ipv4_validate_batch(values, chunk_size=DEFAULT_COLUMN_CHUNK):
+    """
+    Validate a column of raw ip values.
+    Returns [(valid, canonical, reason, packed), ...] matching ipv4_parse.
+    """
+    if np is None or len(values) < MIN_COLUMN_BATCH:
+        return [ipv4_parse(v) for v in values]
+
+    results = [None] * len(values)
+    fast, slow = _split_by_path(values)
+    for i in slow:
+        results[i] = ipv4_parse(values[i])
+    for indexes in _chunks(fast, chunk_size):
+        codes, packed, padded = _ipv4_codes([values[i] for i in indexes])
+        for i, code, address in zip(indexes, codes.tolist(), packed.tolist()):
+            if code == 0:
+                results[i] = (True, values[i].strip(), "ok", address)
+            elif code == _IP_SCALAR:
+                results[i] = ipv4_parse(values[i])
+            else:
+                results[i] = _IP_FAILURES[code]
+        for j in np.flatnonzero(padded).tolist():
+            if codes[j] == 0:
+                address = int(packed[j])
+                results[indexes[j]] = (True, ipv4_format(address), "ok", address)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# MAC
+# ---------------------------------------------------------------------------
+
+def _mac_codes(strings):
+    """Return (issue codes, trimmed flags, canonical MACs) for ASCII strings."""
+    matrix, inside, start, end, lengths, has_content = _byte_matrix(strings)
+
+    colons = inside & (matrix == ord(":"))
+    dashes = inside & (matrix == ord("-"))
+    dots = inside & (matrix == ord("."))
+    delimiters = colons | dashes | dots
+    kinds = colons.any(axis=1).astype(np.int8) + dashes.any(axis=1) + dots.any(axis=1)
+    payload = inside & ~delimiters
+    n_payload = payload.sum(axis=1)
+    all_hex = ~(payload & ~_IS_HEX[matrix]).any(axis=1)
+
+    codes = np.select(
+        [~has_content, kinds > 1, n_payload != 12, ~all_hex],
+        [1, 2, 3, 4],
+        default=0,
+    ).astype(np.int8)
+    trimmed_flags = has_content & ((start > 0) | (end < lengths))
+
+    # Gather the 12 hex digits of each valid row into AA:BB:CC:DD:EE:FF
+    canonical = [None] * len(strings)
+    ok = np.flatnonzero(codes == 0)
+    if len(ok):
+        # Each valid row has exactly 12 payload bytes, listed in row order
+        hex_digits = _UPPER[matrix[ok][payload[ok]]].reshape(-1, 12)
+        out = np.full((len(ok), 17), ord(":"), dtype=np.uint8)
+        out[:, [0, 1, 3, 4, 6, 7, 9, 10, 12, 13, 15, 16]] = hex_digits
+        for i, mac in zip(ok.tolist(), out.view("S17").ravel().tolist()):
+            canonical[i] = mac.decode("ascii")
+    return codes, trimmed_flags, canonical
+
+
+def _mac_scalar(raw):
+    anomalies, steps = [], []
+    result = validate_mac_value(raw, anomalies, steps)
+    return result, anomalies, steps
+
+
+def mac_validate_batch(values, chunk_size=DEFAULT_COLUMN_CHUNK):
+    """
+    Validate a column of raw mac values.
+    Returns [(result, anomalies, normalization_steps), ...], i.e. what
+    validate_mac_value returns and appends for each value.
+    """
+    if np is None or len(values) < MIN_COLUMN_BATCH:
+        return [_mac_scalar(v) for v in values]
+
+    results = [None] * len(values)
+    fast, slow = _split_by_path(values)
+    for i in slow:
+        results[i] = _mac_scalar(values[i])
+    for indexes in _chunks(fast, chunk_size):
+        codes, trimmed_flags, canonical = _mac_codes([values[i] for i in indexes])
+        for j, (i, code, trimmed) in enumerate(zip(indexes, codes.tolist(), trimmed_flags.tolist())):
+            raw = values[i]
+            if code == _MAC_MISSING:
+                results[i] = (("", False), [{"field": "mac", "type": "mac_missing"}], [])
+                continue
+            steps = [MAC_TRIMMED] if trimmed else []
+            if code:
+                results[i] = ((raw, False),
+                              [{"field": "mac", "type": _MAC_ISSUES[code], "value": raw}], steps)
+            else:
+                steps.append((MAC_NORMALIZED, canonical[j]))
+                results[i] = ((canonical[j], True), [], steps)
+    return results
+
+
+def validate_ip_mac_columns(rows):
+    """
+    Validate the ip and mac columns of a list of row_record.RawRows in one
+    pass each. Returns [(ip_outcome, mac_outcome), ...] for _run_validators
+    in run.py.
+    """
+    ip_outcomes = ipv4_validate_batch([row.ip for row in rows])
+    mac_outcomes = mac_validate_batch([row.mac for row in rows])
+    return list(zip(ip_outcomes, mac_outcomes))
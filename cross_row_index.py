@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Cross-row duplicate and conflict checks.
+The validators see one row at a time; this index sees every clean row, in
+input order, as run.process writes it. It remembers the first row for each
+valid IP, MAC and hostname and flags later rows that reuse an IP, bind a
+MAC to a different hostname, or point a hostname at a different IP. Each
+row costs a few hash lookups, so a run stays O(n). SpilledCrossRowIndex
+keeps the same tables in a scratch SQLite file when they do not fit in
+memory.
+"""
+
+import os
+import sqlite3
+
+from row_record import CLEAN_INDEX
+from run_ipv4_validation import ipv4_format, ipv4_pack
+
+CROSS_ROW_ANOMALY_TYPES = ("duplicate_ip", "mac_hostname_conflict", "hostname_ip_conflict")
+
+RECOMMENDED_ACTIONS = ["Review and correct flagged fields"]
+
+# Clean row columns read by the checks
+_IP, _IP_VALID, _MAC, _MAC_VALID, _HOSTNAME, _HOSTNAME_VALID, _ROW_ID = (
+    CLEAN_INDEX[name] for name in ("ip", "ip_valid", "mac", "mac_valid", "hostname",
+                                   "hostname_valid", "source_row_id")
+)
+
+
+def row_keys(clean_row):
+    """
+    Index keys of a clean row (a list in row_record.CORE_FIELDS order):
+    (packed ip, packed mac, hostname), with None for any value that did not
+    validate.
+    """
+    ip = ipv4_pack(clean_row[_IP]) if clean_row[_IP_VALID] == "true" else None
+    mac = int(clean_row[_MAC].replace(":", ""), 16) if clean_row[_MAC_VALID] == "true" else None
+    hostname = clean_row[_HOSTNAME] if clean_row[_HOSTNAME_VALID] == "true" else None
+    return ip, mac, hostname
+
+
+class CrossRowIndex:
+    """
+    In-memory index: packed IP → first row id, packed MAC → (hostname,
+    first row id), hostname → (packed IP, first row id).
+
+    check_block() takes one batch of run.process's (clean_row,
+    anomaly_record) results, in input order, and adds the cross-row issues
+    to each row's anomaly record, creating one for rows that had none. Only
+    later rows are flagged; each issue names the first row that used the
+    value.
+    """
+
+    def __init__(self):
+        self.ips = {}
+        self.macs = {}
+        self.hostnames = {}
+        self.counters = dict.fromkeys(CROSS_ROW_ANOMALY_TYPES, 0)
+
+    def check_block(self, block):
+        keys = [row_keys(clean_row) for clean_row, _ in block]
+        return self._check(block, keys, self.ips, self.macs, self.hostnames)
+
+    def _check(self, block, keys, ips, macs, hostnames):
+        """Check rows against (and add them to) the given ip, mac and hostname tables."""
+        checked = []
+        for (clean_row, anomaly_record), (ip, mac, hostname) in zip(block, keys):
+            row_id = clean_row[_ROW_ID]
+            issues = []
+            if ip is not None:
+                # Rows can share a source_row_id (or have none), so any
+                # later occurrence of the IP is a duplicate
+                if ip in ips:
+                    issues.append({"field": "ip", "type": "duplicate_ip",
+                                   "value": clean_row[_IP], "first_source_row_id": ips[ip]})
+                else:
+                    ips[ip] = row_id
+            if mac is not None and hostname is not None:
+                first = macs.setdefault(mac, (hostname, row_id))
+                if first[0] != hostname:
+                    issues.append({"field": "mac", "type": "mac_hostname_conflict",
+                                   "value": clean_row[_MAC], "hostname": hostname,
+                                   "first_hostname": first[0], "first_source_row_id": first[1]})
+            if hostname is not None and ip is not None:
+                first = hostnames.setdefault(hostname, (ip, row_id))
+                if first[0] != ip:
+                    issues.append({"field": "hostname", "type": "hostname_ip_conflict",
+                                   "value": hostname, "ip": clean_row[_IP],
+                                   "first_ip": ipv4_format(first[0]),
+                                   "first_source_row_id": first[1]})
+            if issues:
+                for issue in issues:
+                    self.counters[issue["type"]] += 1
+                if anomaly_record is None:
+                    anomaly_record = {"source_row_id": row_id, "issues": issues,
+                                      "recommended_actions": list(RECOMMENDED_ACTIONS)}
+                else:
+                    anomaly_record["issues"].extend(issues)
+            checked.append((clean_row, anomaly_record))
+        return checked
+
+    def close(self):
+        pass
+
+
+_SPILL_SCHEMA = """
+DROP TABLE IF EXISTS ips;
+DROP TABLE IF EXISTS macs;
+DROP TABLE IF EXISTS hostnames;
+CREATE TABLE ips (ip INTEGER PRIMARY KEY, row_id TEXT NOT NULL);
+CREATE TABLE macs (mac INTEGER PRIMARY KEY, hostname TEXT NOT NULL, row_id TEXT NOT NULL);
+CREATE TABLE hostnames (
+    hostname TEXT PRIMARY KEY, ip INTEGER NOT NULL, row_id TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# SQLite's default limit on host parameters per statement is 999
+_LOOKUP_CHUNK = 500
+
+
+class SpilledCrossRowIndex(CrossRowIndex):
+    """
+    CrossRowIndex whose tables live in a scratch SQLite file at `path`.
+
+    Each block's keys are looked up in one query per table, checked with the
+    same rules as the in-memory index, and the values seen for the first
+    time are inserted in one transaction. cache_kib bounds SQLite's page
+    cache. The file is recreated on open and deleted by close().
+    """
+
+    def __init__(self, path, cache_kib=65536):
+        super().__init__()
+        self.path = str(path)
+        self._conn = sqlite3.connect(self.path)
+        # Scratch data: no journal, no fsync
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(f"PRAGMA cache_size=-{int(cache_kib)}")
+        self._conn.executescript(_SPILL_SCHEMA)
+
+    def _lookup(self, sql, keys):
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[start:start + _LOOKUP_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for key, *value in self._conn.execute(sql.format(marks), chunk):
+                found[key] = value[0] if len(value) == 1 else tuple(value)
+        return found
+
+    def check_block(self, block):
+        keys = [row_keys(clean_row) for clean_row, _ in block]
+        ips = self._lookup("SELECT ip, row_id FROM ips WHERE ip IN ({})",
+                           {ip for ip, _, _ in keys if ip is not None})
+        macs = self._lookup("SELECT mac, hostname, row_id FROM macs WHERE mac IN ({})",
+                            {mac for _, mac, hostname in keys
+                             if mac is not None and hostname is not None})
+        hostnames = self._lookup(
+            "SELECT hostname, ip, row_id FROM hostnames WHERE hostname IN ({})",
+            {hostname for ip, _, hostname in keys if hostname is not None and ip is not None},
+        )
+        known = (set(ips), set(macs), set(hostnames))
+        checked = self._check(block, keys, ips, macs, hostnames)
+        with self._conn:
+            self._conn.executemany("INSERT INTO ips VALUES (?, ?)",
+                                   [(k, v) for k, v in ips.items() if k not in known[0]])
+            self._conn.executemany("INSERT INTO macs VALUES (?, ?, ?)",
+                                   [(k, *v) for k, v in macs.items() if k not in known[1]])
+            self._conn.executemany("INSERT INTO hostnames VALUES (?, ?, ?)",
+                                   [(k, *v) for k, v in hostnames.items() if k not in known[2]])
+        return checked
+
+    def close(self):
+        if self._conn is None:
+            return
+        self._conn.close()
+        self._conn = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
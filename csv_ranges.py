@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped CSV input split into independently parseable byte ranges.
+Lets --workers processes read their own share of a large input instead of
+receiving rows from a single reader. Cut points are placed at equal byte
+offsets and moved forward to the next record boundary: the first newline
+outside a quoted field. Whether an offset lies inside quotes follows from
+the parity of the quote characters before it, so the quotes of each
+segment are counted (in parallel with workers > 1) and summed.
+
+Assumes RFC 4180 quoting, as csv.writer produces it: a quote character
+only appears inside a quoted field, doubled when escaped. The encoding must
+be ASCII-compatible (UTF-8, Latin-1, ...) so that a newline byte is always
+a newline.
+"""
+
+import csv
+import io
+import math
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+
+QUOTE = b'"'
+NEWLINE = b"\n"
+
+# Bytes counted per slice, so a segment is never copied whole
+_COUNT_BLOCK = 1 << 23
+# Leading data bytes sampled to estimate the mean record size
+_SAMPLE_BYTES = 1 << 20
+
+
+def _open_map(path):
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def record_boundary(mm, pos, in_quotes=False):
+    """
+    Offset of the first record start at or after pos, where in_quotes says
+    whether pos lies inside a quoted field. Returns len(mm) at the end.
+    """
+    size = len(mm)
+    while pos < size:
+        if in_quotes:
+            quote = mm.find(QUOTE, pos)
+            if quote < 0:
+                return size
+            pos, in_quotes = quote + 1, False
+        else:
+            newline = mm.find(NEWLINE, pos)
+            if newline < 0:
+                return size
+            quote = mm.find(QUOTE, pos, newline)
+            if quote < 0:
+                return newline + 1
+            pos, in_quotes = quote + 1, True
+    return size
+
+
+def count_quotes(path, start, end):
+    """Number of quote characters in bytes [start, end) of path."""
+    mm = _open_map(path)
+    if mm is None:
+        return 0
+    with mm:
+        return sum(mm[a:min(a + _COUNT_BLOCK, end)].count(QUOTE)
+                   for a in range(start, end, _COUNT_BLOCK))
+
+
+class MappedCSV:
+    """
+    A CSV file mapped read-only into memory.
+
+    data_start is the offset just past the header record. split() and
+    split_by_rows() return [(start, end), ...] byte ranges that tile the
+    data records in order; each starts at a record boundary, so
+    parse_range() can read any of them on its own.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._mm = _open_map(self.path)
+        self.size = len(self._mm) if self._mm is not None else 0
+        self.data_start = record_boundary(self._mm, 0) if self._mm is not None else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def split(self, n, workers=1):
+        """At most n record-aligned ranges of roughly equal size."""
+        start, size = self.data_start, self.size
+        if start >= size:
+            return []
+        n = max(1, min(n, size - start))
+        cuts = [start + (size - start) * k // n for k in range(n + 1)]
+        segments = list(zip(cuts, cuts[1:-1]))
+        if workers > 1 and len(segments) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                counts = list(pool.map(count_quotes, [self.path] * len(segments),
+                                       *zip(*segments)))
+        else:
+            counts = [count_quotes(self.path, a, b) for a, b in segments]
+
+        bounds = [start]
+        quotes = 0
+        for (_, cut), count in zip(segments, counts):
+            quotes += count
+            bounds.append(max(bounds[-1], record_boundary(self._mm, cut, quotes % 2 == 1)))
+        bounds.append(size)
+        return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+    def split_by_rows(self, rows_per_range, workers=1):
+        """Ranges of about rows_per_range records each, sized from a sample."""
+        start, size = self.data_start, self.size
+        if start >= size:
+            return []
+        sample = self._mm[start:start + _SAMPLE_BYTES]
+        row_bytes = len(sample) / max(1, sample.count(NEWLINE))
+        return self.split(math.ceil((size - start) / (rows_per_range * row_bytes)), workers)
+
+
+def parse_range(path, start, end):
+    """
+    csv.reader over bytes [start, end) of path, decoded as open() would
+    with newline="". Only this range is read.
+    """
+    mm = _open_map(path)
+    data = b""
+    if mm is not None:
+        with mm:
+            data = mm[start:end]
+    return csv.reader(io.TextIOWrapper(io.BytesIO(data), newline=""))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Bounded LRU memoization for the deterministic field parsers.
+Inventories repeat the same site/device_type/owner strings across many rows,
+so parse results are cached per raw value and their normalization steps are
+replayed on every hit.
+"""
+
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 4096
+
+_CACHES = {}
+
+
+class FieldCache:
+    """
+    LRU cache for one deterministic parser, keyed on the raw field value.
+
+    Each entry holds the parser's return value and the normalization steps it
+    appended, so a hit extends the caller's step list exactly as a fresh parse
+    would. The deterministic parsers emit no anomalies themselves; anything
+    they record goes through the step list. The parsers accept notes but do
+    not read them, so the raw value alone is a safe key. maxsize=0 disables
+    caching.
+    """
+
+    def __init__(self, name, maxsize=DEFAULT_CACHE_SIZE):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def parse(self, parse_fn, raw, notes, steps):
+        entry = self._entries.get(raw)
+        if entry is not None:
+            self._entries.move_to_end(raw)
+            self.hits += 1
+            result, cached_steps = entry
+            steps.extend(cached_steps)
+            return result
+
+        self.misses += 1
+        new_steps = []
+        result = parse_fn(raw, notes, new_steps)
+        steps.extend(new_steps)
+        if self.maxsize > 0:
+            self._entries[raw] = (result, tuple(new_steps))
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        while len(self._entries) > max(maxsize, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def counters(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+def register_field_cache(name):
+    """Create (or return) the named cache shared by a validator module."""
+    if name not in _CACHES:
+        _CACHES[name] = FieldCache(name)
+    return _CACHES[name]
+
+
+def configure_field_caches(maxsize):
+    """Resize every registered cache; 0 disables memoization."""
+    for cache in _CACHES.values():
+        cache.resize(maxsize)
+
+
+def clear_field_caches():
+    for cache in _CACHES.values():
+        cache.clear()
+
+
+def field_cache_counters():
+    """Snapshot of {cache name: {hits, misses, evictions}}."""
+    return {name: cache.counters() for name, cache in _CACHES.items()}
+
+
+def diff_counters(after, before):
+    """Per-cache counter deltas between two field_cache_counters() snapshots."""
+    return {
+        name: {k: v - before.get(name, {}).get(k, 0) for k, v in counters.items()}
+        for name, counters in after.items()
+    }
+
+
+def merge_counters(total, delta):
+    """Add one field_cache_counters()-shaped dict into another in place."""
+    for name, counters in delta.items():
+        slot = total.setdefault(name, {"hits": 0, "misses": 0, "evictions": 0})
+        for k, v in counters.items():
+            slot[k] += v
+    return total
+
+
+def format_counters(counters):
+    """One summary line per cache, for the end-of-run report."""
+    lines = []
+    for name, c in counters.items():
+        lookups = c["hits"] + c["misses"]
+        rate = c["hits"] / lookups if lookups else 0.0
+        lines.append(
+            f"field cache {name}: hits={c['hits']} misses={c['misses']} "
+            f"evictions={c['evictions']} hit_rate={rate:.1%}"
+        )
+    return lines
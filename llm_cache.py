@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Persistent LLM fallback answer cache.
+A single SQLite file maps (backend, field, template hash, normalized input)
+to the JSON answer a backend returned, so reruns only ask about values they
+have never seen. The backend is its kind and base URL, so answers from
+different endpoints serving the same model name are never mixed. Entries expire after a TTL, the least recently used ones are
+evicted beyond max_entries, and entries written under an older version of
+a field's prompt template are dropped when the cache is opened.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from llm_fallback import FALLBACK_FIELDS
+from prompt_templates import BATCH_PROMPT_SUFFIX
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    backend TEXT NOT NULL,
+    field TEXT NOT NULL,
+    template_hash TEXT NOT NULL,
+    input_key TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (backend, field, template_hash, input_key)
+);
+CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used);
+"""
+
+# SQLite's default limit on host parameters per statement is 999
+_LOOKUP_CHUNK = 500
+
+
+def backend_key(backend):
+    """The kind and base URL of an LLM backend, the cache key's backend part."""
+    kind = type(backend)
+    return f"{kind.__module__}.{kind.__qualname__} {getattr(backend, 'url', '')}"
+
+
+def template_hash(template):
+    """Version fingerprint of a field's prompt: its template plus the batch suffix."""
+    return hashlib.sha256((template + BATCH_PROMPT_SUFFIX).encode()).hexdigest()[:16]
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed answer cache, shared by every process that opens `path`.
+
+    Lookups and stores for a field use the hash of its prompt template
+    (from llm_fallback.FALLBACK_FIELDS unless `templates` maps field →
+    template). ttl is in seconds (None keeps entries until they are
+    evicted); max_entries bounds the table (None for no bound).
+
+    The connection is opened lazily per process, so the cache can be handed
+    to --workers processes like the LLM backends.
+    """
+
+    def __init__(self, path, ttl=None, max_entries=DEFAULT_MAX_ENTRIES, templates=None):
+        self.path = str(path)
+        if templates is None:
+            templates = {field: spec[0] for field, spec in FALLBACK_FIELDS.items()}
+        self.templates = dict(templates)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._hashes = {field: template_hash(t) for field, t in self.templates.items()}
+        self._conn = None
+        self._pid = None
+
+    def __getstate__(self):
+        return {"path": self.path, "templates": self.templates, "ttl": self.ttl,
+                "max_entries": self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _connection(self):
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self.path, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(answers)")}
+        if columns and "backend" not in columns:
+            # Written before answers were keyed by backend; whose they are is unknown
+            with self._conn:
+                self._conn.execute("DROP TABLE answers")
+        self._conn.executescript(_SCHEMA)
+        self._drop_stale()
+        return self._conn
+
+    def _drop_stale(self):
+        """Remove entries from other template versions and expired entries."""
+        with self._conn:
+            for field, digest in self._hashes.items():
+                self._conn.execute(
+                    "DELETE FROM answers WHERE field = ? AND template_hash != ?", (field, digest)
+                )
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM answers WHERE created < ?",
+                                   (time.time() - self.ttl,))
+
+    def get_many(self, backend, field, keys):
+        """Return {input_key: answer dict} for the keys backend answered for `field`."""
+        conn = self._connection()
+        source = backend_key(backend)
+        digest = self._hashes[field]
+        now = time.time()
+        oldest = now - self.ttl if self.ttl is not None else float("-inf")
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[start:start + _LOOKUP_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT input_key, answer FROM answers WHERE backend = ? AND field = ? "
+                f"AND template_hash = ? AND created >= ? AND input_key IN ({marks})",
+                (source, field, digest, oldest, *chunk),
+            ).fetchall()
+            found.update((key, json.loads(answer)) for key, answer in rows)
+        if found:
+            with conn:
+                conn.executemany(
+                    "UPDATE answers SET last_used = ? "
+                    "WHERE backend = ? AND field = ? AND template_hash = ? AND input_key = ?",
+                    [(now, source, field, digest, key) for key in found],
+                )
+        return found
+
+    def put_many(self, backend, field, items):
+        """
+        Store (input_key, answer dict) pairs backend returned for `field`,
+        then evict if over max_entries.
+        """
+        conn = self._connection()
+        source = backend_key(backend)
+        digest = self._hashes[field]
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(source, field, digest, key, json.dumps(answer, sort_keys=True), now, now)
+                 for key, answer in items],
+            )
+            if self.max_entries is not None:
+                conn.execute(
+                    "DELETE FROM answers WHERE rowid IN (SELECT rowid FROM answers "
+                    "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM answers")
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
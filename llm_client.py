@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Asyncio client layer for the LLM fallback stage.
+A pooled keep-alive HTTP/1.1 client with an in-flight limit, token-bucket
+rate limiting, per-attempt timeouts and jittered exponential retries, plus
+AsyncHTTPBackend, which runs it on a background event loop so the row
+pipeline keeps validating while fallback requests are in flight.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from llm_utils import LLMBackend, LLMBackendError
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.25
+DEFAULT_BACKOFF_MAX = 10.0
+
+# Statuses worth retrying; anything else >= 400 fails immediately
+_RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class _RetryableError(Exception):
+    pass
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` requests per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncLLMClient:
+    """
+    JSON-over-HTTP client for one endpoint, speaking HTTPBackend's protocol.
+
+    Connections are reused across requests (HTTP/1.1 keep-alive) and at most
+    max_in_flight requests run at once. Each attempt is bounded by timeout;
+    connection errors, timeouts, malformed responses and 408/425/429/5xx
+    responses are retried up to max_retries times with full-jitter
+    exponential backoff, then raise LLMBackendError.
+    """
+
+    def __init__(self, url, max_in_flight=DEFAULT_MAX_IN_FLIGHT, rate=None, burst=None,
+                 timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX,
+                 headers=None):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        self.url = url
+        self._host = parts.hostname
+        self._port = parts.port or (443 if parts.scheme == "https" else 80)
+        self._ssl = parts.scheme == "https"
+        self._path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._headers = dict(headers or {})
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._rate = rate
+        self._burst = burst
+        # Created lazily so they bind to the loop the client runs on
+        self._semaphore = None
+        self._bucket = None
+        self._idle = deque()
+        self.stats = {"requests": 0, "attempts": 0, "retries": 0, "failures": 0,
+                      "timeouts": 0, "connections_opened": 0}
+
+    def _ensure_primitives(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            if self._rate:
+                self._bucket = TokenBucket(self._rate, self._burst)
+
+    async def complete(self, field, prompt, count):
+        """Send one fallback request and return the completion text."""
+        self._ensure_primitives()
+        body = json.dumps({"field": field, "count": count, "prompt": prompt}).encode()
+        self.stats["requests"] += 1
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+                self.stats["attempts"] += 1
+                try:
+                    payload = await asyncio.wait_for(self._post(body), self.timeout)
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, _RetryableError,
+                        ConnectionError, OSError) as e:
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.stats["timeouts"] += 1
+                    if attempt == self.max_retries:
+                        self.stats["failures"] += 1
+                        raise LLMBackendError(f"{self.url}: giving up after "
+                                              f"{attempt + 1} attempts: {e!r}") from e
+                    self.stats["retries"] += 1
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                    await asyncio.sleep(random.uniform(0, delay))
+        completion = payload.get("completion") if isinstance(payload, dict) else None
+        if not isinstance(completion, str):
+            raise LLMBackendError(f"{self.url}: response has no completion text")
+        return completion
+
+    async def _connect(self):
+        while self._idle:
+            reader, writer = self._idle.popleft()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        self.stats["connections_opened"] += 1
+        return await asyncio.open_connection(self._host, self._port, ssl=self._ssl or None)
+
+    async def _post(self, body):
+        reader, writer = await self._connect()
+        try:
+            head = [
+                f"POST {self._path} HTTP/1.1",
+                f"Host: {self._host}:{self._port}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(body)}",
+                "Connection: keep-alive",
+            ]
+            head += [f"{k}: {v}" for k, v in self._headers.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+            status, headers, data = await self._read_response(reader)
+        except BaseException:
+            writer.close()
+            raise
+
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+
+        if status in _RETRY_STATUSES:
+            raise _RetryableError(f"HTTP {status}")
+        if status >= 400:
+            raise LLMBackendError(f"{self.url}: HTTP {status}")
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise LLMBackendError(f"{self.url}: invalid JSON response") from e
+
+    @staticmethod
+    async def _read_response(reader):
+        """
+        (status, headers, body) of one response. A malformed status line,
+        header or chunk size raises _RetryableError, as the connection is
+        unusable after it. Interim 1xx responses are skipped, chunk trailers
+        are consumed, and a body with neither Content-Length nor chunked
+        encoding runs to the end of the connection, which is then closed.
+        """
+        try:
+            return await AsyncLLMClient._parse_response(reader)
+        except (IndexError, ValueError) as e:
+            raise _RetryableError(f"malformed HTTP response: {e!r}") from e
+
+    @staticmethod
+    async def _parse_response(reader):
+        while True:
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionError("connection closed by server")
+            status = int(status_line.split()[1])
+            headers = await AsyncLLMClient._read_fields(reader)
+            if not 100 <= status < 200:
+                break
+            if status == 101:
+                raise ValueError("unexpected 101 Switching Protocols")
+
+        if status in (204, 304):
+            return status, headers, b""
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Trailer fields, up to the blank line ending the message
+                    await AsyncLLMClient._read_fields(reader)
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            return status, headers, b"".join(chunks)
+        if "content-length" in headers:
+            length = int(headers["content-length"])
+            if length < 0:
+                raise ValueError(f"negative Content-Length {length}")
+            return status, headers, await reader.readexactly(length)
+        headers["connection"] = "close"
+        return status, headers, await reader.read()
+
+    @staticmethod
+    async def _read_fields(reader):
+        """Header (or trailer) fields up to the blank line that ends them."""
+        fields = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return fields
+            name, _, value = line.decode("latin-1").partition(":")
+            fields[name.strip().lower()] = value.strip()
+
+    async def aclose(self):
+        while self._idle:
+            _, writer = self._idle.popleft()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+class AsyncHTTPBackend(LLMBackend):
+    """
+    LLMBackend that runs AsyncLLMClient on a background event loop.
+
+    submit() returns a concurrent.futures.Future immediately, which lets
+    FallbackResolver keep validating rows while requests are in flight.
+    The loop thread is started lazily per process, so the backend can be
+    handed to --workers processes.
+    """
+
+    def __init__(self, url, **client_options):
+        self.url = url
+        self.client_options = client_options
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._pid = None
+
+    def __getstate__(self):
+        return {"url": self.url, "client_options": self.client_options}
+
+    def __setstate__(self, state):
+        self.__init__(state["url"], **state["client_options"])
+
+    def _ensure_loop(self):
+        if self._loop is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._loop = asyncio.new_event_loop()
+        self._client = AsyncLLMClient(self.url, **self.client_options)
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True,
+                                        name="llm-client-loop")
+        self._thread.start()
+
+    @property
+    def stats(self):
+        return dict(self._client.stats) if self._client is not None else {}
+
+    def submit(self, field, prompt, count):
+        self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(
+            self._client.complete(field, prompt, count), self._loop
+        )
+
+    def complete(self, field, prompt, count):
+        return self.submit(field, prompt, count).result()
+
+    def close(self):
+        if self._loop is None or self._pid != os.getpid():
+            return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        # The loop must have stopped before it can close its selector
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._thread = None
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Deferred, deduplicated LLM fallback stage.
+Validators hand ambiguous owner/device_type/site values to a FallbackResolver
+instead of prompting row by row. The resolver groups them by normalized input,
+packs many distinct values into one batch prompt per field, and fans each
+answer back out to every row that asked for it.
+"""
+
+import json
+from concurrent.futures import Future
+
+from prompt_templates import (
+    BATCH_PROMPT_SUFFIX,
+    DEVICE_TYPE_PROMPT_TEMPLATE,
+    OWNER_PROMPT_TEMPLATE,
+    SITE_PROMPT_TEMPLATE,
+)
+from llm_utils import (
+    LLMBackendError,
+    PlaceholderBackend,
+    get_llm_placeholder,
+)
+from step_codes import llm_step
+
+# Rows validated before their deferred fallbacks are resolved
+DEFAULT_LLM_BATCH_ROWS = 1000
+# Distinct values packed into a single request
+DEFAULT_VALUES_PER_REQUEST = 50
+
+_CONFIDENCE_LEVELS = ("low", "medium", "high")
+
+
+# Fill a validator's result list ([owner, owner_email, owner_team],
+# [device_type, device_type_confidence] or [site, site_normalized]) in place
+def _apply_owner(result, answer):
+    result[0] = answer.get("owner") or ""
+    result[1] = answer.get("owner_email") or ""
+    result[2] = answer.get("owner_team") or ""
+
+
+def _apply_device_type(result, answer):
+    result[0] = answer.get("device_type") or ""
+    confidence = answer.get("device_type_confidence")
+    result[1] = confidence if confidence in _CONFIDENCE_LEVELS else "low"
+
+
+def _apply_site(result, answer):
+    result[1] = answer.get("site_normalized") or ""
+
+
+# field → (template, prompt log name, input key, output schema, apply function)
+FALLBACK_FIELDS = {
+    "owner": (
+        OWNER_PROMPT_TEMPLATE, "Owner", "owner",
+        {
+            "owner": "<string or 'unknown'>",
+            "owner_email": "<email or null>",
+            "owner_team": "<team or 'unknown'>",
+        },
+        _apply_owner,
+    ),
+    "device_type": (
+        DEVICE_TYPE_PROMPT_TEMPLATE, "Device Type", "device_type",
+        {
+            "device_type": "<canonical type or 'unknown'>",
+            "device_type_confidence": "<low|medium|high>",
+        },
+        _apply_device_type,
+    ),
+    "site": (
+        SITE_PROMPT_TEMPLATE, "Site", "site",
+        {
+            "site": "<trimmed original or ''>",
+            "site_normalized": "<canonical uppercase or 'UNKNOWN'>",
+        },
+        _apply_site,
+    ),
+}
+
+
+def normalize_fallback_key(value):
+    """Dedup key for a fallback input: whitespace-collapsed, lowercased."""
+    if value is None:
+        return ""
+    return " ".join(str(value).split()).lower()
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) for call accounting."""
+    return (len(text) + 3) // 4
+
+
+def build_batch_prompt(field, values):
+    """Render the field's prompt template for a batch of distinct input values."""
+    template, _, input_key, _, _ = FALLBACK_FIELDS[field]
+    row_json = json.dumps([{input_key: v} for v in values], indent=2)
+    prompt = template.format(row_json=row_json, notes="(omitted in batch mode)")
+    return prompt + BATCH_PROMPT_SUFFIX.format(count=len(values))
+
+
+def parse_batch_answers(text, count):
+    """Parse a batch completion into `count` answer dicts, or raise LLMBackendError."""
+    try:
+        answers = json.loads(text)
+    except ValueError as e:
+        raise LLMBackendError(f"completion is not valid JSON: {e}") from e
+    if not isinstance(answers, list) or len(answers) != count:
+        raise LLMBackendError(f"expected a JSON array of {count} answers")
+    if not all(isinstance(a, dict) for a in answers):
+        raise LLMBackendError("every answer must be a JSON object")
+    return answers
+
+
+def new_counters():
+    return {
+        "deferred_rows": 0,
+        "distinct_values": 0,
+        "requests": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "errors": 0,
+        "cache_hits": 0,
+    }
+
+
+class _Group:
+    """One distinct fallback input and the rows waiting on its answer."""
+
+    __slots__ = ("value", "rows")
+
+    def __init__(self, value):
+        self.value = value
+        self.rows = []
+
+
+def _completed(fn, *args):
+    """Run fn now and wrap its outcome in a Future, for backends without submit()."""
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except LLMBackendError as e:
+        future.set_exception(e)
+    return future
+
+
+class FallbackResolver:
+    """
+    Collects deferred fallbacks and resolves them in batches.
+
+    Validators call defer() with the result dict they are about to return and
+    their normalization_steps list; the resolver appends a pending step and,
+    on resolve(), fills in the result fields and replaces that step with the
+    backend's step_label. Rows are only complete after resolve().
+
+    submit() starts the requests for everything deferred so far and returns a
+    Resolution whose wait() applies the answers. A request that fails is
+    answered with placeholders, and the steps lists of its rows are listed
+    in the Resolution's failed attribute. Backends with a submit()
+    method (llm_client.AsyncHTTPBackend) run them in the background, so the
+    caller can keep validating rows in the meantime.
+
+    dedupe=False sends every deferred row as its own value, which is useful
+    as a baseline when measuring call and token savings.
+
+    With a cache (llm_cache.LLMResponseCache), values answered by an earlier
+    request are resolved from it before any batch is built and recorded as
+    "llm_cached"; new answers are stored once they arrive. Backends with
+    cacheable = False (the placeholder) bypass the cache.
+
+    Each batch prompt is logged to prompt_sink (an llm_utils.PromptSink,
+    e.g. get_prompt_sink() for prompts.md); None keeps no prompt log.
+    """
+
+    def __init__(self, backend=None, values_per_request=DEFAULT_VALUES_PER_REQUEST, dedupe=True,
+                 cache=None, prompt_sink=None):
+        self.backend = backend if backend is not None else PlaceholderBackend()
+        self.values_per_request = values_per_request
+        self.dedupe = dedupe
+        self.cache = cache if getattr(self.backend, "cacheable", True) else None
+        self.counters = new_counters()
+        self.prompt_sink = prompt_sink
+        self._pending = {}
+
+    def defer(self, field, value, row_id, result, steps):
+        groups = self._pending.setdefault(field, {})
+        key = normalize_fallback_key(value) if self.dedupe else len(groups)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = _Group("" if value is None else str(value).strip())
+        steps.append(llm_step(field, "llm_pending"))
+        group.rows.append((row_id, result, steps, len(steps) - 1))
+        self.counters["deferred_rows"] += 1
+
+    def resolve(self):
+        self.submit().wait()
+
+    def submit(self):
+        pending, self._pending = self._pending, {}
+        requests = []
+        for field, groups in pending.items():
+            groups = list(groups.values())
+            self.counters["distinct_values"] += len(groups)
+            if self.cache is not None:
+                groups = self._apply_cached(field, groups)
+            for start in range(0, len(groups), self.values_per_request):
+                requests.append(self._start_batch(field, groups[start:start + self.values_per_request]))
+        return Resolution(self, requests)
+
+    def _apply_cached(self, field, groups):
+        """Resolve groups with a cached answer; return the ones still unanswered."""
+        cached = self.cache.get_many(self.backend, field,
+                                     [normalize_fallback_key(g.value) for g in groups])
+        if not cached:
+            return groups
+        apply = FALLBACK_FIELDS[field][4]
+        step = llm_step(field, "llm_cached")
+        misses = []
+        for group in groups:
+            answer = cached.get(normalize_fallback_key(group.value))
+            if answer is None:
+                misses.append(group)
+                continue
+            self.counters["cache_hits"] += 1
+            for _, result, steps, index in group.rows:
+                apply(result, answer)
+                steps[index] = step
+        return misses
+
+    def _start_batch(self, field, groups):
+        _, log_name, _, schema, _ = FALLBACK_FIELDS[field]
+        prompt = build_batch_prompt(field, [g.value for g in groups])
+        row_ids = [row[0] for g in groups for row in g.rows]
+        rationale = (
+            f"{len(groups)} distinct {field} value(s) from {len(row_ids)} row(s) "
+            "could not be resolved by deterministic rules."
+        )
+        if self.prompt_sink is not None:
+            self.prompt_sink.add_rows(log_name, row_ids, prompt, rationale, schema)
+
+        self.counters["requests"] += 1
+        self.counters["prompt_tokens"] += estimate_tokens(prompt)
+        submit = getattr(self.backend, "submit", None)
+        if submit is not None:
+            future = submit(field, prompt, len(groups))
+        else:
+            future = _completed(self.backend.complete, field, prompt, len(groups))
+        return field, groups, future
+
+    def _apply_batch(self, field, groups, future):
+        """Apply a request's answers; returns the steps lists of its rows if it failed."""
+        apply = FALLBACK_FIELDS[field][4]
+        failed = False
+        try:
+            text = future.result()
+            self.counters["completion_tokens"] += estimate_tokens(text)
+            answers = parse_batch_answers(text, len(groups))
+            label = self.backend.step_label
+            if self.cache is not None:
+                self.cache.put_many(self.backend, field, [(normalize_fallback_key(g.value), a)
+                                                          for g, a in zip(groups, answers)])
+        except LLMBackendError:
+            self.counters["errors"] += 1
+            answers = [get_llm_placeholder(field)] * len(groups)
+            label = "llm_error_placeholder"
+            failed = True
+
+        step = llm_step(field, label)
+        for group, answer in zip(groups, answers):
+            for _, result, steps, index in group.rows:
+                apply(result, answer)
+                steps[index] = step
+        if failed:
+            return [steps for group in groups for _, _, steps, _ in group.rows]
+        return []
+
+
+class Resolution:
+    """Requests started by FallbackResolver.submit(); wait() applies their answers."""
+
+    def __init__(self, resolver, requests):
+        self._resolver = resolver
+        self._requests = requests
+        # normalization_steps lists of the rows whose request failed
+        self.failed = []
+
+    def done(self):
+        return all(future.done() for _, _, future in self._requests)
+
+    def wait(self):
+        requests, self._requests = self._requests, []
+        for field, groups, future in requests:
+            self.failed += self._resolver._apply_batch(field, groups, future)
@@ -1,23 +1,40 @@
 #!/usr/bin/env python3
 """
 Assignment-safe LLM utilities.
-No actual LLM calls — logs prompts to prompts.md and returns placeholder values.
+Logs prompts to prompts.md and defines the pluggable backends used by the
+fallback stage. The default backend makes no calls and returns placeholders.
 """
 
+import abc
+import http.client
 import json
+import urllib.error
+import urllib.request
 from pathlib import Path
 
 PROMPTS_MD_PATH = Path(__file__).parent / "TEMPLATES" / "prompts.md"
 
+# Buffered prompt log bytes before an automatic flush to prompts.md
+DEFAULT_PROMPT_BUFFER_BYTES = 4 * 1024 * 1024
+
+_SCHEMA_JSON_CACHE = {}
 
-def append_prompt_to_md(field_name, row_id, prompt, rationale, expected_schema):
-    """
-    Append a structured prompt log entry to prompts.md.
-    """
-    schema_json = json.dumps(expected_schema, indent=2)
 
-    entry = f"""
-### {field_name} Validation — Row {row_id}
+def _schema_json(expected_schema):
+    key = tuple(expected_schema.items())
+    text = _SCHEMA_JSON_CACHE.get(key)
+    if text is None:
+        text = _SCHEMA_JSON_CACHE[key] = json.dumps(expected_schema, indent=2)
+    return text
+
+
+def _render_entry(field_name, row_ids, prompt, rationale, schema_json):
+    if len(row_ids) == 1:
+        heading = f"### {field_name} Validation — Row {row_ids[0]}"
+    else:
+        heading = f"### {field_name} Validation — Rows {', '.join(str(r) for r in row_ids)}"
+    return f"""
+{heading}
 
 **Prompt:**
 ```
@@ -33,8 +50,86 @@ def append_prompt_to_md(field_name, row_id, prompt, rationale, expected_schema):
 ```
 ---
 """
-    with open(PROMPTS_MD_PATH, "a") as f:
-        f.write(entry)
+
+
+class PromptSink:
+    """
+    Buffered, deduplicating writer for the prompts.md log.
+
+    Identical prompts (same field, prompt text, rationale and schema) collapse
+    into one entry listing every row ID that produced them. Entries are kept
+    in first-seen order and appended to prompts.md in a single write when
+    flush() is called or the buffer exceeds max_bytes (None: never flush
+    automatically). Deduplication applies within one buffer window.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_PROMPT_BUFFER_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._entries = {}
+        self._size = 0
+
+    def add(self, field_name, row_id, prompt, rationale, expected_schema):
+        self._add(field_name, [row_id], prompt, rationale, _schema_json(expected_schema))
+
+    def add_rows(self, field_name, row_ids, prompt, rationale, expected_schema):
+        """Log one prompt that was sent on behalf of several rows."""
+        self._add(field_name, list(row_ids), prompt, rationale, _schema_json(expected_schema))
+
+    def _add(self, field_name, row_ids, prompt, rationale, schema_json):
+        key = (field_name, prompt, rationale, schema_json)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = list(row_ids)
+            self._size += len(prompt) + len(rationale) + len(schema_json)
+        else:
+            entry.extend(row_ids)
+        self._size += sum(len(str(r)) + 2 for r in row_ids)
+        if self.max_bytes is not None and self._size >= self.max_bytes:
+            self.flush()
+
+    def drain(self):
+        """Remove and return buffered entries without writing them."""
+        entries = [key + (row_ids,) for key, row_ids in self._entries.items()]
+        self._entries = {}
+        self._size = 0
+        return entries
+
+    def merge(self, entries):
+        """Add entries returned by another sink's drain(), keeping their order."""
+        for field_name, prompt, rationale, schema_json, row_ids in entries:
+            self._add(field_name, row_ids, prompt, rationale, schema_json)
+
+    def flush(self):
+        if not self._entries:
+            return
+        text = "".join(
+            _render_entry(field_name, row_ids, prompt, rationale, schema_json)
+            for field_name, prompt, rationale, schema_json, row_ids in self.drain()
+        )
+        with open(self.path or PROMPTS_MD_PATH, "a") as f:
+            f.write(text)
+
+
+_PROMPT_SINK = PromptSink()
+
+
+def get_prompt_sink():
+    """Return the process-wide sink used by append_prompt_to_md."""
+    return _PROMPT_SINK
+
+
+def append_prompt_to_md(field_name, row_id, prompt, rationale, expected_schema):
+    """
+    Buffer a structured prompt log entry for prompts.md.
+    Call flush_prompts() to write buffered entries.
+    """
+    _PROMPT_SINK.add(field_name, row_id, prompt, rationale, expected_schema)
+
+
+def flush_prompts():
+    """Write all buffered prompt log entries to prompts.md."""
+    _PROMPT_SINK.flush()
 
 
 def get_llm_placeholder(field):
@@ -59,3 +154,69 @@ def get_llm_placeholder(field):
         }
     else:
         raise ValueError(f"Unknown field for LLM placeholder: {field}")
+
+
+# ---------------------------------------------------------------------------
+# Backends for the fallback stage (see llm_fallback.py)
+# ---------------------------------------------------------------------------
+
+class LLMBackendError(Exception):
+    """Raised by a backend when a request fails or returns unusable output."""
+
+
+class LLMBackend(abc.ABC):
+    """
+    Interface for LLM fallback backends.
+
+    complete() receives a rendered batch prompt asking for `count` answers
+    for `field` and returns the raw model text (a JSON array). step_label is
+    recorded in normalization_steps for rows resolved by this backend.
+    Answers are stored in the response cache unless cacheable is False.
+    """
+
+    step_label = "llm_resolved"
+    cacheable = True
+
+    @abc.abstractmethod
+    def complete(self, field, prompt, count):
+        """The raw model text for a batch prompt; raises LLMBackendError."""
+
+
+class PlaceholderBackend(LLMBackend):
+    """No model calls: answers every value with get_llm_placeholder(field)."""
+
+    step_label = "llm_generated_placeholder"
+    cacheable = False
+
+    def complete(self, field, prompt, count):
+        return json.dumps([get_llm_placeholder(field)] * count)
+
+
+class HTTPBackend(LLMBackend):
+    """
+    Blocking JSON-over-HTTP backend.
+
+    Sends POST {"field": ..., "count": ..., "prompt": ...} to url and expects
+    {"completion": "<model text>"} back.
+    """
+
+    def __init__(self, url, timeout=30.0, headers=None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+
+    def complete(self, field, prompt, count):
+        body = json.dumps({"field": field, "count": count, "prompt": prompt}).encode()
+        request = urllib.request.Request(
+            self.url, data=body, method="POST",
+            headers={"Content-Type": "application/json", **self.headers},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.load(response)
+        except (urllib.error.URLError, http.client.HTTPException, OSError, ValueError) as e:
+            raise LLMBackendError(f"{self.url}: {e}") from e
+        completion = payload.get("completion") if isinstance(payload, dict) else None
+        if not isinstance(completion, str):
+            raise LLMBackendError(f"{self.url}: response has no completion text")
+        return completion
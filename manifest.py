@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Incremental re-processing manifest.
+A SQLite file maps each source_row_id to a digest of the raw row and the
+clean row and anomaly record it produced. On the next run, rows whose
+digest is unchanged are copied from the manifest instead of going through
+the validator chain and the LLM fallback. The manifest is tied to a
+version fingerprint of the validator and prompt template sources, the
+normalization_steps format and the LLM backend; when any of them changes,
+every entry is dropped on open.
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+HERE = Path(__file__).parent
+
+# Modules whose source determines the clean row and anomaly record
+VERSIONED_MODULES = (
+    "run.py",
+    "run_ipv4_validation.py",
+    "run_mac_validator.py",
+    "run_hostname_validation.py",
+    "run_fqdn_validation.py",
+    "run_owner_validation.py",
+    "run_device_type_validation.py",
+    "run_site_validation.py",
+    "columnar_validation.py",
+    "row_record.py",
+    "step_codes.py",
+    "network_trie.py",
+    "owner_directory.py",
+    "site_registry.py",
+    "prompt_templates.py",
+    "llm_fallback.py",
+    "llm_utils.py",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    source_row_id TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    clean_row TEXT NOT NULL,
+    anomaly_record TEXT
+);
+CREATE TEMP TABLE IF NOT EXISTS seen (source_row_id TEXT PRIMARY KEY);
+"""
+
+# Rows looked up per query (SQLite's default limit on host parameters is 999)
+LOOKUP_BLOCK = 500
+# Validated rows buffered before they are written in one transaction
+_WRITE_BATCH = 1000
+
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def version_fingerprint(header, steps_format="verbose", llm_backend=None, networks=None,
+                        owner_directory=None, site_registry=None):
+    """Hash of everything besides the raw row values that the output depends on."""
+    h = hashlib.sha256()
+    for name in VERSIONED_MODULES:
+        h.update(name.encode())
+        h.update((HERE / name).read_bytes())
+    h.update(repr(list(header)).encode())
+    h.update(f"steps_format={steps_format}".encode())
+    if llm_backend is not None:
+        backend = type(llm_backend)
+        h.update(f"backend={backend.__module__}.{backend.__qualname__}".encode())
+        h.update(f"url={getattr(llm_backend, 'url', '')}".encode())
+    if networks is not None:
+        h.update(f"networks={networks.fingerprint}".encode())
+    if owner_directory is not None:
+        h.update(f"owner_directory={owner_directory.fingerprint}".encode())
+    if site_registry is not None:
+        h.update(f"site_registry={site_registry.fingerprint}".encode())
+    return h.hexdigest()[:16]
+
+
+def row_digest(row):
+    """
+    Digest of a row_record.RawRow: every cell value, in header order. The
+    header itself is covered by the version fingerprint.
+    """
+    return hashlib.blake2b(repr(row.values).encode(), digest_size=16).hexdigest()
+
+
+class RowManifest:
+    """
+    Per-row output manifest for incremental runs.
+
+    run.process calls begin() with the version fingerprint before reading
+    the input, lookup() for each block of rows,
+    put() for every row it validated and finish() at the end, which writes
+    buffered entries and drops rows that are no longer in the input. Clean
+    rows are lists in output column order, stored as JSON arrays. Rows whose
+    fallback hit a backend error are not stored, so they are retried on the
+    next run.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.counters = {"reused": 0, "validated": 0, "invalidated": False}
+        self._conn = None
+        self._puts = []
+
+    def begin(self, fingerprint):
+        self.counters = {"reused": 0, "validated": 0, "invalidated": False}
+        conn = self._conn = sqlite3.connect(self.path, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # The manifest can always be rebuilt, so a commit need not survive power loss
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        if meta.get("fingerprint") != fingerprint:
+            self.counters["invalidated"] = "fingerprint" in meta
+            with conn:
+                conn.execute("DELETE FROM rows")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)",
+                             (fingerprint,))
+
+    def lookup(self, rows):
+        """
+        [(digest, previous), ...] for a block of at most LOOKUP_BLOCK raw rows.
+        previous is the stored (clean_row, anomaly_record) when the row is
+        unchanged, else None.
+        """
+        conn = self._conn
+        row_ids = [row.source_row_id for row in rows]
+        digests = [row_digest(row) for row in rows]
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO seen VALUES (?)", zip(row_ids))
+        unique_ids = list(dict.fromkeys(row_ids))
+        marks = ",".join("?" * len(unique_ids))
+        stored = {
+            row_id: (digest, clean_row, anomaly_record)
+            for row_id, digest, clean_row, anomaly_record in conn.execute(
+                f"SELECT source_row_id, digest, clean_row, anomaly_record FROM rows "
+                f"WHERE source_row_id IN ({marks})", unique_ids)
+        }
+        results = []
+        for row_id, digest in zip(row_ids, digests):
+            entry = stored.get(row_id)
+            if entry is None or entry[0] != digest:
+                results.append((digest, None))
+                continue
+            self.counters["reused"] += 1
+            clean_row = json.loads(entry[1])
+            anomaly_record = json.loads(entry[2]) if entry[2] else None
+            results.append((digest, (clean_row, anomaly_record)))
+        return results
+
+    def put(self, source_row_id, digest, clean_row, anomaly_record, llm_failed=False):
+        """Store a validated row, unless its LLM fallback request failed."""
+        self.counters["validated"] += 1
+        if llm_failed:
+            return
+        self._puts.append((
+            source_row_id, digest, _encode(clean_row),
+            _encode(anomaly_record) if anomaly_record else None,
+        ))
+        if len(self._puts) >= _WRITE_BATCH:
+            self._flush()
+
+    def _flush(self):
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?)",
+                                   self._puts)
+        self._puts = []
+
+    def finish(self):
+        """Write buffered entries and drop rows not seen in this run."""
+        self._flush()
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM rows WHERE source_row_id NOT IN (SELECT source_row_id FROM seen)"
+            )
+            self._conn.execute("DELETE FROM seen")
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
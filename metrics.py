@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Optional instrumentation for run.process.
+Records per-stage latency histograms, row counts, LLM fallback counts per
+field and anomaly counts per type, and exports them as a JSON summary or a
+Prometheus textfile. run.py only touches a PipelineMetrics when one is
+passed in, so a disabled run pays nothing beyond a None check per stage.
+"""
+
+import json
+import os
+import time
+from bisect import bisect_left
+
+from step_codes import llm_step_field
+
+# Histogram bucket upper bounds in seconds; an implicit +Inf bucket follows
+LATENCY_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Per-row stages, in validator order
+ROW_STAGES = ("ip", "mac", "hostname", "fqdn", "owner", "device_type", "site")
+# Per-batch stages: column-wise ip/mac validation and fallback resolution
+BATCH_STAGES = ("ip_mac_columns", "llm_resolve")
+
+
+class Histogram:
+    """Latency histogram with per-bucket counts over LATENCY_BUCKETS."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def merge(self, other):
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.total += other.total
+        self.count += other.count
+
+    def quantile(self, q):
+        """Upper bucket bound containing the q-quantile (None if empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self):
+        return {"count": self.count, "sum": self.total, "buckets": list(self.counts)}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = list(data["buckets"])
+        histogram.total = data["sum"]
+        histogram.count = data["count"]
+        return histogram
+
+
+class PipelineMetrics:
+    """
+    Metrics for one run.
+
+    run.py calls start_row() before the validator chain and lap(stage) after
+    each stage, so every lap times the stage that just finished. Workers
+    send snapshot() dicts back to the parent, which merge()s them.
+    """
+
+    def __init__(self):
+        self.histograms = {stage: Histogram() for stage in ROW_STAGES + BATCH_STAGES}
+        self.rows = 0
+        self.llm_fallbacks = {}
+        self.anomalies = {}
+        self.elapsed = 0.0
+        self._started = None
+        self._last = 0.0
+        self.clock = time.perf_counter
+
+    def start_run(self):
+        self._started = self.clock()
+
+    def stop_run(self):
+        if self._started is not None:
+            self.elapsed += self.clock() - self._started
+            self._started = None
+
+    def start_row(self):
+        self._last = self.clock()
+
+    def lap(self, stage):
+        now = self.clock()
+        self.histograms[stage].observe(now - self._last)
+        self._last = now
+
+    def observe(self, stage, seconds):
+        self.histograms[stage].observe(seconds)
+
+    def count_row(self, normalization_steps, anomalies):
+        """Count one validated row, its LLM fallbacks and its anomaly types."""
+        self.rows += 1
+        for step in normalization_steps:
+            field = llm_step_field(step)
+            if field is not None:
+                self.llm_fallbacks[field] = self.llm_fallbacks.get(field, 0) + 1
+        for anomaly in anomalies:
+            kind = anomaly["type"]
+            self.anomalies[kind] = self.anomalies.get(kind, 0) + 1
+
+    def count_anomalies(self, counts):
+        """Add anomaly counts by type found outside the validator chain."""
+        for kind, n in counts.items():
+            if n:
+                self.anomalies[kind] = self.anomalies.get(kind, 0) + n
+
+    # ------------------------------------------------------------------
+    # Worker hand-off
+    # ------------------------------------------------------------------
+
+    def snapshot(self, reset=True):
+        """Plain-dict copy of everything recorded (and reset, by default)."""
+        data = {
+            "rows": self.rows,
+            "llm_fallbacks": dict(self.llm_fallbacks),
+            "anomalies": dict(self.anomalies),
+            "histograms": {stage: h.to_dict() for stage, h in self.histograms.items()},
+        }
+        if reset:
+            self.histograms = {stage: Histogram() for stage in self.histograms}
+            self.rows = 0
+            self.llm_fallbacks = {}
+            self.anomalies = {}
+        return data
+
+    def merge(self, data):
+        self.rows += data["rows"]
+        for field, n in data["llm_fallbacks"].items():
+            self.llm_fallbacks[field] = self.llm_fallbacks.get(field, 0) + n
+        for kind, n in data["anomalies"].items():
+            self.anomalies[kind] = self.anomalies.get(kind, 0) + n
+        for stage, histogram in data["histograms"].items():
+            self.histograms.setdefault(stage, Histogram()).merge(Histogram.from_dict(histogram))
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def summary(self):
+        stages = {}
+        for stage, h in self.histograms.items():
+            if not h.count:
+                continue
+            stages[stage] = {
+                "count": h.count,
+                "total_seconds": round(h.total, 6),
+                "mean_us": round(h.total / h.count * 1e6, 3),
+                "p50_le_us": h.quantile(0.5) * 1e6,
+                "p99_le_us": h.quantile(0.99) * 1e6,
+            }
+        return {
+            "rows": self.rows,
+            "elapsed_seconds": round(self.elapsed, 6),
+            "rows_per_sec": round(self.rows / self.elapsed, 1) if self.elapsed else None,
+            "stages": stages,
+            "llm_fallbacks": dict(sorted(self.llm_fallbacks.items())),
+            "anomalies": dict(sorted(self.anomalies.items())),
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+            f.write("\n")
+
+    def prometheus_lines(self, prefix="inventory"):
+        lines = [
+            f"# HELP {prefix}_stage_seconds Validator stage latency (per row or per batch).",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for stage, h in self.histograms.items():
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, h.counts):
+                cumulative += n
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} '
+                             f"{cumulative}")
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {h.total!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {h.count}')
+
+        lines += [
+            f"# HELP {prefix}_rows_total Rows validated.",
+            f"# TYPE {prefix}_rows_total counter",
+            f"{prefix}_rows_total {self.rows}",
+            f"# HELP {prefix}_rows_per_second Rows validated per second of wall time.",
+            f"# TYPE {prefix}_rows_per_second gauge",
+            f"{prefix}_rows_per_second {self.rows / self.elapsed if self.elapsed else 0.0!r}",
+            f"# HELP {prefix}_llm_fallback_total Rows sent to the LLM fallback, by field.",
+            f"# TYPE {prefix}_llm_fallback_total counter",
+        ]
+        for field, n in sorted(self.llm_fallbacks.items()):
+            lines.append(f'{prefix}_llm_fallback_total{{field="{field}"}} {n}')
+        lines += [
+            f"# HELP {prefix}_anomalies_total Anomalies recorded, by type.",
+            f"# TYPE {prefix}_anomalies_total counter",
+        ]
+        for kind, n in sorted(self.anomalies.items()):
+            lines.append(f'{prefix}_anomalies_total{{type="{kind}"}} {n}')
+        return lines
+
+    def write_prometheus(self, path):
+        """Write a node_exporter textfile (written whole, then renamed into place)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write("\n".join(self.prometheus_lines()) + "\n")
+        os.replace(tmp, path)
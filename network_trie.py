@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Authoritative IPv4 network list with longest-prefix-match lookup.
+Network containers and subnets are loaded from a CSV (a `cidr` column plus
+any metadata columns) into a table indexed by the top 16 address bits,
+each slot holding a path-compressed binary (Patricia) trie of its longer
+prefixes. A lookup is one table index plus at most 17 trie nodes, so its
+cost does not grow with the number of prefixes loaded.
+"""
+
+import csv
+import hashlib
+
+from run_ipv4_validation import ipv4_format, ipv4_parse
+
+
+class _Node:
+    __slots__ = ("key", "bits", "network", "children")
+
+    def __init__(self, key, bits, network=None):
+        self.key = key          # prefix, host bits zero
+        self.bits = bits        # prefix length
+        self.network = network  # Network stored at this prefix, None for branch nodes
+        self.children = [None, None]
+
+
+class Network:
+    """A loaded prefix: canonical cidr string and its metadata columns."""
+
+    __slots__ = ("cidr", "metadata")
+
+    def __init__(self, cidr, metadata):
+        self.cidr = cidr
+        self.metadata = metadata
+
+    def __repr__(self):
+        return f"Network({self.cidr!r}, {self.metadata!r})"
+
+
+def _mask(bits):
+    return (0xFFFFFFFF << (32 - bits)) & 0xFFFFFFFF
+
+
+def _common_bits(a, b, limit):
+    """Length of the common leading bits of a and b, capped at limit."""
+    diff = a ^ b
+    return min(32 - diff.bit_length(), limit)
+
+
+def parse_cidr(text):
+    """(packed network, prefix length) for 'a.b.c.d/n'; ValueError if malformed."""
+    address, slash, length = str(text).strip().partition("/")
+    valid, _, reason, packed = ipv4_parse(address)
+    if not valid:
+        raise ValueError(f"{text!r}: {reason}")
+    if not slash:
+        bits = 32
+    elif length.isdigit() and int(length) <= 32:
+        bits = int(length)
+    else:
+        raise ValueError(f"{text!r}: invalid prefix length")
+    if packed & ~_mask(bits) & 0xFFFFFFFF:
+        raise ValueError(f"{text!r}: host bits set")
+    return packed, bits
+
+
+# Bits resolved by the root table; longer prefixes live in per-slot tries
+ROOT_STRIDE = 16
+_EMPTY_SLOT = (None, None)
+
+
+def _trie_insert(root, key, bits, network):
+    """Insert into the Patricia trie at root; return (root, whether the prefix is new)."""
+    new = _Node(key, bits, network)
+    parent, side, node = None, 0, root
+    while node is not None:
+        common = _common_bits(node.key, key, min(node.bits, bits))
+        if common < node.bits:
+            # The new prefix diverges from (or contains) this node's prefix
+            if common == bits:
+                new.children[(node.key >> (31 - bits)) & 1] = node
+                replacement = new
+            else:
+                replacement = _Node(key & _mask(common), common)
+                bit = (key >> (31 - common)) & 1
+                replacement.children[bit] = new
+                replacement.children[1 - bit] = node
+            if parent is None:
+                return replacement, True
+            parent.children[side] = replacement
+            return root, True
+        if bits == node.bits:
+            added = node.network is None
+            node.network = network
+            return root, added
+        parent, side = node, (key >> (31 - node.bits)) & 1
+        node = node.children[side]
+    if parent is None:
+        return new, True
+    parent.children[side] = new
+    return root, True
+
+
+def _trie_networks(root):
+    stack = [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        if node.network is not None:
+            yield node.key, node.bits, node.network
+        stack.extend(child for child in reversed(node.children) if child is not None)
+
+
+class NetworkTrie:
+    """
+    IPv4 prefix table with longest-prefix-match lookup.
+
+    The top ROOT_STRIDE bits index a flat table holding, per /16, the
+    longest matching prefix of length <= 16 and the root of a Patricia trie
+    of that /16's longer prefixes. Branch nodes are only created where two
+    prefixes diverge, so each trie holds fewer than two nodes per prefix,
+    and a lookup is one table index plus a walk of at most 17 nodes.
+
+    insert() adds or replaces a prefix; lookup(packed) returns the Network
+    with the longest prefix containing the address, or None. The root table
+    is rebuilt on the first lookup after an insert.
+    """
+
+    def __init__(self):
+        self._short = {}   # (key, bits) → Network, bits <= ROOT_STRIDE
+        self._tries = {}   # slot → Patricia root for prefixes longer than ROOT_STRIDE
+        self._slots = None
+        self.size = 0
+        # Digest of the loaded list, part of the incremental manifest fingerprint
+        self.fingerprint = ""
+
+    def __len__(self):
+        return self.size
+
+    def insert(self, key, bits, network):
+        if bits <= ROOT_STRIDE:
+            added = (key, bits) not in self._short
+            self._short[(key, bits)] = network
+        else:
+            slot = key >> (32 - ROOT_STRIDE)
+            self._tries[slot], added = _trie_insert(self._tries.get(slot), key, bits, network)
+        self.size += added
+        self._slots = None
+
+    def _build_slots(self):
+        best = [None] * (1 << ROOT_STRIDE)
+        for (key, bits), network in sorted(self._short.items(), key=lambda item: item[0][1]):
+            first = key >> (32 - ROOT_STRIDE)
+            best[first:first + (1 << (ROOT_STRIDE - bits))] = \
+                [network] * (1 << (ROOT_STRIDE - bits))
+        tries = self._tries
+        self._slots = [
+            (network, tries.get(slot)) if network is not None or slot in tries else _EMPTY_SLOT
+            for slot, network in enumerate(best)
+        ]
+        return self._slots
+
+    def lookup(self, packed):
+        slots = self._slots
+        if slots is None:
+            slots = self._build_slots()
+        best, node = slots[packed >> (32 - ROOT_STRIDE)]
+        while node is not None:
+            bits = node.bits
+            if (packed ^ node.key) >> (32 - bits):
+                break
+            if node.network is not None:
+                best = node.network
+            if bits == 32:
+                break
+            node = node.children[(packed >> (31 - bits)) & 1]
+        return best
+
+    def networks(self):
+        """Every stored (key, bits, Network), in address order."""
+        found = [(key, bits, network) for (key, bits), network in self._short.items()]
+        for slot in self._tries:
+            found.extend(_trie_networks(self._tries[slot]))
+        found.sort(key=lambda item: (item[0], item[1]))
+        return found
+
+    # Rebuilt from the prefix list rather than pickled node by node, so
+    # deep tries reach --workers processes without recursion limits
+    def __getstate__(self):
+        return {"networks": self.networks(), "fingerprint": self.fingerprint}
+
+    def __setstate__(self, state):
+        self.__init__()
+        for key, bits, network in state["networks"]:
+            self.insert(key, bits, network)
+        self.fingerprint = state["fingerprint"]
+
+
+def load_networks(path):
+    """
+    Load a network list CSV into a NetworkTrie.
+
+    The `cidr` column holds a.b.c.d/n prefixes (containers and subnets
+    alike); every other column is kept as the Network's metadata. Rows
+    with IPv6 prefixes are skipped. Raises ValueError naming the line of
+    a malformed prefix.
+    """
+    trie = NetworkTrie()
+    digest = hashlib.sha256()
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        if "cidr" not in (reader.fieldnames or ()):
+            raise ValueError(f"{path}: no 'cidr' column")
+        for row in reader:
+            cidr = (row.pop("cidr") or "").strip()
+            if ":" in cidr:
+                continue
+            try:
+                key, bits = parse_cidr(cidr)
+            except ValueError as e:
+                raise ValueError(f"{path}:{reader.line_num}: {e}") from None
+            trie.insert(key, bits, Network(f"{ipv4_format(key)}/{bits}", row))
+            digest.update(f"{cidr}\0{list(row.items())}\n".encode())
+    trie.fingerprint = digest.hexdigest()[:16]
+    return trie
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Local people/team directory for resolving owners without an LLM.
+A directory export is loaded into exact hash maps keyed on the casefolded
+username, email, email local part, full name, first name and team name,
+and a sorted array of usernames and email local parts that is binary
+searched for unique prefixes, so truncated usernames resolve as well. A
+key shared by entries that disagree is ambiguous and never resolves.
+
+Formats
+-------
+CSV : a header with any of name, username, email, team, and optionally
+    aliases: ";"-separated other names for the row's person, or for its
+    team when the row names no person
+LDIF : person entries with displayName or cn, uid, mail and ou or
+    departmentNumber; an entry with only an ou registers a team
+"""
+
+import base64
+import csv
+import hashlib
+import io
+from bisect import bisect_left
+from functools import partial
+from itertools import chain, compress, repeat
+from operator import ne, not_
+from pathlib import Path
+
+DIRECTORY_FIELDS = ("name", "username", "email", "team")
+
+# Shortest username or email local part matched by prefix
+MIN_PREFIX = 3
+# Most index keys a prefix may span and still resolve (to one entry)
+_MAX_PREFIX_SPAN = 16
+
+# Characters of an LDIF export read at a time
+_LDIF_BLOCK = 1 << 20
+# LDIF attribute (lowercase) → (directory field, rank); lower ranks win
+_LDIF_ATTRIBUTES = {
+    "displayname": ("name", 0), "cn": ("name", 1),
+    "uid": ("username", 0), "samaccountname": ("username", 1),
+    "mail": ("email", 0),
+    "ou": ("team", 0), "departmentnumber": ("team", 1), "department": ("team", 2),
+}
+
+# Whitespace str.split() breaks on, other than the space
+_OTHER_SPACES = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f\x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005"
+    "\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+)
+
+
+def _normalize(value):
+    return " ".join(value.split()).casefold()
+
+
+def _column(values, fold=True):
+    """
+    (values with whitespace collapsed, their casefolded keys) for a column.
+    Both are checked on the joined column first, and are the column itself
+    where no value changes.
+    """
+    joined = "\0".join(values)
+    if ("  " in joined or " \0" in joined or "\0 " in joined or joined[:1] == " "
+            or joined[-1:] == " " or any(space in joined for space in _OTHER_SPACES)):
+        values = [" ".join(value.split()) for value in values]
+        joined = "\0".join(values)
+    if not fold or joined.casefold() == joined:
+        return values, values
+    return values, list(map(str.casefold, values))
+
+
+def _index(keys, rows, same):
+    """
+    Map each non-empty key to its row, or to None where rows with the same
+    key carry different entries; same(row, other) compares two entries.
+    """
+    index = dict(zip(keys, rows))
+    if len(index) < len(keys):
+        # Only the rows a later row with their key replaced are compared
+        for key, row in compress(zip(keys, rows), map(ne, rows, map(index.__getitem__, keys))):
+            last = index[key]
+            if last is not None and not same(row, last):
+                index[key] = None
+    index.pop("", None)
+    return index
+
+
+class OwnerDirectory:
+    """
+    Exact and prefix indexes over directory entries.
+
+    Built from equal-length columns of names, usernames, emails and teams,
+    and optionally aliases (";"-separated). A row with a name, username or
+    email is a person; a row with only a team registers the team, and its
+    aliases name the team. Each person resolves to (name, email, team); a
+    team resolves to ("unknown", "", team), as a whitelisted team name does.
+
+    resolve() tries, in order: the full email, the username, the email
+    local part, the full name or an alias, the team name or an alias, the
+    first name, and a unique username / email local part prefix of at least
+    MIN_PREFIX characters. The first index holding the key decides: an
+    ambiguous key there resolves to nothing rather than to a later index or
+    a prefix. Person indexes map keys to row numbers; a lookup builds the
+    entry of the row it finds.
+    """
+
+    def __init__(self, names, usernames, emails, teams, aliases=None):
+        names, name_keys = _column(names)
+        usernames, username_keys = _column(usernames)
+        emails, email_keys = _column(emails)
+        teams = _column(teams, fold=False)[0]
+        self._names, self._emails, self._teams = names, emails, teams
+        rows = list(range(len(names)))
+
+        team_only = set()
+        if "" in names:
+            team_only = {row for row in compress(rows, map(not_, names))
+                         if not usernames[row] and not emails[row]}
+        self.size = len(rows) - len(team_only)
+
+        same = self._same_entry
+        self.emails = _index(email_keys, rows, same)
+        self.usernames = _index(username_keys, rows, same)
+        self.local_parts = _index([key.partition("@")[0] for key in email_keys], rows, same)
+        self.first_names = _index([key.partition(" ")[0] for key in name_keys], rows, same)
+
+        team_names = sorted(set(teams) - {""})
+        team_keys = [_normalize(team) for team in team_names]
+        alias_keys, alias_rows = [], []
+        for row in compress(rows, aliases or ()):
+            for alias in filter(None, map(str.strip, aliases[row].split(";"))):
+                if row in team_only:
+                    team_keys.append(_normalize(alias))
+                    team_names.append(teams[row])
+                else:
+                    alias_keys.append(_normalize(alias))
+                    alias_rows.append(row)
+        self.names = _index(name_keys + alias_keys, rows + alias_rows, same)
+        # Spellings of one team (Platform, platform) are not ambiguous
+        self.teams = {}
+        for key, team in zip(team_keys, team_names):
+            if not key:
+                continue
+            first = self.teams.setdefault(key, team)
+            if first is not None and _normalize(first) != _normalize(team):
+                self.teams[key] = None
+
+        # Every username and email local part, binary searched for prefixes
+        self._prefix_keys = sorted(self.usernames.keys() | self.local_parts.keys())
+        # Digest of the loaded export, part of the incremental manifest fingerprint
+        self.fingerprint = ""
+
+    def __len__(self):
+        return self.size
+
+    def _entry(self, row):
+        return self._names[row], self._emails[row], self._teams[row]
+
+    def _same_entry(self, row, other):
+        return (self._names[row] == self._names[other]
+                and self._emails[row] == self._emails[other]
+                and self._teams[row] == self._teams[other])
+
+    def _prefix_row(self, key):
+        """
+        The row a username or email local part names, the username's where
+        the key is both; None where either is ambiguous or their entries
+        differ.
+        """
+        if key not in self.usernames:
+            return self.local_parts[key]
+        row = self.usernames[key]
+        if key in self.local_parts:
+            other = self.local_parts[key]
+            if row is None or other is None or not self._same_entry(row, other):
+                return None
+        return row
+
+    def _prefix_match(self, prefix):
+        keys = self._prefix_keys
+        entry = None
+        found = 0
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            row = self._prefix_row(keys[i])
+            if row is None:
+                continue
+            found += 1
+            if found > _MAX_PREFIX_SPAN:
+                return None
+            if entry is None:
+                entry = self._entry(row)
+            elif self._entry(row) != entry:
+                return None
+        return entry
+
+    def resolve(self, value):
+        """(match kind, (owner, owner_email, owner_team)) for an owner value, or None."""
+        key = _normalize(str(value))
+        if not key:
+            return None
+        if "@" in key:
+            if key in self.emails:
+                row = self.emails[key]
+                return None if row is None else ("email", self._entry(row))
+            key = key.partition("@")[0]
+        for kind, index in (("username", self.usernames), ("email_local", self.local_parts),
+                            ("name", self.names)):
+            if key in index:
+                row = index[key]
+                return None if row is None else (kind, self._entry(row))
+        if key in self.teams:
+            team = self.teams[key]
+            return None if team is None else ("team", ("unknown", "", team))
+        if key in self.first_names:
+            row = self.first_names[key]
+            return None if row is None else ("first_name", self._entry(row))
+        if len(key) >= MIN_PREFIX and " " not in key:
+            entry = self._prefix_match(key)
+            if entry is not None:
+                return "prefix", entry
+        return None
+
+
+# ----------------------------------------------------------------------
+# Loading
+# ----------------------------------------------------------------------
+
+def _csv_fields(text):
+    """
+    (header, fields) of a CSV text, fields holding every row's values in
+    order, each row cut or padded to the header's width; blank lines are
+    skipped. Text without quotes, ending every line with \\n or every line
+    with \\r\\n, whose rows all have the header's width is split on commas
+    and line endings directly.
+    """
+    crlf = "\r\n" in text
+    if '"' not in text and text.count("\r") == text.count("\r\n") == text.count("\n") * crlf:
+        lines = text.split("\r\n" if crlf else "\n")
+        if "" in lines:
+            lines = list(filter(None, lines))
+        header = lines[0].split(",") if lines else []
+        body = lines[1:]
+        if not body:
+            return header, []
+        if set(map(str.count, body, repeat(","))) == {len(header) - 1}:
+            return header, ",".join(body).split(",")
+    reader = csv.reader(io.StringIO(text, newline=""))
+    header = next(reader, [])
+    width = len(header)
+    fields = []
+    for row in reader:
+        if row:
+            fields.extend(row[:width] if len(row) >= width else row + [""] * (width - len(row)))
+    return header, fields
+
+
+def _read_csv(f, path):
+    """The name, username, email, team and aliases columns of a CSV export."""
+    header, fields = _csv_fields(f.read())
+    header = [name.strip().lower() for name in header]
+    if not set(DIRECTORY_FIELDS) & set(header):
+        raise ValueError(f"{path}: no {', '.join(DIRECTORY_FIELDS)} column")
+    width = len(header)
+    named = {name: i for i, name in enumerate(header)}
+    columns = []
+    for name in DIRECTORY_FIELDS + ("aliases",):
+        i = named.get(name)
+        columns.append(fields[i::width] if i is not None else [""] * (len(fields) // width))
+    return columns
+
+
+def _read_ldif(f):
+    """
+    The name, username, email and team columns of an LDIF export, read in
+    blocks of lines. A line starting with a single space continues the one
+    before it; a blank line ends an entry.
+    """
+    width = len(DIRECTORY_FIELDS)
+    # Attribute name, as spelled in the export → (column, rank), or None
+    attributes = {name: (DIRECTORY_FIELDS.index(field), rank)
+                  for name, (field, rank) in _LDIF_ATTRIBUTES.items()}
+    # Ranks of an entry with none of the attributes yet
+    unranked = [len(_LDIF_ATTRIBUTES)] * width
+    fields = []
+    values, ranks = [""] * width, unranked[:]
+    line = None
+    rest = ""
+    # Trailing blank lines end the last line and entry
+    for block in chain(iter(partial(f.read, _LDIF_BLOCK), ""), ("\n\n\n",)):
+        texts = (rest + block).split("\n")
+        rest = texts.pop()
+        for text in texts:
+            if text[:1] == " " and line is not None:
+                line += text[1:]
+                continue
+            if line:
+                name, _, value = line.partition(":")
+                attribute = attributes.get(name, False)
+                if attribute is False:
+                    attribute = attributes[name] = attributes.get(name.lower())
+                if attribute is not None and attribute[1] < ranks[attribute[0]]:
+                    column, ranks[column] = attribute
+                    if value.startswith(":"):
+                        value = base64.b64decode(value[1:].strip()).decode("utf-8")
+                    values[column] = value.strip()
+            elif line is not None and ranks != unranked:
+                fields += values
+                values, ranks = [""] * width, unranked[:]
+            line = text
+    return [fields[i::width] for i in range(width)] + [None]
+
+
+def load_directory(path):
+    """
+    Load a directory export (.ldif, or CSV otherwise) into an
+    OwnerDirectory. Raises ValueError if a CSV header has none of the
+    directory columns.
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    if path.suffix.lower() == ".ldif":
+        columns = _read_ldif(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8"))
+    else:
+        columns = _read_csv(io.TextIOWrapper(io.BytesIO(data), newline=""), path)
+    directory = OwnerDirectory(*columns)
+    directory.fingerprint = hashlib.sha256(data).hexdigest()[:16]
+    return directory
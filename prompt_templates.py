@@ -134,3 +134,14 @@ Output: {{"site": "", "site_normalized": "UNKNOWN"}}
 
 Respond with valid JSON only.
 """
+
+BATCH_PROMPT_SUFFIX = """\
+
+## Batch Instructions
+The input above is a JSON array of {count} distinct values, each taken from
+one or more rows. Per-row notes are omitted because each value is shared by
+several rows. Apply the task to every element independently.
+
+Respond with a JSON array of exactly {count} objects, in the same order as the
+input, each following the Output Schema above. Respond with valid JSON only.
+"""
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Fixed-layout row records for the validator chain.
+A RowLayout is resolved once from the input header and turns each
+csv.reader row into a RawRow: a tuple of the columns the validators read,
+gathered at fixed indices in C, instead of a csv.DictReader dict per row.
+Clean rows leave the chain as plain lists in RowLayout.fieldnames order
+and are written with csv.writer.
+"""
+
+from collections import namedtuple
+from operator import itemgetter
+
+# Output columns: core validated columns first, then pass-through
+CORE_FIELDS = [
+    "ip", "ip_valid", "ip_version", "subnet_cidr",
+    "mac", "mac_valid",
+    "hostname", "hostname_valid",
+    "fqdn", "fqdn_consistent", "reverse_ptr",
+    "owner", "owner_email", "owner_team",
+    "device_type", "device_type_confidence",
+    "site", "site_normalized",
+    "normalization_steps", "source_row_id",
+]
+# Position of each core column in a clean row
+CLEAN_INDEX = {name: i for i, name in enumerate(CORE_FIELDS)}
+
+# Input columns the validators read
+INPUT_FIELDS = (
+    "ip", "mac", "hostname", "fqdn", "owner", "device_type", "site", "notes", "source_row_id",
+)
+
+
+class RawRow(namedtuple("RawRow", INPUT_FIELDS + ("values", "layout"))):
+    """
+    One input row: the validator columns by name, the full list of cell
+    values in header order, and the RowLayout that built it.
+    """
+
+    __slots__ = ()
+
+    def items(self):
+        """(column, value) pairs in header order, as the csv.DictReader row had."""
+        return zip(self.layout.header, self.values)
+
+
+_make_row = RawRow._make
+
+
+def _tuple_getter(indices):
+    """A function picking `indices` out of a list, always as a tuple."""
+    if len(indices) > 1:
+        return itemgetter(*indices)
+    if indices:
+        index = indices[0]
+        return lambda values: (values[index],)
+    return lambda values: ()
+
+
+def cell_text(value):
+    """
+    A mapping value as csv.reader would have read it: None and strings as
+    they are, booleans as "true"/"false", anything else through str().
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class RowLayout:
+    """
+    Column positions resolved from an input header.
+
+    record() builds a RawRow from a csv.reader row; rows shorter than the
+    header are padded with None, like csv.DictReader, and input columns
+    missing from the header read as "". With a repeated column name the
+    last one wins. extra_values() picks the pass-through columns that
+    follow the core columns in a clean row.
+    """
+
+    def __init__(self, header):
+        self.header = list(header)
+        self.width = len(self.header)
+        position = {name: i for i, name in enumerate(self.header)}
+        self.extra_fields = [c for c in self.header if c not in CLEAN_INDEX]
+        self.fieldnames = CORE_FIELDS + self.extra_fields
+        self.extra_values = _tuple_getter([position[c] for c in self.extra_fields])
+        if all(name in position for name in INPUT_FIELDS):
+            self._inputs = itemgetter(*(position[name] for name in INPUT_FIELDS))
+        else:
+            inputs = [position.get(name) for name in INPUT_FIELDS]
+            self._inputs = lambda values: tuple("" if i is None else values[i] for i in inputs)
+
+    # Rebuilt from the header, so records pickle to --workers processes
+    def __reduce__(self):
+        return (RowLayout, (self.header,))
+
+    def record(self, values):
+        if len(values) < self.width:
+            values += [None] * (self.width - len(values))
+        return _make_row(self._inputs(values) + (values, self))
+
+    def records(self, reader):
+        """RawRows for the rows of a csv.reader, skipping blank lines as csv.DictReader does."""
+        record = self.record
+        for values in reader:
+            if values:
+                yield record(values)
+
+    def from_mapping(self, row):
+        """
+        RawRow for a dict keyed by column name (missing columns are None),
+        with the values converted by cell_text.
+        """
+        return self.record([cell_text(row.get(name)) for name in self.header])
+
+
+def record_from_mapping(row):
+    """RawRow for a single dict, with a layout taken from its keys."""
+    return RowLayout(row).from_mapping(row)
@@ -4,15 +4,21 @@ Unified data-cleaning pipeline for inventory_raw.csv.
 Calls deterministic validators in order and writes inventory_clean.csv + anomalies.json.
 """
 
+import argparse
 import csv
-import json
+import os
 import sys
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
 from pathlib import Path
 
 # Import IP validation helpers from existing module
 from run_ipv4_validation import (
-    ipv4_validate_and_normalize,
-    default_subnet,
+    ipv4_parse,
+    ipv4_default_subnet,
 )
 # Import MAC validation helper
 from run_mac_validator import validate_mac_field
@@ -26,146 +32,1042 @@ from run_owner_validation import validate_owner_field
 from run_device_type_validation import validate_device_type_field
 # Import site validation helper
 from run_site_validation import validate_site_field
+# Fixed-layout input records and clean row columns
+from row_record import CORE_FIELDS, RawRow, RowLayout, record_from_mapping
+# Record-aligned byte ranges of a memory-mapped input for --split-input
+from csv_ranges import MappedCSV, parse_range
+# Column-wise ip/mac validation (NumPy when available)
+from columnar_validation import validate_ip_mac_columns
+# Streaming anomaly output
+from anomaly_writer import ANOMALY_FORMATS, AnomalyWriter
+# Duplicate IP and MAC/hostname/IP conflict checks across rows
+from cross_row_index import CrossRowIndex, SpilledCrossRowIndex
+# Buffered prompt log and LLM backends
+from llm_utils import HTTPBackend, PlaceholderBackend, flush_prompts, get_prompt_sink
+# Asyncio LLM client (pooled, rate-limited, retrying)
+from llm_client import (
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_TIMEOUT,
+    AsyncHTTPBackend,
+)
+# Persistent cache of LLM fallback answers
+from llm_cache import DEFAULT_MAX_ENTRIES, LLMResponseCache
+# Deferred, deduplicated LLM fallback stage
+from llm_fallback import (
+    DEFAULT_LLM_BATCH_ROWS,
+    DEFAULT_VALUES_PER_REQUEST,
+    FallbackResolver,
+    new_counters,
+)
+# Longest-prefix-match subnet assignment from a network list
+from network_trie import load_networks
+# Owner lookups in a local people/team directory export
+from owner_directory import load_directory
+# Fuzzy matching of sites against a canonical site registry
+from site_registry import load_site_registry
+# Per-row output manifest for incremental runs
+from manifest import LOOKUP_BLOCK, RowManifest, version_fingerprint
+# Optional stage timing and counters
+from metrics import PipelineMetrics
+# Coded normalization steps and their renderers
+from step_codes import (
+    IP_INVALID,
+    IP_NORMALIZE,
+    IP_PARSE,
+    IP_TRIM,
+    STEP_RENDERERS,
+    render_verbose,
+    write_legend,
+)
+# Memoization of the owner/device_type/site parsers
+from field_cache import (
+    DEFAULT_CACHE_SIZE,
+    configure_field_caches,
+    diff_counters,
+    field_cache_counters,
+    format_counters,
+    merge_counters,
+)
 
 HERE = Path(__file__).parent
 
+# Rows handed to each worker process in --workers mode
+DEFAULT_CHUNK_SIZE = 5000
 
-def process(input_csv, out_csv, anomalies_json):
-    all_anomalies = []
-
-    with open(input_csv, newline="") as f, open(out_csv, "w", newline="") as g:
-        reader = csv.DictReader(f)
-
-        # Build output fieldnames: core validated columns first, then pass-through
-        core_fields = [
-            "ip", "ip_valid", "ip_version", "subnet_cidr",
-            "mac", "mac_valid",
-            "hostname", "hostname_valid",
-            "fqdn", "fqdn_consistent", "reverse_ptr",
-            "owner", "owner_email", "owner_team",
-            "device_type", "device_type_confidence",
-            "site", "site_normalized",
-            "normalization_steps", "source_row_id",
-        ]
-        extra_fields = [c for c in reader.fieldnames if c not in core_fields]
-        fieldnames = core_fields + extra_fields
-
-        writer = csv.DictWriter(g, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for row in reader:
-            normalization_steps = []
-            row_anomalies = []
-
-            # ------------------------------------------------------------------
-            # Step 1: IP validation (deterministic)
-            # ------------------------------------------------------------------
-            raw_ip = row.get("ip", "")
-            valid_ip, canonical_ip, reason_ip = ipv4_validate_and_normalize(raw_ip)
-            normalization_steps.append("ip_trim")
-
-            if reason_ip == "ok":
-                normalization_steps.append("ip_parse")
-                normalization_steps.append("ip_normalize")
-                ip_out = canonical_ip
-                ip_valid = "true"
-                ip_version = "4"
-                subnet = default_subnet(ip_out)
-            else:
-                ip_out = str(raw_ip).strip()
-                ip_valid = "false"
-                ip_version = ""
+# Fallback batches allowed to wait on in-flight LLM requests while later
+# batches are validated
+DEFAULT_LLM_PIPELINE_DEPTH = 4
+
+# Incremental runs: input rows one validation batch may span, in multiples of
+# its batch size
+INCREMENTAL_SPAN = 16
+
+
+def _run_validators(row, fallback=None, columns=None, *, metrics=None, networks=None,
+                    owner_directory=None, site_registry=None):
+    """
+    Run the validator chain on one input row (a row_record.RawRow).
+    Returns the intermediate state consumed by _build_output. With a fallback
+    resolver, owner/device_type/site results are incomplete until it resolves.
+    columns is the row's precomputed (ip, mac) outcome from
+    columnar_validation.validate_ip_mac_columns, if any. metrics (a
+    metrics.PipelineMetrics) times each stage and counts the row. With
+    networks (a network_trie.NetworkTrie), subnet_cidr is the longest
+    matching prefix instead of the /24 guess. With owner_directory (an
+    owner_directory.OwnerDirectory), owners the rules are not confident
+    about are looked up there before falling back. With site_registry (a
+    site_registry.SiteRegistry), sites are matched to registered codes,
+    misspellings included. All but row, fallback and columns are keyword-only.
+    """
+    normalization_steps = []
+    row_anomalies = []
+    if metrics is not None:
+        metrics.start_row()
+
+    # ------------------------------------------------------------------
+    # Step 1: IP validation (deterministic)
+    # ------------------------------------------------------------------
+    raw_ip = row.ip
+    if columns is None:
+        valid_ip, canonical_ip, reason_ip, packed_ip = ipv4_parse(raw_ip)
+    else:
+        valid_ip, canonical_ip, reason_ip, packed_ip = columns[0]
+    normalization_steps.append(IP_TRIM)
+
+    if reason_ip == "ok":
+        normalization_steps.append(IP_PARSE)
+        normalization_steps.append(IP_NORMALIZE)
+        ip_out = canonical_ip
+        ip_valid = "true"
+        ip_version = "4"
+        if networks is None:
+            subnet = ipv4_default_subnet(packed_ip)
+        else:
+            network = networks.lookup(packed_ip)
+            if network is None:
                 subnet = ""
-                row_anomalies.append({"field": "ip", "type": reason_ip, "value": raw_ip})
-                normalization_steps.append(f"ip_invalid_{reason_ip}")
-
-            # ------------------------------------------------------------------
-            # Step 2: MAC validation (deterministic)
-            # ------------------------------------------------------------------
-            mac_result = validate_mac_field(row, row_anomalies, normalization_steps)
-
-            # ------------------------------------------------------------------
-            # Step 3: Hostname validation (deterministic)
-            # ------------------------------------------------------------------
-            hostname_result = validate_hostname_field(row, row_anomalies, normalization_steps)
-
-            # ------------------------------------------------------------------
-            # Step 4: FQDN validation (deterministic)
-            # ------------------------------------------------------------------
-            # Pass ip_valid into row for fqdn validator to use
-            row["ip_valid"] = ip_valid
-            row["ip"] = ip_out
-            fqdn_result = validate_fqdn_field(row, hostname_result, row_anomalies, normalization_steps)
-
-            # ------------------------------------------------------------------
-            # Step 5: Owner validation (deterministic + LLM fallback)
-            # ------------------------------------------------------------------
-            owner_result = validate_owner_field(row, row_anomalies, normalization_steps)
-
-            # ------------------------------------------------------------------
-            # Step 6: Device type validation (deterministic + LLM fallback)
-            # ------------------------------------------------------------------
-            device_type_result = validate_device_type_field(row, row_anomalies, normalization_steps)
-
-            # ------------------------------------------------------------------
-            # Step 7: Site validation (deterministic + LLM fallback)
-            # ------------------------------------------------------------------
-            site_result = validate_site_field(row, row_anomalies, normalization_steps)
-
-            # ------------------------------------------------------------------
-            # Build output row
-            # ------------------------------------------------------------------
-            clean_row = {
-                "ip": ip_out,
-                "ip_valid": ip_valid,
-                "ip_version": ip_version,
-                "subnet_cidr": subnet,
-                "mac": mac_result["mac"],
-                "mac_valid": str(mac_result["mac_valid"]).lower(),
-                "hostname": hostname_result["hostname"],
-                "hostname_valid": str(hostname_result["hostname_valid"]).lower(),
-                "fqdn": fqdn_result["fqdn"],
-                "fqdn_consistent": fqdn_result["fqdn_consistent"],
-                "reverse_ptr": fqdn_result["reverse_ptr"],
-                "owner": owner_result["owner"],
-                "owner_email": owner_result["owner_email"],
-                "owner_team": owner_result["owner_team"],
-                "device_type": device_type_result["device_type"],
-                "device_type_confidence": device_type_result["device_type_confidence"],
-                "site": site_result["site"],
-                "site_normalized": site_result["site_normalized"],
-                "normalization_steps": "|".join(normalization_steps),
-                "source_row_id": row.get("source_row_id", ""),
-            }
-
-            # Pass-through remaining fields unchanged
-            for k in extra_fields:
-                clean_row[k] = row.get(k, "")
-
-            writer.writerow(clean_row)
-
-            # Collect anomalies for this row
-            if row_anomalies:
-                all_anomalies.append({
-                    "source_row_id": row.get("source_row_id"),
-                    "issues": row_anomalies,
-                    "recommended_actions": ["Review and correct flagged fields"],
-                })
-
-    with open(anomalies_json, "w") as h:
-        json.dump(all_anomalies, h, indent=2)
+                row_anomalies.append({"field": "ip", "type": "ip_not_in_known_network",
+                                      "value": raw_ip})
+            else:
+                subnet = network.cidr
+    else:
+        ip_out = str(raw_ip).strip()
+        ip_valid = "false"
+        ip_version = ""
+        subnet = ""
+        row_anomalies.append({"field": "ip", "type": reason_ip, "value": raw_ip})
+        normalization_steps.append((IP_INVALID, reason_ip))
+    if metrics is not None:
+        metrics.lap("ip")
+
+    # ------------------------------------------------------------------
+    # Step 2: MAC validation (deterministic)
+    # ------------------------------------------------------------------
+    if columns is None:
+        mac_result = validate_mac_field(row, row_anomalies, normalization_steps)
+    else:
+        mac_result, mac_anomalies, mac_steps = columns[1]
+        row_anomalies.extend(mac_anomalies)
+        normalization_steps.extend(mac_steps)
+    if metrics is not None:
+        metrics.lap("mac")
+
+    # ------------------------------------------------------------------
+    # Step 3: Hostname validation (deterministic)
+    # ------------------------------------------------------------------
+    hostname_result = validate_hostname_field(row, row_anomalies, normalization_steps)
+    if metrics is not None:
+        metrics.lap("hostname")
+
+    # ------------------------------------------------------------------
+    # Step 4: FQDN validation (deterministic)
+    # ------------------------------------------------------------------
+    fqdn_result = validate_fqdn_field(row, hostname_result, row_anomalies, normalization_steps,
+                                      packed_ip)
+    if metrics is not None:
+        metrics.lap("fqdn")
+
+    # ------------------------------------------------------------------
+    # Step 5: Owner validation (deterministic + LLM fallback)
+    # ------------------------------------------------------------------
+    owner_result = validate_owner_field(row, row_anomalies, normalization_steps, fallback,
+                                        owner_directory)
+    if metrics is not None:
+        metrics.lap("owner")
+
+    # ------------------------------------------------------------------
+    # Step 6: Device type validation (deterministic + LLM fallback)
+    # ------------------------------------------------------------------
+    device_type_result = validate_device_type_field(row, row_anomalies, normalization_steps, fallback)
+    if metrics is not None:
+        metrics.lap("device_type")
+
+    # ------------------------------------------------------------------
+    # Step 7: Site validation (deterministic + LLM fallback)
+    # ------------------------------------------------------------------
+    site_result = validate_site_field(row, row_anomalies, normalization_steps, fallback,
+                                      site_registry)
+    if metrics is not None:
+        metrics.lap("site")
+        metrics.count_row(normalization_steps, row_anomalies)
+
+    ip_result = (ip_out, ip_valid, ip_version, subnet)
+    return (row, ip_result, mac_result, hostname_result, fqdn_result,
+            owner_result, device_type_result, site_result,
+            normalization_steps, row_anomalies)
+
+
+def _build_output(state, render_steps=render_verbose):
+    """
+    Turn _run_validators state into (clean_row, anomaly_record).
+    clean_row is a list in the row layout's fieldnames order. The coded
+    normalization steps are rendered to text here, by render_steps.
+    """
+    (row, ip_result, mac_result, hostname_result, fqdn_result,
+     owner_result, device_type_result, site_result,
+     normalization_steps, row_anomalies) = state
+    mac, mac_valid = mac_result
+    hostname, hostname_valid = hostname_result
+
+    # ------------------------------------------------------------------
+    # Build output row
+    # ------------------------------------------------------------------
+    clean_row = [
+        *ip_result,
+        mac, "true" if mac_valid else "false",
+        hostname, "true" if hostname_valid else "false",
+        *fqdn_result,
+        *owner_result,
+        *device_type_result,
+        *site_result,
+        render_steps(normalization_steps),
+        row.source_row_id,
+    ]
+
+    # Pass-through remaining fields unchanged
+    clean_row += row.layout.extra_values(row.values)
+
+    # Collect anomalies for this row
+    anomaly_record = None
+    if row_anomalies:
+        anomaly_record = {
+            "source_row_id": row.source_row_id,
+            "issues": row_anomalies,
+            "recommended_actions": ["Review and correct flagged fields"],
+        }
+
+    return clean_row, anomaly_record
+
+
+def validate_row(row):
+    """
+    Run the validator chain on one input row, prompting inline on fallback.
+    row is a row_record.RawRow or a dict keyed by column name.
+    Returns (clean_row, anomaly_record); anomaly_record is None for clean rows.
+    """
+    if not isinstance(row, RawRow):
+        row = record_from_mapping(row)
+    return _build_output(_run_validators(row))
+
+
+def _run_batch(rows, fallback, metrics=None, networks=None, owner_directory=None,
+               site_registry=None):
+    """Run the validator chain on a list of rows, validating ip/mac column-wise."""
+    if metrics is None:
+        columns = validate_ip_mac_columns(rows)
+    else:
+        start = metrics.clock()
+        columns = validate_ip_mac_columns(rows)
+        metrics.observe("ip_mac_columns", metrics.clock() - start)
+    return [_run_validators(row, fallback, cols, metrics=metrics, networks=networks,
+                            owner_directory=owner_directory, site_registry=site_registry)
+            for row, cols in zip(rows, columns)]
+
+
+def _wait(resolution, metrics=None):
+    """Apply a batch's fallback answers, timing how long the pipeline was blocked."""
+    if metrics is None:
+        resolution.wait()
+    else:
+        start = metrics.clock()
+        resolution.wait()
+        metrics.observe("llm_resolve", metrics.clock() - start)
+
+
+def _finish_batch(states, resolution, metrics=None, render_steps=render_verbose):
+    """
+    Wait for a batch's fallback answers and build its output. Returns
+    (results, failed): [(clean_row, anomaly_record), ...] in input order,
+    and the positions of the rows whose fallback request failed.
+    """
+    _wait(resolution, metrics)
+    results = [_build_output(state, render_steps) for state in states]
+    if not resolution.failed:
+        return results, []
+    failed_steps = {id(steps) for steps in resolution.failed}
+    return results, [i for i, state in enumerate(states) if id(state[8]) in failed_steps]
+
+
+def _validate_batch(rows, fallback, metrics=None, render_steps=render_verbose, networks=None,
+                    owner_directory=None, site_registry=None):
+    states = _run_batch(rows, fallback, metrics, networks, owner_directory, site_registry)
+    return _finish_batch(states, fallback.submit(), metrics, render_steps)
+
+
+def validate_batch(rows, fallback, metrics=None, render_steps=render_verbose, networks=None,
+                   owner_directory=None, site_registry=None):
+    """
+    Validate a list of row_record.RawRows, deferring LLM fallbacks to one
+    resolve() call. Returns [(clean_row, anomaly_record), ...] in input order.
+    """
+    return _validate_batch(rows, fallback, metrics, render_steps, networks, owner_directory,
+                           site_registry)[0]
+
+
+def _iter_pipelined(batches, fallback, depth, metrics=None,
+                    render_steps=render_verbose, networks=None, owner_directory=None,
+                    site_registry=None):
+    """
+    Validate batches of rows, yielding (results, failed) per batch as
+    _finish_batch returns it, in input order. Each batch's fallback
+    requests are submitted without waiting, and up to `depth` batches may
+    be in flight while later batches are validated.
+    """
+    def finish(states, resolution):
+        return _finish_batch(states, resolution, metrics, render_steps)
+
+    window = deque()
+    for batch in batches:
+        states = _run_batch(batch, fallback, metrics, networks, owner_directory, site_registry)
+        window.append((states, fallback.submit()))
+        while window and (len(window) > depth or window[0][1].done()):
+            yield finish(*window.popleft())
+    while window:
+        yield finish(*window.popleft())
+
+
+def _merge_llm_counters(total, delta):
+    for k, v in delta.items():
+        total[k] = total.get(k, 0) + v
+    return total
+
+
+# Per-process fallback resolver, metrics (None when disabled), step renderer,
+# network list, owner directory and site registry in --workers mode
+_WORKER_FALLBACK = None
+_WORKER_METRICS = None
+_WORKER_RENDER_STEPS = render_verbose
+_WORKER_NETWORKS = None
+_WORKER_OWNER_DIRECTORY = None
+_WORKER_SITE_REGISTRY = None
+
+
+def _init_worker(cache_size, llm_backend, llm_batch_values, llm_cache, with_metrics,
+                 steps_format, networks, owner_directory, site_registry, log_prompts):
+    global _WORKER_FALLBACK, _WORKER_METRICS, _WORKER_RENDER_STEPS, _WORKER_NETWORKS
+    global _WORKER_OWNER_DIRECTORY, _WORKER_SITE_REGISTRY
+    configure_field_caches(cache_size)
+    # Prompt entries go back to the parent with each chunk; never flush here
+    get_prompt_sink().max_bytes = None
+    _WORKER_FALLBACK = FallbackResolver(llm_backend, llm_batch_values, cache=llm_cache,
+                                        prompt_sink=get_prompt_sink() if log_prompts else None)
+    _WORKER_METRICS = PipelineMetrics() if with_metrics else None
+    _WORKER_RENDER_STEPS = STEP_RENDERERS[steps_format]
+    _WORKER_NETWORKS = networks
+    _WORKER_OWNER_DIRECTORY = owner_directory
+    _WORKER_SITE_REGISTRY = site_registry
+
+
+def _validate_chunk(rows):
+    """
+    Worker entry point: validate a list of rows, preserving order.
+    Returns ((results, failed) as _finish_batch returns them, counter deltas
+    for this chunk, buffered prompt entries).
+    """
+    before = field_cache_counters()
+    results = _validate_batch(rows, _WORKER_FALLBACK, _WORKER_METRICS,
+                             _WORKER_RENDER_STEPS, _WORKER_NETWORKS, _WORKER_OWNER_DIRECTORY,
+                             _WORKER_SITE_REGISTRY)
+    llm_counters, _WORKER_FALLBACK.counters = _WORKER_FALLBACK.counters, new_counters()
+    stats = {
+        "field_cache": diff_counters(field_cache_counters(), before),
+        "llm": llm_counters,
+    }
+    if _WORKER_METRICS is not None:
+        stats["metrics"] = _WORKER_METRICS.snapshot()
+    return results, stats, get_prompt_sink().drain()
+
+
+def _validate_range(path, layout, byte_range):
+    """
+    Worker entry point for --split-input: parse one record-aligned byte
+    range of path straight from the file, then validate it like a chunk.
+    """
+    start, end = byte_range
+    return _validate_chunk(list(layout.records(parse_range(path, start, end))))
+
+
+def _iter_chunks(reader, chunk_size):
+    chunk = []
+    for row in reader:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_parallel(batches, workers, worker_args, summary, metrics=None, prompt_sink=None,
+                   task=_validate_chunk):
+    """
+    Validate batches of rows in a process pool, one task per batch, and
+    yield each batch's (results, failed) in input order. At most 2 * workers
+    batches are in flight, so the reader is never drained into memory ahead
+    of the writer. Counters reported by the workers are added into summary,
+    and their prompt log entries are merged into prompt_sink in input order.
+    A batch is a list of rows for _validate_chunk, or whatever task takes
+    instead (a byte range for _validate_range).
+    """
+    def collect(future):
+        if future is None:
+            return [], []
+        results, stats, prompts = future.result()
+        merge_counters(summary["field_cache"], stats["field_cache"])
+        _merge_llm_counters(summary["llm"], stats["llm"])
+        if metrics is not None:
+            metrics.merge(stats["metrics"])
+        if prompt_sink is not None:
+            prompt_sink.merge(prompts)
+        return results
+
+    max_in_flight = 2 * workers
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=worker_args) as pool:
+        for chunk in batches:
+            # Empty batches (every row reused from a manifest) skip the pool
+            pending.append(pool.submit(task, chunk) if chunk else None)
+            if len(pending) >= max_in_flight:
+                yield collect(pending.popleft())
+        while pending:
+            yield collect(pending.popleft())
+
+
+def _iter_incremental(reader, manifest, validate_batches, batch_rows):
+    """
+    Yield batches of results in input order, reusing manifest entries for
+    unchanged rows. Changed and new rows are collected into batches of up
+    to batch_rows for validate_batches (a function from an iterable of row
+    batches to an iterator of their (results, failed) pairs, in the same
+    order), and their results are stored in the manifest, except those of
+    rows whose fallback request failed. A batch is cut after at most
+    INCREMENTAL_SPAN * batch_rows input rows, so the reused rows waiting on
+    it stay bounded when few rows have changed.
+    """
+    # Per batch: reused results (None for validated rows), and the
+    # (source_row_id, digest) of each row handed to validate_batches
+    queue = deque()
+    max_span = INCREMENTAL_SPAN * batch_rows
+
+    def changed_batches():
+        reused, changed, keys = [], [], []
+        for block in _iter_chunks(reader, LOOKUP_BLOCK):
+            for row, (digest, previous) in zip(block, manifest.lookup(block)):
+                reused.append(previous)
+                if previous is None:
+                    changed.append(row)
+                    keys.append((row.source_row_id, digest))
+                if len(changed) >= batch_rows or len(reused) >= max_span:
+                    queue.append((reused, keys))
+                    yield changed
+                    reused, changed, keys = [], [], []
+        if reused:
+            queue.append((reused, keys))
+            yield changed
+
+    for validated, failed in validate_batches(changed_batches()):
+        reused, keys = queue.popleft()
+        failed = set(failed)
+        for i, ((row_id, digest), result) in enumerate(zip(keys, validated)):
+            manifest.put(row_id, digest, *result, i in failed)
+        validated = iter(validated)
+        yield [result if result is not None else next(validated) for result in reused]
+
+
+def _open_text(target, mode):
+    """open() a path for csv, or pass an already open text stream through unclosed."""
+    if hasattr(target, "read" if mode == "r" else "write"):
+        return nullcontext(target)
+    return open(target, mode, newline="")
+
+
+def steps_legend_path(out_csv):
+    """Where the compact steps legend for out_csv is written."""
+    out_csv = Path(out_csv)
+    return out_csv.with_name(f"{out_csv.stem}.steps_legend.json")
+
+
+def validate_records(layout, records, summary=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                     cache_size=DEFAULT_CACHE_SIZE, llm_backend=None,
+                     llm_batch_rows=DEFAULT_LLM_BATCH_ROWS,
+                     llm_batch_values=DEFAULT_VALUES_PER_REQUEST,
+                     llm_pipeline_depth=DEFAULT_LLM_PIPELINE_DEPTH, llm_cache=None,
+                     metrics=None, steps_format="verbose", manifest=None,
+                     cross_row_checks=True, cross_row_spill=None, networks=None,
+                     owner_directory=None, site_registry=None, input_path=None,
+                     prompt_sink=None):
+    """
+    Validate row_record.RawRows built by layout, yielding one list of
+    (clean_row, anomaly_record) per batch, in input order. clean_row is a
+    list in layout.fieldnames order; anomaly_record is None for clean rows.
+    This is the pipeline behind process() and validate_rows(), with no
+    file I/O of its own. summary (a dict) receives
+    the row count and the field cache, LLM, manifest and cross-row counters
+    once the last batch has been yielded.
+
+    LLM fallbacks are deferred and resolved once per llm_batch_rows rows:
+    ambiguous values are deduplicated and sent to llm_backend (default:
+    llm_utils.PlaceholderBackend) with at most llm_batch_values distinct
+    values per request. Backends that submit requests in the background
+    (llm_client.AsyncHTTPBackend) let up to llm_pipeline_depth batches wait
+    on their answers while later rows are validated. An llm_cache
+    (llm_cache.LLMResponseCache) answers values seen in earlier runs without
+    a request. Each request's prompt is logged to prompt_sink (an
+    llm_utils.PromptSink); the default None keeps no prompt log, and the
+    caller flushes the sink it passes.
+
+    With workers > 1, rows are validated in chunks of chunk_size on a process
+    pool and merged back in input order, so the results are identical to the
+    serial run. Each chunk is also one fallback batch. With input_path (the
+    CSV file records were read from), records is not read: the file is
+    memory-mapped and cut into byte ranges of about chunk_size records,
+    aligned to record boundaries outside quoted fields (see csv_ranges), and
+    each worker parses its own ranges. Workers hand their prompt log
+    entries back with each chunk, to be merged into prompt_sink.
+
+    cache_size bounds the per-process LRU caches in front of the owner,
+    device_type and site parsers (0 disables them).
+
+    metrics (a metrics.PipelineMetrics) collects stage latencies, LLM
+    fallback counts per field and anomaly counts per type, including from
+    workers; leave it None to skip instrumentation.
+
+    steps_format selects how the normalization_steps column is written:
+    "verbose" (default) spells each step out as text, "compact" writes step
+    codes and arguments (see step_codes.render_compact).
+
+    manifest (a manifest.RowManifest) makes the run incremental: rows whose
+    content is unchanged since the previous run with the same manifest are
+    copied from it instead of being validated. Changing the validators,
+    prompt templates, steps_format, llm_backend, networks, owner_directory or
+    site_registry invalidates it.
+
+    cross_row_checks flags rows that reuse an earlier row's IP, bind its MAC
+    to a different hostname or point its hostname at a different IP (see
+    cross_row_index). The index is held in memory, or in a scratch SQLite
+    file at cross_row_spill.
+
+    networks (a network_trie.NetworkTrie, see load_networks) assigns
+    subnet_cidr by longest-prefix match against an authoritative network
+    list and flags valid IPs outside every listed network as
+    ip_not_in_known_network. Without it, subnet_cidr is a /24 guess for
+    RFC1918 addresses.
+
+    owner_directory (an owner_directory.OwnerDirectory, see load_directory)
+    resolves owners the rules are not confident about, such as bare first
+    names, usernames and team aliases, by exact or unique-prefix lookup in
+    a people/team directory export before they fall back to the LLM.
+
+    site_registry (a site_registry.SiteRegistry, see load_site_registry)
+    maps sites onto registered codes, by exact spelling or within a few
+    edits, so misspelled sites neither fall back to the LLM nor become
+    site_normalized codes of their own. The step records the edit distance
+    and a confidence.
+    """
+    if input_path is not None and (workers <= 1 or manifest is not None):
+        raise ValueError("input_path needs workers > 1 and no manifest")
+    if summary is None:
+        summary = {}
+    summary.update({"rows": 0, "field_cache": {}, "llm": new_counters()})
+    render_steps = STEP_RENDERERS[steps_format]
+    configure_field_caches(cache_size)
+    if metrics is not None:
+        metrics.start_run()
+
+    if workers > 1:
+        batch_rows = chunk_size
+        worker_args = (cache_size, llm_backend, llm_batch_values, llm_cache,
+                       metrics is not None, steps_format, networks, owner_directory,
+                       site_registry, prompt_sink is not None)
+
+        def validate_batches(batches):
+            return _iter_parallel(batches, workers, worker_args, summary, metrics, prompt_sink)
+    else:
+        batch_rows = llm_batch_rows
+        before = field_cache_counters()
+        fallback = FallbackResolver(llm_backend, llm_batch_values, cache=llm_cache,
+                                    prompt_sink=prompt_sink)
+
+        def validate_batches(batches):
+            return _iter_pipelined(batches, fallback, llm_pipeline_depth,
+                                   metrics, render_steps, networks, owner_directory,
+                                   site_registry)
+
+    if input_path is not None:
+        with MappedCSV(input_path) as mapped:
+            ranges = mapped.split_by_rows(chunk_size, workers)
+        batches = (results for results, _ in _iter_parallel(
+            ranges, workers, worker_args, summary, metrics, prompt_sink,
+            partial(_validate_range, str(input_path), layout)))
+    elif manifest is None:
+        batches = (results for results, _ in validate_batches(_iter_chunks(records, batch_rows)))
+    else:
+        fingerprint = version_fingerprint(layout.header, steps_format, llm_backend, networks,
+                                          owner_directory, site_registry)
+        manifest.begin(fingerprint)
+        batches = _iter_incremental(records, manifest, validate_batches, batch_rows)
+    cross_row = None
+    if cross_row_checks:
+        if cross_row_spill:
+            cross_row = SpilledCrossRowIndex(cross_row_spill)
+        else:
+            cross_row = CrossRowIndex()
+
+    try:
+        for batch in batches:
+            if cross_row is not None:
+                batch = cross_row.check_block(batch)
+            summary["rows"] += len(batch)
+            yield batch
+    finally:
+        if cross_row is not None:
+            cross_row.close()
+
+    if workers <= 1:
+        merge_counters(summary["field_cache"], diff_counters(field_cache_counters(), before))
+        _merge_llm_counters(summary["llm"], fallback.counters)
+    if manifest is not None:
+        manifest.finish()
+        summary["manifest"] = dict(manifest.counters)
+    if cross_row is not None:
+        summary["cross_row"] = dict(cross_row.counters)
+        if metrics is not None:
+            metrics.count_anomalies(cross_row.counters)
+    if metrics is not None:
+        metrics.stop_run()
+
+
+def validate_rows(rows, fieldnames=None, summary=None, **options):
+    """
+    Validate rows held in memory, with no CSV serialize/parse round trip.
+
+    rows is an iterable of mappings keyed by column name (dicts, or
+    csv.DictReader rows); values that are not strings are converted as
+    row_record.cell_text does. The input columns are fieldnames, by
+    default the keys of the first row; a row with any other column raises
+    ValueError. Yields (clean_row, anomaly_record) pairs in input order as
+    each batch finishes, clean_row being a dict keyed by the output columns
+    (row_record.CORE_FIELDS, then the other input columns). Takes the
+    options of validate_records(), except input_path; summary receives its
+    counters once the last pair has been yielded. Nothing is written to
+    prompts.md unless a prompt_sink is passed and flushed by the caller.
+    """
+    rows = iter(rows)
+    if fieldnames is None:
+        first = next(rows, None)
+        if first is None:
+            return
+        fieldnames = list(first)
+        rows = chain([first], rows)
+    layout = RowLayout(fieldnames)
+    columns = frozenset(layout.header)
+
+    def records():
+        from_mapping = layout.from_mapping
+        for row in rows:
+            if not columns.issuperset(row):
+                raise ValueError(f"row has columns not in fieldnames: "
+                                 f"{sorted(map(str, set(row) - columns))}")
+            yield from_mapping(row)
+
+    output = layout.fieldnames
+    for batch in validate_records(layout, records(), summary, **options):
+        for clean_row, anomaly_record in batch:
+            yield dict(zip(output, clean_row)), anomaly_record
+
+
+def process(input_csv, out_csv, anomalies_json, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+            anomalies_format="json", cache_size=DEFAULT_CACHE_SIZE,
+            llm_backend=None, llm_batch_rows=DEFAULT_LLM_BATCH_ROWS,
+            llm_batch_values=DEFAULT_VALUES_PER_REQUEST,
+            llm_pipeline_depth=DEFAULT_LLM_PIPELINE_DEPTH, llm_cache=None, metrics=None,
+            steps_format="verbose", manifest=None, cross_row_checks=True,
+            cross_row_spill=None, networks=None, owner_directory=None, site_registry=None,
+            steps_legend=None, split_input=False):
+    """
+    Clean input_csv into out_csv and anomalies_json.
+    Returns a summary dict with the row count, field cache and LLM counters.
+
+    A file front end to validate_records(), which documents the validation
+    options. Prompts of LLM requests are logged to prompts.md. Each of
+    input_csv, out_csv and anomalies_json is a path or an open text stream
+    (e.g. sys.stdin / sys.stdout, opened with newline="").
+    Rows flow through the stages as a generator pipeline of batches: read,
+    validate, cross-row check, write. Every finished batch is written and
+    flushed before the next one is read, so a downstream reader sees clean
+    rows as soon as their batch is validated and memory stays flat
+    however long the input is. Streams are left open. With workers > 1,
+    both outputs are byte-identical to the serial run.
+
+    Anomaly records are streamed to anomalies_json as each row finishes
+    (a JSON array by default, or NDJSON with anomalies_format="ndjson"),
+    so memory stays flat regardless of how many rows are flagged.
+
+    With split_input, input_csv is memory-mapped and each worker parses its
+    own byte ranges of it instead of receiving rows from this process; it
+    needs workers > 1, an input path and no manifest.
+
+    With steps_format="compact", the code table is saved to steps_legend,
+    by default next to out_csv as <stem>.steps_legend.json (not written
+    when out_csv is a stream and no steps_legend is given).
+    """
+    if split_input and (workers <= 1 or manifest is not None or hasattr(input_csv, "read")):
+        raise ValueError("split_input needs workers > 1, an input path and no manifest")
+    summary = {}
+
+    with _open_text(input_csv, "r") as f, _open_text(out_csv, "w") as g, \
+            AnomalyWriter(anomalies_json, anomalies_format) as anomalies:
+        reader = csv.reader(f)
+        layout = RowLayout(next(reader, []))
+        writer = csv.writer(g)
+        writer.writerow(layout.fieldnames)
+
+        batches = validate_records(
+            layout, layout.records(reader), summary, workers=workers, chunk_size=chunk_size,
+            cache_size=cache_size, llm_backend=llm_backend, llm_batch_rows=llm_batch_rows,
+            llm_batch_values=llm_batch_values, llm_pipeline_depth=llm_pipeline_depth,
+            llm_cache=llm_cache, metrics=metrics, steps_format=steps_format,
+            manifest=manifest, cross_row_checks=cross_row_checks,
+            cross_row_spill=cross_row_spill, networks=networks,
+            owner_directory=owner_directory, site_registry=site_registry,
+            input_path=input_csv if split_input else None, prompt_sink=get_prompt_sink(),
+        )
+        for batch in batches:
+            writer.writerows(clean_row for clean_row, _ in batch)
+            for _, anomaly_record in batch:
+                if anomaly_record is not None:
+                    anomalies.write(anomaly_record)
+            g.flush()
+            anomalies.flush()
+    flush_prompts()
+
+    if steps_format == "compact":
+        if steps_legend is None and not hasattr(out_csv, "write"):
+            steps_legend = steps_legend_path(out_csv)
+        if steps_legend is not None:
+            write_legend(steps_legend)
+    return summary
 
 
 def main():
-    input_csv = HERE / "inventory_raw.csv"
-    out_csv = HERE / "inventory_clean.csv"
-    anomalies_json = HERE / "anomalies.json"
+    parser = argparse.ArgumentParser(description="Clean and normalize a raw inventory CSV.")
+    parser.add_argument(
+        "input_csv", nargs="?", default=str(HERE / "inventory_raw.csv"),
+        help="raw inventory CSV, - for stdin (default: inventory_raw.csv next to this script)",
+    )
+    parser.add_argument(
+        "--output", metavar="PATH",
+        help="clean CSV, - to stream it to stdout (default: inventory_clean.csv next to "
+             "this script); with -, the run summary goes to stderr",
+    )
+    anomalies_target = parser.add_mutually_exclusive_group()
+    anomalies_target.add_argument(
+        "--anomalies", metavar="PATH",
+        help="anomaly records (default: anomalies.json or anomalies.ndjson next to this script)",
+    )
+    anomalies_target.add_argument(
+        "--anomalies-fd", metavar="N", type=int,
+        help="write anomaly records to an already open file descriptor, e.g. 3 with 3>file",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="number of worker processes (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"rows per worker task in --workers mode (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--split-input", action="store_true",
+        help="--workers mode: memory-map the input and let each worker parse its own "
+             "record-aligned byte ranges instead of receiving rows from one reader",
+    )
+    parser.add_argument(
+        "--serve", metavar="ADDR",
+        help="run as a long-lived validation service on HOST:PORT or unix:PATH instead of "
+             "cleaning a file (see service.py); input and output options are ignored",
+    )
+    parser.add_argument(
+        "--prompt-log", metavar="PATH",
+        help="--serve mode: append the prompts of LLM requests to PATH "
+             "(default: no prompt log)",
+    )
+    parser.add_argument(
+        "--anomalies-format", choices=ANOMALY_FORMATS, default="json",
+        help="json: a single array in anomalies.json (default); "
+             "ndjson: one record per line in anomalies.ndjson",
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+        help=f"LRU entries per owner/device_type/site parser cache, 0 to disable "
+             f"(default: {DEFAULT_CACHE_SIZE})",
+    )
+    parser.add_argument(
+        "--steps-format", choices=tuple(STEP_RENDERERS), default="verbose",
+        help="normalization_steps as text (verbose, default) or as step codes "
+             "with a legend file next to the output (compact)",
+    )
+    parser.add_argument(
+        "--steps-legend", metavar="PATH",
+        help="where --steps-format compact writes its legend (default: <output stem>"
+             ".steps_legend.json; required to get one with --output -)",
+    )
+    parser.add_argument(
+        "--manifest", metavar="PATH",
+        help="SQLite manifest for incremental runs: unchanged rows are copied from the "
+             "previous run instead of being validated (default: validate every row)",
+    )
+    parser.add_argument(
+        "--networks", metavar="CSV",
+        help="authoritative network list (a cidr column plus metadata); subnet_cidr becomes "
+             "the longest matching prefix and IPs outside every network are flagged",
+    )
+    parser.add_argument(
+        "--owner-directory", metavar="PATH",
+        help="people/team directory export (CSV with name, username, email, team columns, "
+             "or .ldif); owners the rules cannot parse are looked up there before the LLM",
+    )
+    parser.add_argument(
+        "--site-registry", metavar="CSV",
+        help="canonical site registry (a site column, optional name and aliases); sites are "
+             "matched to registered codes, misspellings within a few edits included",
+    )
+    parser.add_argument(
+        "--no-cross-row-checks", dest="cross_row_checks", action="store_false",
+        help="skip the duplicate IP and MAC/hostname/IP conflict checks across rows",
+    )
+    parser.add_argument(
+        "--cross-row-spill", metavar="PATH",
+        help="keep the cross-row index in a scratch SQLite file instead of memory",
+    )
+    parser.add_argument(
+        "--metrics-json", metavar="PATH",
+        help="write stage latencies, LLM fallback and anomaly counts as JSON",
+    )
+    parser.add_argument(
+        "--metrics-prom", metavar="PATH",
+        help="write the same metrics as a Prometheus textfile",
+    )
+    parser.add_argument(
+        "--llm-backend", choices=("placeholder", "http", "async-http"), default="placeholder",
+        help="fallback backend: placeholder values (default), a blocking JSON-over-HTTP "
+             "endpoint, or the pooled asyncio client for the same endpoint",
+    )
+    parser.add_argument("--llm-url", help="endpoint for the http backends")
+    parser.add_argument(
+        "--llm-max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+        help=f"async-http: concurrent requests (default: {DEFAULT_MAX_IN_FLIGHT})",
+    )
+    parser.add_argument(
+        "--llm-rate", type=float, default=None,
+        help="async-http: max requests per second (token bucket; default: unlimited)",
+    )
+    parser.add_argument(
+        "--llm-timeout", type=float, default=DEFAULT_TIMEOUT,
+        help=f"http backends: seconds per attempt (default: {DEFAULT_TIMEOUT:g})",
+    )
+    parser.add_argument(
+        "--llm-retries", type=int, default=DEFAULT_MAX_RETRIES,
+        help=f"async-http: retries with jittered backoff (default: {DEFAULT_MAX_RETRIES})",
+    )
+    parser.add_argument(
+        "--llm-pipeline-depth", type=int, default=DEFAULT_LLM_PIPELINE_DEPTH,
+        help=f"fallback batches allowed in flight while later rows are validated "
+             f"(default: {DEFAULT_LLM_PIPELINE_DEPTH})",
+    )
+    parser.add_argument(
+        "--llm-cache", metavar="PATH",
+        help="SQLite file caching fallback answers across runs (default: no cache)",
+    )
+    parser.add_argument(
+        "--llm-cache-ttl", type=float, default=None,
+        help="seconds before a cached answer expires (default: never)",
+    )
+    parser.add_argument(
+        "--llm-cache-max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+        help=f"cached answers kept, least recently used evicted first "
+             f"(default: {DEFAULT_MAX_ENTRIES})",
+    )
+    parser.add_argument(
+        "--llm-batch-rows", type=int, default=DEFAULT_LLM_BATCH_ROWS,
+        help=f"rows validated before deferred fallbacks are resolved "
+             f"(default: {DEFAULT_LLM_BATCH_ROWS}; --chunk-size in --workers mode)",
+    )
+    parser.add_argument(
+        "--llm-batch-values", type=int, default=DEFAULT_VALUES_PER_REQUEST,
+        help=f"distinct values per fallback request (default: {DEFAULT_VALUES_PER_REQUEST})",
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be >= 1")
+    if args.split_input and (args.workers < 2 or args.input_csv == "-" or args.manifest):
+        parser.error("--split-input needs --workers >= 2, an input file and no --manifest")
+    if args.serve and (args.workers > 1 or args.split_input or args.manifest):
+        parser.error("--serve validates in one process and takes no --workers, "
+                     "--split-input or --manifest")
+    if args.prompt_log and not args.serve:
+        parser.error("--prompt-log needs --serve; file runs log to TEMPLATES/prompts.md")
+    if args.cache_size < 0:
+        parser.error("--cache-size must be >= 0")
+    if args.llm_batch_rows < 1 or args.llm_batch_values < 1:
+        parser.error("--llm-batch-rows and --llm-batch-values must be >= 1")
+    if args.llm_pipeline_depth < 1 or args.llm_max_in_flight < 1:
+        parser.error("--llm-pipeline-depth and --llm-max-in-flight must be >= 1")
+    if args.llm_backend != "placeholder" and not args.llm_url:
+        parser.error(f"--llm-backend {args.llm_backend} requires --llm-url")
+    if args.llm_backend == "http":
+        llm_backend = HTTPBackend(args.llm_url, timeout=args.llm_timeout)
+    elif args.llm_backend == "async-http":
+        llm_backend = AsyncHTTPBackend(
+            args.llm_url, max_in_flight=args.llm_max_in_flight, rate=args.llm_rate,
+            timeout=args.llm_timeout, max_retries=args.llm_retries,
+        )
+    else:
+        llm_backend = PlaceholderBackend()
+    llm_cache = None
+    if args.llm_cache:
+        llm_cache = LLMResponseCache(args.llm_cache, ttl=args.llm_cache_ttl,
+                                     max_entries=args.llm_cache_max_entries)
+
+    metrics = PipelineMetrics() if args.metrics_json or args.metrics_prom else None
+    networks = None
+    if args.networks:
+        try:
+            networks = load_networks(args.networks)
+        except (OSError, ValueError) as e:
+            parser.error(f"--networks: {e}")
+    owner_directory = None
+    if args.owner_directory:
+        try:
+            owner_directory = load_directory(args.owner_directory)
+        except (OSError, ValueError, csv.Error, UnicodeDecodeError) as e:
+            parser.error(f"--owner-directory: {e}")
+    site_registry = None
+    if args.site_registry:
+        try:
+            site_registry = load_site_registry(args.site_registry)
+        except (OSError, ValueError, csv.Error, UnicodeDecodeError) as e:
+            parser.error(f"--site-registry: {e}")
+    if args.serve:
+        # Imported here: the service module builds on this one
+        from service import ValidationService, serve
+        service = ValidationService(
+            llm_backend=llm_backend, llm_batch_rows=args.llm_batch_rows,
+            llm_batch_values=args.llm_batch_values, llm_cache=llm_cache,
+            cache_size=args.cache_size, steps_format=args.steps_format,
+            cross_row_checks=args.cross_row_checks, networks=networks,
+            owner_directory=owner_directory, site_registry=site_registry,
+            prompt_log=args.prompt_log,
+        )
+        try:
+            serve(args.serve, service)
+        except (OSError, ValueError) as e:
+            parser.error(f"--serve: {e}")
+        finally:
+            if hasattr(llm_backend, "close"):
+                llm_backend.close()
+            if llm_cache is not None:
+                llm_cache.close()
+        return
+    manifest = RowManifest(args.manifest) if args.manifest else None
 
-    if len(sys.argv) >= 2:
-        input_csv = Path(sys.argv[1])
+    # Streaming mode: rows in on stdin and/or out on stdout, the summary on stderr
+    input_csv = args.input_csv
+    if input_csv == "-":
+        sys.stdin.reconfigure(newline="")
+        input_csv = sys.stdin
+    out_csv = args.output or str(HERE / "inventory_clean.csv")
+    log = sys.stdout
+    if out_csv == "-":
+        sys.stdout.reconfigure(newline="")
+        out_csv, log = sys.stdout, sys.stderr
+    if args.anomalies_fd is not None:
+        try:
+            anomalies_json = open(args.anomalies_fd, "w", closefd=False)
+        except OSError as e:
+            parser.error(f"--anomalies-fd: {e}")
+    else:
+        anomalies_json = args.anomalies or str(HERE / f"anomalies.{args.anomalies_format}")
+    steps_legend = args.steps_legend
+    if steps_legend is None and args.steps_format == "compact" and out_csv is not sys.stdout:
+        steps_legend = steps_legend_path(out_csv)
 
-    process(str(input_csv), str(out_csv), str(anomalies_json))
-    print(f"Wrote {out_csv} and {anomalies_json}")
+    try:
+        summary = process(input_csv, out_csv, anomalies_json,
+                          workers=args.workers, chunk_size=args.chunk_size,
+                          anomalies_format=args.anomalies_format, cache_size=args.cache_size,
+                          llm_backend=llm_backend, llm_batch_rows=args.llm_batch_rows,
+                          llm_batch_values=args.llm_batch_values,
+                          llm_pipeline_depth=args.llm_pipeline_depth, llm_cache=llm_cache,
+                          metrics=metrics, steps_format=args.steps_format,
+                          manifest=manifest, cross_row_checks=args.cross_row_checks,
+                          cross_row_spill=args.cross_row_spill, networks=networks,
+                          owner_directory=owner_directory, site_registry=site_registry,
+                          steps_legend=steps_legend, split_input=args.split_input)
+    except BrokenPipeError:
+        # The reader of stdout went away (e.g. `| head`); stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    if hasattr(llm_backend, "close"):
+        llm_backend.close()
+    if llm_cache is not None:
+        llm_cache.close()
+    if manifest is not None:
+        manifest.close()
+    if args.anomalies_fd is not None:
+        anomalies_json.close()
+        anomalies_json = f"fd {args.anomalies_fd}"
+    print(f"Wrote {getattr(out_csv, 'name', out_csv)} and {anomalies_json}", file=log)
+    if steps_legend is not None and args.steps_format == "compact":
+        print(f"Wrote step code legend to {steps_legend}", file=log)
+    for line in format_counters(summary["field_cache"]):
+        print(line, file=log)
+    llm = summary["llm"]
+    print(
+        f"llm fallback: rows={llm['deferred_rows']} distinct={llm['distinct_values']} "
+        f"requests={llm['requests']} prompt_tokens~{llm['prompt_tokens']} "
+        f"completion_tokens~{llm['completion_tokens']} errors={llm['errors']} "
+        f"cache_hits={llm['cache_hits']}",
+        file=log,
+    )
+    if "cross_row" in summary:
+        print("cross-row: " + " ".join(f"{k}={v}" for k, v in summary["cross_row"].items()),
+              file=log)
+    if manifest is not None:
+        counts = summary["manifest"]
+        print(f"manifest: reused={counts['reused']} validated={counts['validated']}"
+              + (" (invalidated by a version change)" if counts["invalidated"] else ""),
+              file=log)
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json)
+        print(f"Wrote metrics to {args.metrics_json}", file=log)
+    if args.metrics_prom:
+        metrics.write_prometheus(args.metrics_prom)
+        print(f"Wrote metrics to {args.metrics_prom}", file=log)
 
 
 if __name__ == "__main__":
@@ -9,6 +9,11 @@ import json
 
 from prompt_templates import DEVICE_TYPE_PROMPT_TEMPLATE
 from llm_utils import append_prompt_to_md, get_llm_placeholder
+from field_cache import register_field_cache
+from step_codes import DEVICE_TYPE_LOWERCASED, DEVICE_TYPE_MATCHED, llm_step
+
+# Memoized parse results, keyed on the raw device_type value
+_CACHE = register_field_cache("device_type")
 
 # Keyword mapping: pattern → (canonical_type, confidence)
 # Order matters: more specific patterns first
@@ -85,6 +90,29 @@ _DEVICE_TYPE_KEYWORDS = [
 ]
 
 
+def _compile_keyword_matcher(keywords):
+    """
+    Compile the keyword table into a single regex with first-match-wins order.
+
+    Each entry becomes a lookahead that scans the whole value, followed by an
+    empty named group identifying the entry. Alternatives are tried in table
+    order at position 0, so re.match reports the first table entry that
+    matches anywhere in the value, exactly like a re.search loop over the table.
+    This is one call into the regex engine, not one pass over the value: each
+    lookahead still re-scans the value until an entry matches.
+    """
+    alternatives = [
+        rf"(?=(?s:.*?)(?:{pattern}))(?P<k{i}>)"
+        for i, (pattern, _, _) in enumerate(keywords)
+    ]
+    matcher = re.compile("|".join(alternatives), re.IGNORECASE)
+    entries = {f"k{i}": entry for i, entry in enumerate(keywords)}
+    return matcher, entries
+
+
+_DEVICE_TYPE_MATCHER, _DEVICE_TYPE_ENTRIES = _compile_keyword_matcher(_DEVICE_TYPE_KEYWORDS)
+
+
 def deterministic_device_type_parse(device_raw, notes, steps):
     """
     Parse device_type field deterministically.
@@ -94,39 +122,48 @@ def deterministic_device_type_parse(device_raw, notes, steps):
         return ("", "low")
 
     value = str(device_raw).strip().lower()
-    steps.append("device_type: lowercased")
+    steps.append(DEVICE_TYPE_LOWERCASED)
 
-    # Try each pattern
-    for pattern, canonical, confidence in _DEVICE_TYPE_KEYWORDS:
-        if re.search(pattern, value, re.IGNORECASE):
-            steps.append(f"device_type: matched pattern '{pattern}' → {canonical}")
-            return (canonical, confidence)
+    # Try every pattern in one pass; the first table entry that matches wins
+    match = _DEVICE_TYPE_MATCHER.match(value)
+    if match:
+        pattern, canonical, confidence = _DEVICE_TYPE_ENTRIES[match.lastgroup]
+        steps.append((DEVICE_TYPE_MATCHED, pattern, canonical))
+        return (canonical, confidence)
 
     # No match
     return (value, "low")
 
 
-def validate_device_type_field(row, anomalies, normalization_steps):
+def validate_device_type_field(row, anomalies, normalization_steps, fallback=None):
     """
-    Validate and normalize device_type field.
-    Returns dict with device_type, device_type_confidence.
+    Validate and normalize the device_type field of a row_record.RawRow.
+    Returns a list [device_type, device_type_confidence].
+    If fallback (an llm_fallback.FallbackResolver) is given, low-confidence
+    values are deferred to it and the list is filled in when it resolves.
     """
-    device_raw = row.get("device_type", "")
-    notes = row.get("notes", "")
-    row_id = row.get("source_row_id", "unknown")
+    device_raw = row.device_type
+    notes = row.notes
+    row_id = row.source_row_id
 
     steps = []
-    device_type, confidence = deterministic_device_type_parse(device_raw, notes, steps)
+    device_type, confidence = _CACHE.parse(deterministic_device_type_parse, device_raw, notes, steps)
 
     if confidence in ("high", "medium"):
         normalization_steps.extend(steps)
-        return {
-            "device_type": device_type,
-            "device_type_confidence": confidence,
-        }
+        return [device_type, confidence]
+
+    # Deferred LLM fallback, resolved in batches by the caller
+    if fallback is not None:
+        normalization_steps.extend(steps)
+        placeholder = get_llm_placeholder("device_type")
+        result = [placeholder["device_type"], placeholder["device_type_confidence"]]
+        fallback.defer("device_type", device_raw, row_id, result, normalization_steps)
+        return result
 
     # LLM fallback for low confidence
-    row_json = json.dumps({k: v for k, v in row.items() if k in ("device_type", "hostname", "owner", "site", "source_row_id")}, indent=2)
+    # source_row_id is left out so repeated prompts collapse in the prompt log
+    row_json = json.dumps({k: v for k, v in row.items() if k in ("device_type", "hostname", "owner", "site")}, indent=2)
     prompt = DEVICE_TYPE_PROMPT_TEMPLATE.format(row_json=row_json, notes=notes)
     rationale = (
         f"Unable to classify device_raw='{device_raw}' "
@@ -140,10 +177,7 @@ def validate_device_type_field(row, anomalies, normalization_steps):
     append_prompt_to_md("Device Type", row_id, prompt, rationale, expected_schema)
 
     normalization_steps.extend(steps)
-    normalization_steps.append("device_type: llm_generated_placeholder")
+    normalization_steps.append(llm_step("device_type", "llm_generated_placeholder"))
 
     placeholder = get_llm_placeholder("device_type")
-    return {
-        "device_type": placeholder["device_type"],
-        "device_type_confidence": placeholder["device_type_confidence"],
-    }
+    return [placeholder["device_type"], placeholder["device_type_confidence"]]
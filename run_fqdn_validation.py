@@ -6,34 +6,41 @@ Used by run.py; no standalone execution.
 
 import re
 
+from run_ipv4_validation import ipv4_reverse_ptr
+from step_codes import FQDN_LOWERCASED, FQDN_NORMALIZED, FQDN_TRAILING_DOT, FQDN_TRIMMED
+
 _LABEL_PATTERN = re.compile(r"^[a-z0-9][a-z0-9\-]{0,61}[a-z0-9]$|^[a-z0-9]$")
 
 
-def validate_fqdn_field(row, hostname_result, anomalies, normalization_steps):
+def validate_fqdn_field(row, hostname_result, anomalies, normalization_steps, ip_packed=None):
     """
-    Validate and normalize the 'fqdn' field of a row.
+    Validate and normalize the 'fqdn' field of a row (a row_record.RawRow).
+    hostname_result is validate_hostname_field's (hostname, valid) and
+    ip_packed the validated address as an int (run_ipv4_validation.ipv4_parse),
+    None when the ip is invalid.
+    Returns (fqdn, fqdn_consistent, reverse_ptr).
     """
-    raw = row.get("fqdn")
+    raw = row.fqdn
 
     # --- Missing ---
     if raw is None or str(raw).strip() == "":
         anomalies.append({"field": "fqdn", "type": "fqdn_missing"})
-        return {"fqdn": "", "fqdn_consistent": "false", "reverse_ptr": ""}
+        return ("", "false", "")
 
     raw_str = str(raw)
     value = raw_str.strip()
 
     if value != raw_str:
-        normalization_steps.append("fqdn: trimmed whitespace")
+        normalization_steps.append(FQDN_TRIMMED)
 
     lowered = value.lower()
     if lowered != value:
-        normalization_steps.append("fqdn: lowercased")
+        normalization_steps.append(FQDN_LOWERCASED)
     value = lowered
 
     if value.endswith("."):
         value = value.rstrip(".")
-        normalization_steps.append("fqdn: removed trailing dot")
+        normalization_steps.append(FQDN_TRAILING_DOT)
 
     # --- Validate labels ---
     labels = value.split(".")
@@ -45,7 +52,7 @@ def validate_fqdn_field(row, hostname_result, anomalies, normalization_steps):
                 "type": "fqdn_empty_label",
                 "value": raw_str
             })
-            return {"fqdn": raw_str, "fqdn_consistent": "false", "reverse_ptr": ""}
+            return (raw_str, "false", "")
 
         # Length > 63
         if len(label) > 63:
@@ -54,7 +61,7 @@ def validate_fqdn_field(row, hostname_result, anomalies, normalization_steps):
                 "type": "fqdn_label_too_long",
                 "value": raw_str
             })
-            return {"fqdn": raw_str, "fqdn_consistent": "false", "reverse_ptr": ""}
+            return (raw_str, "false", "")
 
         # Invalid characters (not matching allowed pattern)
         if not _LABEL_PATTERN.match(label):
@@ -63,30 +70,25 @@ def validate_fqdn_field(row, hostname_result, anomalies, normalization_steps):
                 "type": "fqdn_label_invalid_chars",
                 "value": raw_str
             })
-            return {"fqdn": raw_str, "fqdn_consistent": "false", "reverse_ptr": ""}
+            return (raw_str, "false", "")
 
-    normalization_steps.append(f"fqdn: normalized to {value}")
+    normalization_steps.append((FQDN_NORMALIZED, value))
 
     # --- fqdn_consistent ---
     fqdn_consistent = "false"
-    if hostname_result.get("hostname_valid"):
+    hostname, hostname_valid = hostname_result
+    if hostname_valid:
         first_label = labels[0]
-        if first_label == hostname_result.get("hostname", ""):
+        if first_label == hostname:
             fqdn_consistent = "true"
         else:
             anomalies.append({
                 "field": "fqdn",
                 "type": "fqdn_hostname_mismatch",
-                "value": f"fqdn={value}, hostname={hostname_result.get('hostname', '')}"
+                "value": f"fqdn={value}, hostname={hostname}"
             })
 
     # --- reverse_ptr ---
-    reverse_ptr = ""
-    ip_valid = row.get("ip_valid", "")
-    ip = row.get("ip", "")
-    if str(ip_valid).lower() == "true" and ip:
-        parts = ip.split(".")
-        if len(parts) == 4:
-            reverse_ptr = f"{parts[3]}.{parts[2]}.{parts[1]}.{parts[0]}.in-addr.arpa."
-
-    return {"fqdn": value, "fqdn_consistent": fqdn_consistent, "reverse_ptr": reverse_ptr}
+    reverse_ptr = ipv4_reverse_ptr(ip_packed) if ip_packed is not None else ""
+
+    return (value, fqdn_consistent, reverse_ptr)
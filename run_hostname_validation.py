@@ -6,6 +6,11 @@ Used by run.py; no standalone execution.
 
 import re
 
+from step_codes import (
+    HOSTNAME_FIRST_LABEL, HOSTNAME_LOWERCASED, HOSTNAME_NORMALIZED, HOSTNAME_TRAILING_DOT,
+    HOSTNAME_TRIMMED,
+)
+
 # RFC 1123 relaxed: starts/ends with alnum, middle can have hyphens, max 63 chars
 _HOSTNAME_PATTERN = re.compile(r"^[a-z0-9]([a-z0-9\-]{0,61}[a-z0-9])?$")
 
@@ -16,70 +21,70 @@ def validate_hostname_field(row, anomalies, normalization_steps):
 
     Parameters
     ----------
-    row : dict
-        The current CSV row (expects key 'hostname').
+    row : row_record.RawRow
+        The current CSV row (reads row.hostname).
     anomalies : list
         Shared list to which anomaly dicts are appended.
     normalization_steps : list
-        Shared list to which normalization action strings are appended.
+        Shared list to which normalization step codes are appended.
 
     Returns
     -------
-    dict
-        {"hostname": <normalized_or_raw>, "hostname_valid": True/False}
+    tuple
+        (<normalized_or_raw>, hostname_valid True/False)
     """
-    raw = row.get("hostname")
+    raw = row.hostname
 
     # --- Missing ---
     if raw is None or str(raw).strip() == "":
         anomalies.append({"field": "hostname", "type": "hostname_missing"})
-        return {"hostname": "", "hostname_valid": False}
+        return ("", False)
 
     raw_str = str(raw)
     value = raw_str.strip()
 
     # Note trimming
     if value != raw_str:
-        normalization_steps.append("hostname: trimmed whitespace")
+        normalization_steps.append(HOSTNAME_TRIMMED)
 
     # Lowercase
     lowered = value.lower()
     if lowered != value:
-        normalization_steps.append("hostname: lowercased")
+        normalization_steps.append(HOSTNAME_LOWERCASED)
     value = lowered
 
     # Remove trailing dot (often seen in FQDN notation)
     if value.endswith("."):
         value = value.rstrip(".")
-        normalization_steps.append("hostname: removed trailing dot")
+        normalization_steps.append(HOSTNAME_TRAILING_DOT)
 
     # If contains dots, extract first label as hostname
     if "." in value:
         value = value.split(".")[0]
-        normalization_steps.append("hostname: extracted first label from FQDN")
+        normalization_steps.append(HOSTNAME_FIRST_LABEL)
 
     # --- Validation checks ---
 
     # Check for leading hyphen
     if value.startswith("-"):
         anomalies.append({"field": "hostname", "type": "hostname_leading_hyphen", "value": raw_str})
-        return {"hostname": raw_str, "hostname_valid": False}
+        return (raw_str, False)
 
     # Check length
     if len(value) > 63:
         anomalies.append({"field": "hostname", "type": "hostname_too_long", "value": raw_str})
-        return {"hostname": raw_str, "hostname_valid": False}
+        return (raw_str, False)
 
     # Check for invalid characters (anything outside a-z0-9-)
     if not re.fullmatch(r"[a-z0-9\-]*", value):
         anomalies.append({"field": "hostname", "type": "hostname_invalid_chars", "value": raw_str})
-        return {"hostname": raw_str, "hostname_valid": False}
+        return (raw_str, False)
 
     # Full pattern match (RFC 1123 relaxed)
     if not _HOSTNAME_PATTERN.match(value):
         # Catches edge cases like ending with hyphen or empty after normalization
         anomalies.append({"field": "hostname", "type": "hostname_invalid_chars", "value": raw_str})
-        return {"hostname": raw_str, "hostname_valid": False}
+        return (raw_str, False)
 
-    normalization_steps.append(f"hostname: normalized to {value}")
-    return {"hostname": value, "hostname_valid": True}
+    normalization_steps.append((HOSTNAME_NORMALIZED, value))
+    return (value, True)
@@ -6,56 +6,98 @@ Used by run.py; no standalone execution.
 
 
 def ipv4_validate_and_normalize(ip_str):
+    valid, canonical, reason, _ = ipv4_parse(ip_str)
+    return (valid, canonical, reason)
+
+
+def ipv4_parse(ip_str):
+    """
+    Validate ip_str and return (valid, canonical, reason, packed), where
+    packed is the address as a uint32-range int (None when invalid).
+    """
     if ip_str is None:
-        return (False, None, "missing")
+        return (False, None, "missing", None)
     # remove surrounding whitespace
     s = str(ip_str).strip() 
     # quick reject obvious IPv6 / non-dot forms
     if ":" in s:
-        return (False, None, "ipv6_or_non_ipv4")
+        return (False, None, "ipv6_or_non_ipv4", None)
     # split into 4 octects
     parts = s.split(".")
     if len(parts) != 4:
-        return (False, None, "wrong_part_count")
+        return (False, None, "wrong_part_count", None)
     canonical_parts = []
+    packed = 0
     # ensure each part is numeric and in range
     for p in parts:
         if p == "":
-            return (False, None, "empty_octet")
+            return (False, None, "empty_octet", None)
         # negative or non-digit
         # ignore leading plus sign for digit check, and ensure octect doesn't start with '-'
         if not (p.lstrip("+").isdigit() and not p.startswith("-")):
-            return (False, None, "non_numeric_or_negative")
+            return (False, None, "non_numeric_or_negative", None)
         try:
             # ensures it is strictly base 10 ASCII digits
             v = int(p, 10)
         except ValueError:
-            return (False, None, "non_decimal_format")
+            return (False, None, "non_decimal_format", None)
         if v < 0 or v > 255:
-            return (False, None, "octet_out_of_range")
+            return (False, None, "octet_out_of_range", None)
         canonical_parts.append(str(v))
+        packed = (packed << 8) | v
     canonical = ".".join(canonical_parts)
-    return (True, canonical, "ok")
+    return (True, canonical, "ok", packed)
 
-def classify_ipv4_type(ip):
+# ---------------------------------------------------------------------------
+# Packed (uint32) helpers
+# ---------------------------------------------------------------------------
+
+def ipv4_pack(ip):
+    """Pack a canonical dotted-quad string into an int."""
+    a, b, c, d = map(int, ip.split("."))
+    return (a << 24) | (b << 16) | (c << 8) | d
+
+
+def ipv4_format(packed):
+    """Dotted-quad string for a packed address."""
+    return f"{packed >> 24}.{(packed >> 16) & 0xFF}.{(packed >> 8) & 0xFF}.{packed & 0xFF}"
+
+
+def ipv4_classify(packed):
     # Simple classification for context; not required for validity
-    o = list(map(int, ip.split(".")))
-    if o[0] == 10:
+    if packed & 0xFF000000 == 0x0A000000:      # 10.0.0.0/8
         return "private_rfc1918"
-    if o[0] == 172 and 16 <= o[1] <= 31:
+    if packed & 0xFFF00000 == 0xAC100000:      # 172.16.0.0/12
         return "private_rfc1918"
-    if o[0] == 192 and o[1] == 168:
+    if packed & 0xFFFF0000 == 0xC0A80000:      # 192.168.0.0/16
         return "private_rfc1918"
-    if o[0] == 169 and o[1] == 254:
+    if packed & 0xFFFF0000 == 0xA9FE0000:      # 169.254.0.0/16
         return "link_local_apipa"
-    if o[0] == 127:
+    if packed & 0xFF000000 == 0x7F000000:      # 127.0.0.0/8
         return "loopback"
     return "public_or_other"
-    
-def default_subnet(ip):
-    # Heuristic: /24 for RFC1918, else None (you can adapt this)
-    iptype = classify_ipv4_type(ip)
-    if iptype == "private_rfc1918":
-        parts = list(map(int, ip.split(".")))
-        return f"{parts[0]}.{parts[1]}.{parts[2]}.0/24"
+
+
+def ipv4_default_subnet(packed):
+    # Heuristic: /24 for RFC1918, else ""
+    if ipv4_classify(packed) == "private_rfc1918":
+        return f"{ipv4_format(packed & 0xFFFFFF00)}/24"
     return ""
+
+
+def ipv4_reverse_ptr(packed):
+    """in-addr.arpa. name for a packed address."""
+    return (f"{packed & 0xFF}.{(packed >> 8) & 0xFF}.{(packed >> 16) & 0xFF}."
+            f"{packed >> 24}.in-addr.arpa.")
+
+
+# ---------------------------------------------------------------------------
+# Dotted-quad wrappers
+# ---------------------------------------------------------------------------
+
+def classify_ipv4_type(ip):
+    return ipv4_classify(ipv4_pack(ip))
+
+
+def default_subnet(ip):
+    return ipv4_default_subnet(ipv4_pack(ip))
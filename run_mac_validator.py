@@ -6,6 +6,8 @@ Canonical output format: AA:BB:CC:DD:EE:FF (uppercase, colon-delimited).
 
 import re
 
+from step_codes import MAC_NORMALIZED, MAC_TRIMMED
+
 # ---------------------------------------------------------------------------
 # Helper: detect delimiter style
 # ---------------------------------------------------------------------------
@@ -41,37 +43,41 @@ def validate_mac_field(row, anomalies, normalization_steps):
 
     Parameters
     ----------
-    row : dict
-        The current CSV row (expects key 'mac').
+    row : row_record.RawRow
+        The current CSV row (reads row.mac).
     anomalies : list
         Shared list to which anomaly dicts are appended.
     normalization_steps : list
-        Shared list to which normalization action strings are appended.
+        Shared list to which normalization step codes are appended.
 
     Returns
     -------
-    dict
-        {"mac": <canonical_or_raw>, "mac_valid": True/False}
+    tuple
+        (<canonical_or_raw>, mac_valid True/False)
     """
-    raw = row.get("mac")
+    return validate_mac_value(row.mac, anomalies, normalization_steps)
+
+
+def validate_mac_value(raw, anomalies, normalization_steps):
+    """validate_mac_field for a bare mac value."""
 
     # --- Missing ---
     if raw is None or str(raw).strip() == "":
         anomalies.append({"field": "mac", "type": "mac_missing"})
-        return {"mac": "", "mac_valid": False}
+        return ("", False)
 
     raw_str = str(raw)
     trimmed = raw_str.strip()
 
     # Note trimming if whitespace was removed
     if trimmed != raw_str:
-        normalization_steps.append("mac: trimmed whitespace")
+        normalization_steps.append(MAC_TRIMMED)
 
     # --- Detect delimiter ---
     delim = _detect_delimiter(trimmed)
     if delim == "mixed":
         anomalies.append({"field": "mac", "type": "mac_mixed_delimiters", "value": raw_str})
-        return {"mac": raw_str, "mac_valid": False}
+        return (raw_str, False)
 
     # --- Remove delimiters and uppercase ---
     stripped = trimmed.replace(":", "").replace("-", "").replace(".", "").upper()
@@ -79,16 +85,16 @@ def validate_mac_field(row, anomalies, normalization_steps):
     # --- Length check (must be exactly 12 hex chars) ---
     if len(stripped) != 12:
         anomalies.append({"field": "mac", "type": "mac_wrong_length", "value": raw_str})
-        return {"mac": raw_str, "mac_valid": False}
+        return (raw_str, False)
 
     # --- Hex character check ---
     if not re.fullmatch(r"[0-9A-F]{12}", stripped):
         anomalies.append({"field": "mac", "type": "mac_invalid_chars", "value": raw_str})
-        return {"mac": raw_str, "mac_valid": False}
+        return (raw_str, False)
 
     # --- Build canonical AA:BB:CC:DD:EE:FF ---
     canonical = ":".join(stripped[i:i+2] for i in range(0, 12, 2))
 
-    normalization_steps.append(f"mac: normalized to {canonical}")
+    normalization_steps.append((MAC_NORMALIZED, canonical))
 
-    return {"mac": canonical, "mac_valid": True}
+    return (canonical, True)
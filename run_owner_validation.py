@@ -4,16 +4,29 @@ Deterministic owner validation with LLM fallback placeholder.
 Used by run.py; no standalone execution.
 """
 
-import re
 import json
 
 from prompt_templates import OWNER_PROMPT_TEMPLATE
 from llm_utils import append_prompt_to_md, get_llm_placeholder
+from field_cache import register_field_cache
+from step_codes import (
+    OWNER_AMBIGUOUS, OWNER_DIRECTORY_MATCH, OWNER_EMAIL_EXTRACTED, OWNER_EMAIL_FOUND,
+    OWNER_EMPTY, OWNER_MULTI_WORD_NAME, OWNER_NAME_EXTRACTED, OWNER_NAME_FROM_EMAIL,
+    OWNER_TEAM_BRACKETS, OWNER_TEAM_PARENS, OWNER_TEAM_PREFIX, OWNER_TEAM_TAG, OWNER_TRIMMED,
+    OWNER_WHITELIST_TEAM, llm_step,
+)
 
-_EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
-_TEAM_BRACKET_PATTERN = re.compile(r"\[([^\]]+)\]")
-_TEAM_PAREN_PATTERN = re.compile(r"\(([^)]+)\)")
-_TEAM_PREFIX_PATTERN = re.compile(r"(?:team\s*:\s*)(.+)", re.IGNORECASE)
+# Memoized parse results, keyed on the raw owner value
+_CACHE = register_field_cache("owner")
+
+# Email characters: local part, domain, and top-level domain, as in the
+# pattern [a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}
+_LETTERS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_LOCAL_CHARS = _LETTERS + "0123456789._%+-"
+_DOMAIN_CHARS = _LETTERS + "0123456789.-"
+# Folds "team" case-insensitively without moving any offsets; no other
+# character matches its letters ignoring case
+_TEAM_FOLD = str.maketrans("TEAM", "team")
 
 # Infoblox-provided valid single-token team names (whitelist)
 KNOWN_SINGLE_TOKEN_TEAMS = {
@@ -28,11 +41,152 @@ KNOWN_SINGLE_TOKEN_TEAMS = {
 }
 
 
+def _find_email(value):
+    """
+    The leftmost email in value, or "": the local-part run before the first
+    "@" that has one and a domain with a dot followed by two letters. The
+    last such dot starts the top-level domain, which takes all the letters
+    after it.
+    """
+    at = value.find("@")
+    while at != -1:
+        head = value[:at]
+        local = len(head) - len(head.rstrip(_LOCAL_CHARS))
+        if local:
+            tail = value[at + 1:]
+            domain = tail[:len(tail) - len(tail.lstrip(_DOMAIN_CHARS))]
+            dot = domain.rfind(".")
+            while dot > 0:
+                tld = domain[dot + 1:]
+                letters = len(tld) - len(tld.lstrip(_LETTERS))
+                if letters >= 2:
+                    return value[at - local:at + dot + letters + 2]
+                dot = domain.rfind(".", 0, dot)
+        at = value.find("@", at + 1)
+    return ""
+
+
+def _cut_tags(value, opening, closing):
+    """
+    (first tag, value without tags) for tags written opening, at least one
+    character, then the next closing character; (None, value) without one.
+    """
+    first = None
+    kept = []
+    start = search = 0
+    while True:
+        i = value.find(opening, search)
+        if i == -1:
+            break
+        j = value.find(closing, i + 1)
+        if j == -1:
+            break
+        if j == i + 1:
+            search = i + 1
+            continue
+        if first is None:
+            first = value[i + 1:j]
+        kept.append(value[start:i])
+        start = search = j + 1
+    if first is None:
+        return None, value
+    kept.append(value[start:])
+    return first, "".join(kept)
+
+
+def _cut_brackets(value):
+    return _cut_tags(value, "[", "]")
+
+
+def _cut_parens(value):
+    return _cut_tags(value, "(", ")")
+
+
+def _cut_team_prefix(value):
+    """
+    (first team, value without prefixes) for "Team: X" prefixes: "team" in
+    any case, a colon, and the rest of the line from its first non-space
+    character; (None, value) without one. value must be trimmed.
+    """
+    folded = value.translate(_TEAM_FOLD)
+    first = None
+    kept = []
+    start = 0
+    i = folded.find("team")
+    while i != -1:
+        after = value[i + 4:].lstrip()
+        # value is trimmed, so anything after the colon ends in a non-space
+        if len(after) > 1 and after[0] == ":":
+            begin = len(value) - len(after[1:].lstrip())
+            end = value.find("\n", begin)
+            if end == -1:
+                end = len(value)
+            if first is None:
+                first = value[begin:end]
+            kept.append(value[start:i])
+            start = end
+            i = folded.find("team", end)
+        else:
+            i = folded.find("team", i + 1)
+    if first is None:
+        return None, value
+    kept.append(value[start:])
+    return first, "".join(kept)
+
+
+# Team tag shapes, tried in order until one gives a non-blank team: a
+# character every tag of the shape has, the cut, and its step
+_TEAM_CUTS = (
+    ("[", _cut_brackets, OWNER_TEAM_BRACKETS),
+    ("(", _cut_parens, OWNER_TEAM_PARENS),
+    (":", _cut_team_prefix, OWNER_TEAM_PREFIX),
+)
+
+
+def _lex_owner(value):
+    """
+    Email and team extraction from a trimmed owner. Returns (value,
+    owner_email, owner_team, team_tag_extracted, steps), value being what
+    is left once the email and tags are removed, with "<", ">" dropped and
+    whitespace collapsed.
+
+    The email is removed wherever it occurs. Bracket tags are removed, then
+    parenthesis tags and "Team:" prefixes while no tag has given a
+    non-blank team; the first tag of a shape is the team. This is the
+    original chain of regex passes, which benchmarks/bench_owner.py keeps
+    as the reference.
+    """
+    steps = []
+    owner_email = _find_email(value)
+    if owner_email:
+        steps.append((OWNER_EMAIL_EXTRACTED, owner_email))
+        value = value.replace(owner_email, "").strip()
+
+    owner_team = ""
+    team_tag_extracted = False
+    for mark, cut, step in _TEAM_CUTS:
+        if owner_team:
+            break
+        if mark not in value:
+            continue
+        tag, value = cut(value)
+        if tag is not None:
+            owner_team = tag.strip()
+            team_tag_extracted = True
+            steps.append((step, owner_team))
+            value = value.strip()
+
+    value = " ".join(value.replace("<", "").replace(">", "").split())
+    return value, owner_email, owner_team, team_tag_extracted, steps
+
+
 def deterministic_owner_parse(owner_raw, notes, steps):
     """
     Parse owner field deterministically.
     Returns (owner, owner_email, owner_team, confident).
 
+    The email and team tag are extracted by _lex_owner.
+
     Confidence logic:
     1. Email found → confident
     2. Explicit team tag (brackets, parens, or "Team: X") → confident
@@ -44,49 +198,11 @@ def deterministic_owner_parse(owner_raw, notes, steps):
         return ("", "", "", False)
 
     value = str(owner_raw).strip()
-    steps.append("owner: trimmed")
+    steps.append(OWNER_TRIMMED)
 
+    value, owner_email, owner_team, team_tag_extracted, extraction_steps = _lex_owner(value)
+    steps.extend(extraction_steps)
     owner = ""
-    owner_email = ""
-    owner_team = ""
-    team_tag_extracted = False
-
-    # Extract email
-    email_match = _EMAIL_PATTERN.search(value)
-    if email_match:
-        owner_email = email_match.group(0)
-        steps.append(f"owner_email: extracted {owner_email}")
-        value = value.replace(owner_email, "").strip()
-
-    # Extract team from brackets [Team]
-    team_match = _TEAM_BRACKET_PATTERN.search(value)
-    if team_match:
-        owner_team = team_match.group(1).strip()
-        team_tag_extracted = True
-        steps.append(f"owner_team: extracted from brackets [{owner_team}]")
-        value = _TEAM_BRACKET_PATTERN.sub("", value).strip()
-
-    # Extract team from parentheses (Team)
-    if not owner_team:
-        team_match = _TEAM_PAREN_PATTERN.search(value)
-        if team_match:
-            owner_team = team_match.group(1).strip()
-            team_tag_extracted = True
-            steps.append(f"owner_team: extracted from parentheses ({owner_team})")
-            value = _TEAM_PAREN_PATTERN.sub("", value).strip()
-
-    # Extract team from prefix "Team: X"
-    if not owner_team:
-        team_match = _TEAM_PREFIX_PATTERN.search(value)
-        if team_match:
-            owner_team = team_match.group(1).strip()
-            team_tag_extracted = True
-            steps.append(f"owner_team: extracted from prefix Team: {owner_team}")
-            value = _TEAM_PREFIX_PATTERN.sub("", value).strip()
-
-    # Clean up delimiters from remaining value
-    value = re.sub(r"[<>]", "", value).strip()
-    value = re.sub(r"\s+", " ", value).strip()
 
     # Confidence check
     confident = False
@@ -94,37 +210,37 @@ def deterministic_owner_parse(owner_raw, notes, steps):
     # Case 1: Email found → confident
     if owner_email:
         confident = True
-        steps.append("owner: confident because email found")
+        steps.append(OWNER_EMAIL_FOUND)
         # Derive owner name from remaining value or email
         if value:
             owner = value.title()
-            steps.append(f"owner: extracted name {owner}")
+            steps.append((OWNER_NAME_EXTRACTED, owner))
         else:
             local_part = owner_email.split("@")[0]
-            derived = re.sub(r"[._]", " ", local_part).title()
+            derived = local_part.replace(".", " ").replace("_", " ").title()
             owner = derived
-            steps.append(f"owner: derived from email as {owner}")
+            steps.append((OWNER_NAME_FROM_EMAIL, owner))
         return (owner, owner_email, owner_team, confident)
 
     # Case 2: Explicit team tag extracted → confident
     if team_tag_extracted:
         confident = True
-        steps.append("owner: confident because explicit team tag extracted")
+        steps.append(OWNER_TEAM_TAG)
         if value:
             owner = value.title()
-            steps.append(f"owner: extracted name {owner}")
+            steps.append((OWNER_NAME_EXTRACTED, owner))
         return (owner, owner_email, owner_team, confident)
 
     # Case 3: Multi-word string that looks like a human name → confident
     # Must have at least 2 tokens and match typical name pattern (letters only, each capitalized)
     tokens = value.split()
     if len(tokens) >= 2:
-        # Check if it looks like a human name (each token is alphabetic)
-        looks_like_name = all(re.match(r"^[A-Za-z]+$", t) for t in tokens)
+        # Check if it looks like a human name (each token is ASCII letters only)
+        looks_like_name = all(t.isascii() and t.isalpha() for t in tokens)
         if looks_like_name:
             owner = value.title()
             confident = True
-            steps.append(f"owner: confident multi-word name '{owner}'")
+            steps.append((OWNER_MULTI_WORD_NAME, owner))
             return (owner, owner_email, owner_team, confident)
 
     # Case 4: Single token matching Infoblox whitelist → treat as team, not person
@@ -132,41 +248,59 @@ def deterministic_owner_parse(owner_raw, notes, steps):
         owner = "unknown"
         owner_team = tokens[0].title()  # Capitalize first letter
         confident = True
-        steps.append(f"owner: single-token whitelist match, team='{owner_team}'")
+        steps.append((OWNER_WHITELIST_TEAM, owner_team))
         return (owner, owner_email, owner_team, confident)
 
     # Case 5: Otherwise → ambiguous → LLM fallback
     confident = False
     if value:
-        steps.append(f"owner: ambiguous '{value}', fallback to LLM")
+        steps.append((OWNER_AMBIGUOUS, value))
     else:
-        steps.append("owner: empty after parsing, fallback to LLM")
+        steps.append(OWNER_EMPTY)
 
     return (owner, owner_email, owner_team, confident)
 
 
-def validate_owner_field(row, anomalies, normalization_steps):
+def validate_owner_field(row, anomalies, normalization_steps, fallback=None, directory=None):
     """
-    Validate and normalize owner field.
-    Returns dict with owner, owner_email, owner_team.
+    Validate and normalize the owner field of a row_record.RawRow.
+    Returns a list [owner, owner_email, owner_team].
+    With a directory (an owner_directory.OwnerDirectory), owners the rules
+    are not confident about are looked up there before any LLM fallback.
+    If fallback (an llm_fallback.FallbackResolver) is given, ambiguous owners
+    are deferred to it and the list is filled in when it resolves.
     """
-    owner_raw = row.get("owner", "")
-    notes = row.get("notes", "")
-    row_id = row.get("source_row_id", "unknown")
+    owner_raw = row.owner
+    notes = row.notes
+    row_id = row.source_row_id
 
     steps = []
-    owner, owner_email, owner_team, confident = deterministic_owner_parse(owner_raw, notes, steps)
+    owner, owner_email, owner_team, confident = _CACHE.parse(deterministic_owner_parse, owner_raw, notes, steps)
 
     if confident:
         normalization_steps.extend(steps)
-        return {
-            "owner": owner,
-            "owner_email": owner_email,
-            "owner_team": owner_team,
-        }
-
-    # LLM fallback
-    row_json = json.dumps({k: v for k, v in row.items() if k in ("owner", "hostname", "device_type", "site", "source_row_id")}, indent=2)
+        return [owner, owner_email, owner_team]
+
+    # Directory lookup; its match replaces the ambiguous/empty step
+    if directory is not None and steps:
+        match = directory.resolve(owner_raw)
+        if match is not None:
+            kind, (owner, owner_email, owner_team) = match
+            steps[-1] = (OWNER_DIRECTORY_MATCH, kind, owner if owner != "unknown" else owner_team)
+            normalization_steps.extend(steps)
+            return [owner, owner_email, owner_team]
+
+    # Deferred LLM fallback, resolved in batches by the caller
+    if fallback is not None:
+        normalization_steps.extend(steps)
+        placeholder = get_llm_placeholder("owner")
+        result = [placeholder["owner"], placeholder["owner_email"], placeholder["owner_team"]]
+        fallback.defer("owner", owner_raw, row_id, result, normalization_steps)
+        return result
+
+    # Inline LLM fallback
+    # source_row_id is left out so repeated prompts collapse in the prompt log
+    row_json = json.dumps({k: v for k, v in row.items() if k in ("owner", "hostname", "device_type", "site")}, indent=2)
     prompt = OWNER_PROMPT_TEMPLATE.format(row_json=row_json, notes=notes)
     rationale = (
         f"Deterministic rules failed because owner_raw='{owner_raw}' "
@@ -181,11 +315,7 @@ def validate_owner_field(row, anomalies, normalization_steps):
     append_prompt_to_md("Owner", row_id, prompt, rationale, expected_schema)
 
     normalization_steps.extend(steps)
-    normalization_steps.append("owner: llm_generated_placeholder")
+    normalization_steps.append(llm_step("owner", "llm_generated_placeholder"))
 
     placeholder = get_llm_placeholder("owner")
-    return {
-        "owner": placeholder["owner"],
-        "owner_email": placeholder["owner_email"],
-        "owner_team": placeholder["owner_team"],
-    }
+    return [placeholder["owner"], placeholder["owner_email"], placeholder["owner_team"]]
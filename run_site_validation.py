@@ -9,49 +9,211 @@ import json
 
 from prompt_templates import SITE_PROMPT_TEMPLATE
 from llm_utils import append_prompt_to_md, get_llm_placeholder
+from field_cache import register_field_cache
+from step_codes import (
+    SITE_DELIMITERS, SITE_NORMALIZED, SITE_REGISTRY_MATCH, SITE_TRIMMED, SITE_UPPERCASED,
+    llm_step,
+)
 
-# Abbreviation mappings (applied in order)
-_ABBREVIATIONS = [
-    (r"\bheadquarters\b", "HQ"),
-    (r"\bhead\s*quarters\b", "HQ"),
-    (r"\bmain\s*office\b", "HQ"),
-    (r"\bhq\b", "HQ"),
-    (r"\bbuilding\b", "BLDG"),
-    (r"\bbldg\b", "BLDG"),
-    (r"\bblg\b", "BLDG"),
-    (r"\bdata\s*center\b", "DC"),
-    (r"\bdatacenter\b", "DC"),
-    (r"\bdc\b", "DC"),
-    (r"\blab\b", "LAB"),
-    (r"\blaboratory\b", "LAB"),
-    (r"\boffice\b", "OFFICE"),
-    (r"\bremote\b", "REMOTE"),
-    (r"\bwarehouse\b", "WAREHOUSE"),
-    (r"\bwh\b", "WAREHOUSE"),
-]
+# Memoized parse results, keyed on the raw site value
+_CACHE = register_field_cache("site")
 
-# City code mappings
+# City code mappings (applied first, in order)
+# Phrases match whole words, case-insensitively. A space inside a phrase is
+# optional, mirroring the original r"\bsan\s*francisco\b" patterns: by the time
+# these tables run, whitespace has become a hyphen, so only the run-together
+# spelling (SANFRANCISCO) can match. Hyphenated phrases match token sequences.
 _CITY_CODES = [
-    (r"\bsan\s*francisco\b", "SFO"),
-    (r"\bsf\b", "SFO"),
-    (r"\bnew\s*york\b", "NYC"),
-    (r"\bny\b", "NYC"),
-    (r"\blos\s*angeles\b", "LAX"),
-    (r"\bla\b", "LAX"),
-    (r"\bchicago\b", "CHI"),
-    (r"\bseattle\b", "SEA"),
-    (r"\bboston\b", "BOS"),
-    (r"\bdenver\b", "DEN"),
-    (r"\baustin\b", "AUS"),
-    (r"\batlanta\b", "ATL"),
-    (r"\blondon\b", "LON"),
-    (r"\btokyo\b", "TYO"),
+    ("san francisco", "SFO"),
+    ("sf", "SFO"),
+    ("new york", "NYC"),
+    ("ny", "NYC"),
+    ("los angeles", "LAX"),
+    ("la", "LAX"),
+    ("chicago", "CHI"),
+    ("seattle", "SEA"),
+    ("boston", "BOS"),
+    ("denver", "DEN"),
+    ("austin", "AUS"),
+    ("atlanta", "ATL"),
+    ("london", "LON"),
+    ("tokyo", "TYO"),
+]
+
+# Abbreviation mappings (applied after city codes, in order)
+_ABBREVIATIONS = [
+    ("headquarters", "HQ"),
+    ("head quarters", "HQ"),
+    ("main office", "HQ"),
+    ("hq", "HQ"),
+    ("building", "BLDG"),
+    ("bldg", "BLDG"),
+    ("blg", "BLDG"),
+    ("data center", "DC"),
+    ("datacenter", "DC"),
+    ("dc", "DC"),
+    ("lab", "LAB"),
+    ("laboratory", "LAB"),
+    ("office", "OFFICE"),
+    ("remote", "REMOTE"),
+    ("warehouse", "WAREHOUSE"),
+    ("wh", "WAREHOUSE"),
 ]
 
 # Pattern for structured site codes (confident)
 _STRUCTURED_PATTERN = re.compile(
     r"^[A-Z]{2,4}(-[A-Z0-9]+)*$"  # e.g., HQ, HQ-BLDG-1, DC-1, SFO-DC
 )
+_SIMPLE_CODE_PATTERN = re.compile(r"[A-Z0-9]{2,10}")
+
+# Uppercased values that mean no site at all
+BLANK_SITE_VALUES = frozenset(("N/A", "NA", "NONE", "UNKNOWN", "-"))
+
+# Spaces, underscores, dots and hyphens collapse to a single hyphen
+_DELIMITER_PATTERN = re.compile(r"[\s_.\-]+")
+_HYPHEN_RUN_PATTERN = re.compile(r"-+")
+# Words split on the same boundaries as \b in the phrase tables
+_WORD_SPLIT_PATTERN = re.compile(r"(\w+)")
+
+
+class SiteTokenRewriter:
+    """
+    Single-pass phrase rewriter for delimiter-normalized site values.
+
+    Phrase tables are compiled into a token trie keyed on lowercased words.
+    Tables are applied in order, and a later entry sees the output of earlier
+    ones (e.g. "sf" -> "SFO" could be rewritten again by an "sfo" entry), so
+    single-word chains are resolved once at build time. Lookup cost depends on
+    the number of words in the value, not the size of the tables.
+    """
+
+    def __init__(self, *tables):
+        self._rules = []
+        self._root = {}
+        self._multi_word = False
+        self._non_ascii_matcher = None
+        self._non_ascii_words = {}
+        for table in tables:
+            for phrase, code in table:
+                self._rules.append((self._phrase_key(phrase), code))
+        self._build()
+
+    @staticmethod
+    def _phrase_key(phrase):
+        return tuple("".join(word.split()) for word in phrase.lower().split("-"))
+
+    def add(self, phrase, code):
+        """Append a phrase to the last table and rebuild the trie."""
+        self._rules.append((self._phrase_key(phrase), code))
+        self._build()
+
+    def _build(self):
+        # Rule positions per single word, so each chain is a few dict lookups
+        positions = {}
+        for pos, (key, _) in enumerate(self._rules):
+            if len(key) == 1:
+                positions.setdefault(key[0], []).append(pos)
+
+        root = {}
+        for word in positions:
+            out, pos = word, -1
+            while True:
+                later = [p for p in positions.get(out.lower(), ()) if p > pos]
+                if not later:
+                    break
+                pos = later[0]
+                out = self._rules[pos][1]
+            root[word] = [out, None]
+        for key, code in self._rules:
+            if len(key) == 1:
+                continue
+            node = root.setdefault(key[0], [None, None])
+            for word in key[1:]:
+                if node[1] is None:
+                    node[1] = {}
+                node = node[1].setdefault(word, [None, None])
+            if node[0] is None:
+                node[0] = code
+        self._root = root
+        self._multi_word = any(len(key) > 1 for key, _ in self._rules)
+        self._non_ascii_matcher = None
+
+    def _key(self, word):
+        if word.isascii():
+            return word.lower()
+        # Case-insensitive regex matching also folds a few non-ASCII letters
+        # (e.g. KELVIN SIGN, DOTTED CAPITAL I) onto ASCII ones; keep that.
+        if self._non_ascii_matcher is None:
+            words = list(self._root)
+            self._non_ascii_matcher = re.compile(
+                "|".join(f"(?P<w{i}>{re.escape(w)})" for i, w in enumerate(words)) or "(?!)",
+                re.IGNORECASE,
+            )
+            self._non_ascii_words = {f"w{i}": w for i, w in enumerate(words)}
+        match = self._non_ascii_matcher.fullmatch(word)
+        return self._non_ascii_words[match.lastgroup] if match else word
+
+    def rewrite(self, value):
+        # parts alternates separator, word, separator, ..., separator
+        parts = _WORD_SPLIT_PATTERN.split(value)
+        root = self._root
+        if not self._multi_word:
+            for i in range(1, len(parts), 2):
+                node = root.get(self._key(parts[i]))
+                if node is not None and node[0] is not None:
+                    parts[i] = node[0]
+            return "".join(parts)
+
+        out = [parts[0]]
+        i = 1
+        while i < len(parts):
+            node = root.get(self._key(parts[i]))
+            match_out, match_end = None, i
+            j = i
+            while node is not None:
+                if node[0] is not None:
+                    match_out, match_end = node[0], j
+                if node[1] is None or j + 2 >= len(parts) or parts[j + 1] != "-":
+                    break
+                j += 2
+                node = node[1].get(self._key(parts[j]))
+            if match_out is None:
+                out.append(parts[i])
+            else:
+                out.append(match_out)
+            out.append(parts[match_end + 1])
+            i = match_end + 2
+        return "".join(out)
+
+
+_SITE_REWRITER = SiteTokenRewriter(_CITY_CODES, _ABBREVIATIONS)
+
+
+def rule_words():
+    """
+    Uppercase words the city code and abbreviation tables know, multi-word
+    phrases also run together (SANFRANCISCO), and the codes they produce.
+    """
+    words = set()
+    for phrase, code in _CITY_CODES + _ABBREVIATIONS:
+        parts = phrase.upper().replace("-", " ").split()
+        words.update(parts)
+        words.add("".join(parts))
+        words.add(code)
+    return words
+
+
+def normalize_site_key(value):
+    """
+    The city code and abbreviation rewrite of an uppercased value whose
+    delimiters are already single hyphens; deterministic_site_parse's
+    site_normalized once those steps are done.
+    """
+    # Apply city code and abbreviation mappings in one pass
+    value = _SITE_REWRITER.rewrite(value)
+
+    # Clean up again after substitutions
+    return _HYPHEN_RUN_PATTERN.sub("-", value).strip("-")
 
 
 def deterministic_site_parse(site_raw, notes, steps):
@@ -63,68 +225,76 @@ def deterministic_site_parse(site_raw, notes, steps):
         return ("", "", False)
 
     value = str(site_raw).strip()
-    steps.append("site: trimmed")
+    steps.append(SITE_TRIMMED)
 
     # Blank or N/A
-    if value == "" or value.upper() in ("N/A", "NA", "NONE", "UNKNOWN", "-"):
+    if value == "" or value.upper() in BLANK_SITE_VALUES:
         return (value, "", False)
 
     site_original = value
 
     # Uppercase
     value = value.upper()
-    steps.append("site: uppercased")
+    steps.append(SITE_UPPERCASED)
 
     # Normalize delimiters: spaces, underscores, dots → single hyphen
-    value = re.sub(r"[\s_\.]+", "-", value)
-    value = re.sub(r"-+", "-", value)  # collapse multiple hyphens
-    value = value.strip("-")
-    steps.append("site: delimiters_normalized")
-
-    # Apply city code mappings first
-    for pattern, code in _CITY_CODES:
-        value = re.sub(pattern, code, value, flags=re.IGNORECASE)
+    value = _DELIMITER_PATTERN.sub("-", value).strip("-")
+    steps.append(SITE_DELIMITERS)
 
-    # Apply abbreviation mappings
-    for pattern, abbrev in _ABBREVIATIONS:
-        value = re.sub(pattern, abbrev, value, flags=re.IGNORECASE)
-
-    # Clean up again after substitutions
-    value = re.sub(r"-+", "-", value)
-    value = value.strip("-")
+    value = normalize_site_key(value)
 
     # Check if it looks structured
     confident = bool(_STRUCTURED_PATTERN.match(value))
 
     # Also mark as confident if it's a simple alphanumeric code (2-10 chars)
-    if not confident and re.fullmatch(r"[A-Z0-9]{2,10}", value):
+    if not confident and _SIMPLE_CODE_PATTERN.fullmatch(value):
         confident = True
 
     return (site_original, value, confident)
 
 
-def validate_site_field(row, anomalies, normalization_steps):
+def validate_site_field(row, anomalies, normalization_steps, fallback=None, registry=None):
     """
-    Validate and normalize site field.
-    Returns dict with site, site_normalized.
+    Validate and normalize the site field of a row_record.RawRow.
+    Returns a list [site, site_normalized].
+    With a registry (a site_registry.SiteRegistry), sites the rules do not
+    normalize to a registered code are matched against it, misspellings
+    included, before the rules' result or any LLM fallback is used.
+    If fallback (an llm_fallback.FallbackResolver) is given, unrecognized sites
+    are deferred to it and the list is filled in when it resolves.
     """
-    site_raw = row.get("site", "")
-    notes = row.get("notes", "")
-    row_id = row.get("source_row_id", "unknown")
+    site_raw = row.site
+    notes = row.notes
+    row_id = row.source_row_id
 
     steps = []
-    site_original, site_normalized, confident = deterministic_site_parse(site_raw, notes, steps)
+    site_original, site_normalized, confident = _CACHE.parse(deterministic_site_parse, site_raw, notes, steps)
+
+    # Registry lookup, outside the cache as its answer depends on the registry
+    if registry is not None and site_normalized:
+        match = registry.resolve(site_original, site_normalized)
+        if match is not None:
+            code, distance, confidence = match
+            normalization_steps.extend(steps)
+            normalization_steps.append((SITE_REGISTRY_MATCH, code, distance, f"{confidence:.2f}"))
+            return [site_original, code]
 
     if confident:
         normalization_steps.extend(steps)
-        steps.append(f"site: normalized to {site_normalized}")
-        return {
-            "site": site_original,
-            "site_normalized": site_normalized,
-        }
-
-    # LLM fallback
-    row_json = json.dumps({k: v for k, v in row.items() if k in ("site", "hostname", "owner", "device_type", "source_row_id")}, indent=2)
+        steps.append((SITE_NORMALIZED, site_normalized))
+        return [site_original, site_normalized]
+
+    # Deferred LLM fallback, resolved in batches by the caller
+    if fallback is not None:
+        normalization_steps.extend(steps)
+        placeholder = get_llm_placeholder("site")
+        result = [site_original, placeholder["site_normalized"]]
+        fallback.defer("site", site_raw, row_id, result, normalization_steps)
+        return result
+
+    # Inline LLM fallback
+    # source_row_id is left out so repeated prompts collapse in the prompt log
+    row_json = json.dumps({k: v for k, v in row.items() if k in ("site", "hostname", "owner", "device_type")}, indent=2)
     prompt = SITE_PROMPT_TEMPLATE.format(row_json=row_json, notes=notes)
     rationale = (
         f"Site '{site_raw}' did not match known location patterns "
@@ -138,10 +308,7 @@ def validate_site_field(row, anomalies, normalization_steps):
     append_prompt_to_md("Site", row_id, prompt, rationale, expected_schema)
 
     normalization_steps.extend(steps)
-    normalization_steps.append("site: llm_generated_placeholder")
+    normalization_steps.append(llm_step("site", "llm_generated_placeholder"))
 
     placeholder = get_llm_placeholder("site")
-    return {
-        "site": site_original,
-        "site_normalized": placeholder["site_normalized"],
-    }
+    return [site_original, placeholder["site_normalized"]]
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Long-lived validation service.
+Loads the validator chain once and answers validation requests over HTTP,
+on a local TCP port or a Unix socket, so short-lived jobs skip the
+interpreter start-up, imports, network list, owner directory and site
+registry loads and cold parser caches of a run.py invocation. The field
+caches, LLM response cache and fallback backend stay warm across requests.
+
+Endpoints
+---------
+POST /rows : a JSON array of row objects (or {"rows": [...]}); answers
+    {"fieldnames": [...], "rows": [...], "anomalies": [...]}, with each
+    clean row as an object keyed by fieldnames
+POST /csv : a CSV payload with a header line; answers
+    {"csv": "<clean CSV>", "anomalies": [...]}, the CSV byte-identical to
+    what run.py writes for the same input, CRLF line terminators included
+    (send the payload unaltered, e.g. with curl --data-binary)
+GET /health : request and row counts, field cache and LLM counters
+
+A malformed request answers 400 and an unexpected failure 500, both with
+an {"error": ...} body.
+
+Cross-row checks run within each request; ?cross_row_checks=0 skips them.
+Requests are validated one at a time. Prompts of LLM requests are only
+logged with --prompt-log, never to TEMPLATES/prompts.md.
+
+Usage: python run.py --serve 127.0.0.1:8766 [run.py validator/LLM options]
+       python run.py --serve unix:/tmp/inventory-cleaner.sock
+"""
+
+import csv
+import http.client
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from field_cache import DEFAULT_CACHE_SIZE, field_cache_counters
+from llm_fallback import DEFAULT_LLM_BATCH_ROWS, DEFAULT_VALUES_PER_REQUEST, new_counters
+from llm_utils import PromptSink
+from row_record import RowLayout
+from run import validate_records
+
+UNIX_PREFIX = "unix:"
+
+
+def parse_address(text):
+    """
+    ("unix", path) for "unix:PATH", else ("tcp", (host, port)) for
+    "HOST:PORT", ":PORT" or "PORT" (host defaults to 127.0.0.1).
+    """
+    if text.startswith(UNIX_PREFIX):
+        return "unix", text[len(UNIX_PREFIX):]
+    host, _, port = text.rpartition(":")
+    if not port.isdigit():
+        raise ValueError(f"{text!r}: expected HOST:PORT or unix:PATH")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+# ----------------------------------------------------------------------
+# Validation
+# ----------------------------------------------------------------------
+
+class ValidationService:
+    """
+    The validator chain with its state kept between requests.
+
+    Takes the options of run.validate_records that apply to one in-memory
+    payload. validate_rows() and validate_csv() may be called from several
+    threads; they are serialized on one lock, as the fallback stage and the
+    parser caches are not thread-safe. Close the llm_backend and llm_cache
+    after the service is done with them.
+
+    prompt_log is a file the prompts of each request's LLM calls are
+    appended to once the request is validated; None (default) logs none.
+    """
+
+    def __init__(self, llm_backend=None, llm_batch_rows=DEFAULT_LLM_BATCH_ROWS,
+                 llm_batch_values=DEFAULT_VALUES_PER_REQUEST, llm_cache=None,
+                 cache_size=DEFAULT_CACHE_SIZE, steps_format="verbose",
+                 cross_row_checks=True, networks=None, owner_directory=None,
+                 site_registry=None, prompt_log=None):
+        self.options = {
+            "llm_backend": llm_backend, "llm_batch_rows": llm_batch_rows,
+            "llm_batch_values": llm_batch_values, "llm_cache": llm_cache,
+            "cache_size": cache_size, "steps_format": steps_format, "networks": networks,
+            "owner_directory": owner_directory, "site_registry": site_registry,
+            "prompt_sink": PromptSink(prompt_log, max_bytes=None) if prompt_log else None,
+        }
+        self.cross_row_checks = cross_row_checks
+        self.counters = {"requests": 0, "rows": 0, "errors": 0}
+        self.llm_counters = new_counters()
+        self._lock = threading.Lock()
+
+    def _validate(self, layout, records, cross_row_checks):
+        """[(clean_row, anomaly_record), ...] for a list of RawRows."""
+        if cross_row_checks is None:
+            cross_row_checks = self.cross_row_checks
+        summary = {}
+        with self._lock:
+            results = [
+                result
+                for batch in validate_records(layout, records, summary,
+                                              cross_row_checks=cross_row_checks,
+                                              **self.options)
+                for result in batch
+            ]
+            if self.options["prompt_sink"] is not None:
+                self.options["prompt_sink"].flush()
+            self.counters["requests"] += 1
+            self.counters["rows"] += summary["rows"]
+            for k, v in summary["llm"].items():
+                self.llm_counters[k] += v
+        return results
+
+    def validate_rows(self, rows, cross_row_checks=None):
+        """
+        Validate a list of dicts keyed by column name.
+        Returns (fieldnames, results), results being [(clean_row,
+        anomaly_record), ...] in input order. The columns are those of all
+        rows, in order of first appearance.
+        """
+        layout = RowLayout(dict.fromkeys(name for row in rows for name in row))
+        records = [layout.from_mapping(row) for row in rows]
+        return layout.fieldnames, self._validate(layout, records, cross_row_checks)
+
+    def validate_csv(self, text, cross_row_checks=None):
+        """(clean CSV text, anomaly records) for CSV text with a header line."""
+        reader = csv.reader(io.StringIO(text, newline=""))
+        layout = RowLayout(next(reader, []))
+        results = self._validate(layout, layout.records(reader), cross_row_checks)
+        out = io.StringIO(newline="")
+        writer = csv.writer(out)
+        writer.writerow(layout.fieldnames)
+        writer.writerows(clean_row for clean_row, _ in results)
+        return out.getvalue(), [record for _, record in results if record is not None]
+
+    def count_error(self):
+        with self._lock:
+            self.counters["errors"] += 1
+
+    def health(self):
+        return {
+            "status": "ok",
+            **self.counters,
+            "field_cache": field_cache_counters(),
+            "llm": dict(self.llm_counters),
+        }
+
+
+# ----------------------------------------------------------------------
+# HTTP server
+# ----------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/health":
+            self._reply(self.server.service.health())
+        else:
+            self._reply({"error": "not found"}, 404)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            # The body cannot be delimited, so the connection cannot be reused
+            self.close_connection = True
+            self.server.service.count_error()
+            self._reply({"error": "invalid Content-Length"}, 400)
+            return
+        body = self.rfile.read(length)
+        if url.path not in ("/rows", "/csv"):
+            self._reply({"error": "not found"}, 404)
+            return
+        flag = parse_qs(url.query).get("cross_row_checks", [None])[-1]
+        cross_row_checks = None if flag is None else flag.lower() not in ("0", "false", "no")
+        service = self.server.service
+        try:
+            if url.path == "/rows":
+                rows = json.loads(body)
+                if isinstance(rows, dict):
+                    rows = rows.get("rows")
+                if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+                    raise ValueError("expected a JSON array of row objects")
+                fieldnames, results = service.validate_rows(rows, cross_row_checks)
+                payload = {
+                    "fieldnames": fieldnames,
+                    "rows": [dict(zip(fieldnames, clean_row)) for clean_row, _ in results],
+                    "anomalies": [record for _, record in results if record is not None],
+                }
+            else:
+                text, anomalies = service.validate_csv(body.decode(), cross_row_checks)
+                payload = {"csv": text, "anomalies": anomalies}
+        except (ValueError, csv.Error) as e:
+            service.count_error()
+            self._reply({"error": str(e)}, 400)
+            return
+        except Exception as e:
+            service.count_error()
+            self._reply({"error": f"internal error: {e!r}"}, 500)
+            return
+        self._reply(payload)
+
+
+class _TCPHandler(_Handler):
+    # Headers and body are separate writes; without this, Nagle's algorithm
+    # holds the body back until the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+
+class TCPValidationServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        self.service = service
+        super().__init__(address, _TCPHandler)
+
+    @property
+    def address(self):
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+
+class UnixValidationServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        self.service = service
+        _remove_stale_socket(path)
+        super().__init__(path, _Handler)
+
+    @property
+    def address(self):
+        return UNIX_PREFIX + self.server_address
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(path):
+    """Unlink a socket file left behind by a service that is no longer listening."""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise OSError(f"{path}: another service is listening")
+
+
+def make_server(address, service):
+    """A bound, not yet serving, server for parse_address() text."""
+    kind, target = parse_address(address)
+    if kind == "unix":
+        return UnixValidationServer(target, service)
+    return TCPValidationServer(target, service)
+
+
+def serve(address, service, log=sys.stderr):
+    """Serve until interrupted (Ctrl-C or SIGTERM), then close the server."""
+    server = make_server(address, service)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Serving on {server.address}", file=log, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class ServiceClient:
+    """
+    Keep-alive client for a running service, addressed as in parse_address().
+    Methods return the decoded JSON answer and raise RuntimeError on an
+    error status.
+    """
+
+    def __init__(self, address, timeout=60.0):
+        kind, target = parse_address(address)
+        if kind == "unix":
+            self._conn = _UnixHTTPConnection(target, timeout)
+        else:
+            self._conn = http.client.HTTPConnection(*target, timeout=timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def _request(self, method, path, body=None, content_type=None):
+        headers = {"Content-Type": content_type} if content_type else {}
+        self._conn.request(method, path, body=body, headers=headers)
+        response = self._conn.getresponse()
+        payload = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path}: {response.status} {payload.get('error')}")
+        return payload
+
+    def _path(self, endpoint, cross_row_checks):
+        if cross_row_checks is None:
+            return endpoint
+        return f"{endpoint}?cross_row_checks={int(cross_row_checks)}"
+
+    def validate_rows(self, rows, cross_row_checks=None):
+        return self._request("POST", self._path("/rows", cross_row_checks),
+                             json.dumps(rows).encode(), "application/json")
+
+    def validate_csv(self, text, cross_row_checks=None):
+        return self._request("POST", self._path("/csv", cross_row_checks),
+                             text.encode(), "text/csv")
+
+    def health(self):
+        return self._request("GET", "/health")
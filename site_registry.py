@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Canonical site registry with bounded edit-distance matching.
+Resolves site values the abbreviation rules cannot parse because of a
+typo ("Headqaurters Bldg 2", "HQ Bldgg 1") to a registered site code.
+
+Spellings (each code, its name and aliases) are indexed by site key:
+uppercase, with runs of spaces, underscores, dots and hyphens collapsed to
+one hyphen, as deterministic_site_parse delimits values. They are also
+indexed by the site_normalized value the rules give them, and by the key
+without delimiters ("DC1", "SFO2"). A value that matches none of these
+exactly is corrected in two ways:
+
+1. word by word: each word missing from the vocabulary (the words of all
+   spellings and of the city code / abbreviation tables) is replaced by
+   the closest vocabulary word. The corrected value goes through the site
+   rules again and must then name a registered site exactly. This is how
+   "Headqaurters Bldg 2" becomes HEADQUARTERS-BLDG-2, then HQ-BLDG-2.
+2. whole key: the closest spelling of any registered site.
+
+Both searches use a _FuzzyIndex: keys are partitioned by the numbers they
+contain, so a typo never moves a value to another building or floor, and
+each partition has an inverted index of padded trigrams. A search within
+k edits only reads the postings of the 4k + 1 rarest trigrams of the key
+(an edit changes at most 4 of them, so any key within k edits shares one
+of those), drops candidates whose length or characters rule them out (a
+bit signature per key, compared with one AND), and computes the edit
+distance (with adjacent transpositions) of the rest, banded to k cells
+off the diagonal and giving up past k. k grows with the length of the
+key, up to MAX_DISTANCE, and a match must be the only one at its
+distance.
+
+Format
+------
+CSV : a site column with the canonical code written to site_normalized,
+    and optionally name and aliases (";"-separated) columns of other
+    spellings
+"""
+
+import csv
+import hashlib
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from run_site_validation import (
+    BLANK_SITE_VALUES, deterministic_site_parse, normalize_site_key, rule_words,
+)
+
+# Most edits a fuzzy match may need
+MAX_DISTANCE = 2
+# Key characters per allowed edit: keys under 5 characters only match exactly
+CHARS_PER_EDIT = 5
+# Results memoized per registry, keyed on the raw and rule-normalized values
+_MEMO_SIZE = 65536
+
+_DELIMITER_PATTERN = re.compile(r"[\s_.\-]+")
+# Digit runs, without leading zeros
+_NUMBER_PATTERN = re.compile(r"0*([0-9]+)")
+# Trigram padding; never part of a key
+_PAD = "\0\0"
+# Occurrences of a character told apart in bag signatures, and signature
+# width: distinct bits for every (ASCII character, occurrence)
+_BAG_REPEATS = 4
+_BAG_BITS = 512
+
+
+def site_key(text):
+    """Uppercase, hyphen-delimited form of a site spelling."""
+    return _DELIMITER_PATTERN.sub("-", str(text).strip().upper()).strip("-")
+
+
+def rules_normalized(text):
+    """The site_normalized value the deterministic rules give a spelling."""
+    return deterministic_site_parse(text, "", [])[1]
+
+
+def max_distance(key):
+    """Edits a fuzzy match of key may need."""
+    return min(MAX_DISTANCE, len(key) // CHARS_PER_EDIT)
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance between a and b (insertions,
+    deletions, substitutions and adjacent transpositions), or limit + 1
+    once it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # A common prefix and suffix never change the distance
+    shorter = min(len(a), len(b))
+    start = end = 0
+    while start < shorter and a[start] == b[start]:
+        start += 1
+    while end < shorter - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    over = limit + 1
+    # Cells more than limit off the diagonal exceed limit; only the band is computed
+    before = None
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        row = [i if i <= limit else over] + [over] * len(b)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cb = b[j - 1]
+            cost = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if row[j - 1] + 1 < cost:
+                cost = row[j - 1] + 1
+            if (i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb
+                    and before[j - 2] + 1 < cost):
+                cost = before[j - 2] + 1
+            row[j] = cost
+        # A transposition reads two rows back, but never below this row's minimum
+        if min(row) > limit:
+            return over
+        before, previous = previous, row
+    return min(previous[-1], over)
+
+
+def _numbers(key):
+    return tuple(_NUMBER_PATTERN.findall(key))
+
+
+def _trigrams(key):
+    padded = _PAD + key + _PAD
+    return set(map("".join, zip(padded, padded[1:], padded[2:])))
+
+
+def _bag_bits(char, count):
+    """The bag signature bits of count occurrences of char."""
+    bit = ord(char) * _BAG_REPEATS
+    bits = 0
+    for n in range(min(count, _BAG_REPEATS)):
+        bits |= 1 << ((bit + n) % _BAG_BITS)
+    return bits
+
+
+# (character, occurrences) → bag signature bits, filled as keys are seen
+_BAG_BITS_MEMO = {}
+
+
+def _bag(key):
+    """
+    Bit signature of the key's characters with their occurrence numbers (up
+    to _BAG_REPEATS). An edit removes at most one of them, so a key within
+    k edits lacks at most k of this signature's bits; collisions only make
+    that bound looser.
+    """
+    bag = 0
+    memo = _BAG_BITS_MEMO
+    for char in set(key):
+        count = key.count(char)
+        bits = memo.get((char, count))
+        if bits is None:
+            bits = memo[char, count] = _bag_bits(char, count)
+        bag |= bits
+    return bag
+
+
+class _FuzzyIndex:
+    """
+    Keys partitioned by their numbers, with trigram postings per partition.
+    Loading only files keys under their partition; a partition's postings
+    and bag signatures are built the first time a search reads it.
+    """
+
+    def __init__(self):
+        # numbers → ([keys], [bag signatures], {trigram: [key positions]})
+        self._partitions = {}
+        # numbers → keys not indexed yet
+        self._pending = defaultdict(list)
+        self._keys = set()
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def update(self, new_keys):
+        new_keys = set(new_keys) - self._keys
+        self._keys.update(new_keys)
+        pending = self._pending
+        for key in new_keys:
+            pending[_numbers(key)].append(key)
+
+    def _partition(self, numbers):
+        partition = self._partitions.get(numbers)
+        new_keys = self._pending.pop(numbers, None)
+        if new_keys is None:
+            return partition
+        if partition is None:
+            partition = self._partitions[numbers] = ([], [], defaultdict(list))
+        keys, bags, postings = partition
+        for key in sorted(new_keys):
+            position = len(keys)
+            for gram in _trigrams(key):
+                postings[gram].append(position)
+            bags.append(_bag(key))
+            keys.append(key)
+        return partition
+
+    def closest(self, key, limit):
+        """(distance, [keys]) of the keys closest to key within limit edits, or None."""
+        if limit <= 0:
+            return None
+        partition = self._partition(_numbers(key))
+        if partition is None:
+            return None
+        keys, bags, postings = partition
+        grams = _trigrams(key)
+        if len(grams) <= 4 * limit:
+            candidates = range(len(keys))
+        else:
+            rare = sorted(grams, key=lambda gram: len(postings.get(gram, ())))
+            candidates = set()
+            for gram in rare[:4 * limit + 1]:
+                candidates.update(postings.get(gram, ()))
+        length, bag = len(key), _bag(key)
+        # Bits of bag a candidate may lack
+        floor = bag.bit_count() - limit
+        best, found = limit + 1, []
+        for i in candidates:
+            candidate = keys[i]
+            if abs(len(candidate) - length) > limit or (bag & bags[i]).bit_count() < floor:
+                continue
+            distance = edit_distance(key, candidate, min(limit, best))
+            if distance < best:
+                best, found = distance, [candidate]
+            elif distance == best:
+                found.append(candidate)
+        if best > limit:
+            return None
+        return best, found
+
+
+class SiteRegistry:
+    """
+    Registered sites, looked up by exact or fuzzy site key.
+
+    add() registers a canonical code with other spellings, update() a list
+    of (code, spellings) pairs at once. resolve() returns (code, distance,
+    confidence) for a site value, confidence being 1 - distance / key
+    length, or None when the rules already give a registered code, nothing
+    is within max_distance() edits, or the closest spellings belong to
+    different sites.
+    """
+
+    def __init__(self):
+        self.codes = set()
+        # site key or rules-normalized spelling → code, None if shared by two sites
+        self._spellings = {}
+        # Site key without delimiters → code, None if shared by two sites
+        self._compact = {}
+        self._spelling_index = _FuzzyIndex()
+        self._word_index = _FuzzyIndex()
+        self._word_index.update(rule_words())
+        self._memo = {}
+        # Digest of the loaded registry, part of the incremental manifest fingerprint
+        self.fingerprint = ""
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_memo"] = {}
+        return state
+
+    def add(self, code, spellings=()):
+        self.update([(code, spellings)])
+
+    def update(self, sites):
+        """Register (code, spellings) pairs; indexes each new key once."""
+        keys, words = set(), set()
+        spellings, compact = self._spellings, self._compact
+        for code, other_spellings in sites:
+            code = code.strip()
+            if not code:
+                continue
+            self.codes.add(code)
+            for spelling in (code, *other_spellings):
+                key = site_key(spelling)
+                if not key:
+                    continue
+                keys.add(key)
+                words.update(key.split("-"))
+                # rules_normalized(spelling), without redoing the site_key steps
+                forms = [key]
+                if spelling.strip().upper() not in BLANK_SITE_VALUES:
+                    normalized = normalize_site_key(key)
+                    if normalized and normalized != key:
+                        forms.append(normalized)
+                for spelled in forms:
+                    known = spellings.setdefault(spelled, code)
+                    if known != code:
+                        spellings[spelled] = None
+                known = compact.setdefault(key.replace("-", ""), code)
+                if known != code:
+                    compact[key.replace("-", "")] = None
+        self._spelling_index.update(keys)
+        self._word_index.update(words)
+        self._memo.clear()
+
+    def _correct_words(self, key):
+        """(code, distance) after correcting the key's unknown words, or None."""
+        budget = max_distance(key)
+        words = key.split("-")
+        distance = 0
+        for i, word in enumerate(words):
+            if word in self._word_index:
+                continue
+            match = self._word_index.closest(word, min(budget - distance, max_distance(word)))
+            if match is None or len(match[1]) != 1:
+                return None
+            distance += match[0]
+            words[i] = match[1][0]
+        if distance == 0:
+            return None
+        code = self._spellings.get(rules_normalized("-".join(words)))
+        return None if code is None else (code, distance)
+
+    def _closest_spelling(self, key):
+        """(code, distance) of the single site closest to key, or None."""
+        match = self._spelling_index.closest(key, max_distance(key))
+        if match is None:
+            return None
+        distance, keys = match
+        codes = {self._spellings[k] for k in keys}
+        if len(codes) != 1 or None in codes:
+            return None
+        return codes.pop(), distance
+
+    def _lookup(self, value, normalized):
+        if normalized in self.codes:
+            return None
+        key = site_key(value)
+        code = (self._spellings.get(key) or self._spellings.get(normalized)
+                or self._compact.get(key.replace("-", "")))
+        if code is not None:
+            return code, 0, 1.0
+        if not key:
+            return None
+        match = self._correct_words(key) or self._closest_spelling(key)
+        if match is None:
+            return None
+        code, distance = match
+        return code, distance, 1 - distance / len(key)
+
+    def resolve(self, value, normalized=""):
+        """
+        Registered site for a raw value, given the site_normalized value
+        the rules produced for it.
+        """
+        memo = self._memo
+        key = (value, normalized)
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+        result = self._lookup(value, normalized)
+        if len(memo) >= _MEMO_SIZE:
+            memo.clear()
+        memo[key] = result
+        return result
+
+
+def load_site_registry(path):
+    """
+    Load a site registry CSV into a SiteRegistry. Raises ValueError if the
+    header has no site column.
+    """
+    path = Path(path)
+    sites = []
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        fields = {name.strip().lower(): name for name in reader.fieldnames or ()}
+        if "site" not in fields:
+            raise ValueError(f"{path}: no site column")
+        name_field, aliases_field = fields.get("name"), fields.get("aliases")
+        for row in reader:
+            spellings = []
+            if name_field and row[name_field]:
+                spellings.append(row[name_field])
+            if aliases_field and row[aliases_field]:
+                spellings += [alias for alias in row[aliases_field].split(";") if alias.strip()]
+            sites.append((row[fields["site"]] or "", spellings))
+    registry = SiteRegistry()
+    registry.update(sites)
+    registry.fingerprint = hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+    return registry
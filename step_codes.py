@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Coded normalization steps.
+Validators record each step as a short code from STEP_TEMPLATES, or as a
+(code, arg, ...) tuple when the step carries values, instead of building
+text. The text is only produced when the output row is written:
+render_verbose() gives the historical "field: what happened" strings, and
+render_compact() writes the codes and arguments, to be read with the legend
+from write_legend().
+"""
+
+import json
+
+STEP_SEPARATOR = "|"
+
+# --- ip ---
+IP_TRIM = "I1"
+IP_PARSE = "I2"
+IP_NORMALIZE = "I3"
+IP_INVALID = "I4"
+# --- mac ---
+MAC_TRIMMED = "M1"
+MAC_NORMALIZED = "M2"
+# --- hostname ---
+HOSTNAME_TRIMMED = "H1"
+HOSTNAME_LOWERCASED = "H2"
+HOSTNAME_TRAILING_DOT = "H3"
+HOSTNAME_FIRST_LABEL = "H4"
+HOSTNAME_NORMALIZED = "H5"
+# --- fqdn ---
+FQDN_TRIMMED = "F1"
+FQDN_LOWERCASED = "F2"
+FQDN_TRAILING_DOT = "F3"
+FQDN_NORMALIZED = "F4"
+# --- owner ---
+OWNER_TRIMMED = "O1"
+OWNER_EMAIL_EXTRACTED = "O2"
+OWNER_TEAM_BRACKETS = "O3"
+OWNER_TEAM_PARENS = "O4"
+OWNER_TEAM_PREFIX = "O5"
+OWNER_EMAIL_FOUND = "O6"
+OWNER_NAME_EXTRACTED = "O7"
+OWNER_NAME_FROM_EMAIL = "O8"
+OWNER_TEAM_TAG = "O9"
+OWNER_MULTI_WORD_NAME = "O10"
+OWNER_WHITELIST_TEAM = "O11"
+OWNER_AMBIGUOUS = "O12"
+OWNER_EMPTY = "O13"
+OWNER_DIRECTORY_MATCH = "O14"
+# --- device_type ---
+DEVICE_TYPE_LOWERCASED = "D1"
+DEVICE_TYPE_MATCHED = "D2"
+# --- site ---
+SITE_TRIMMED = "S1"
+SITE_UPPERCASED = "S2"
+SITE_DELIMITERS = "S3"
+SITE_NORMALIZED = "S4"
+SITE_REGISTRY_MATCH = "S5"
+# --- LLM fallback; the argument is the field ---
+LLM_PENDING = "L1"
+LLM_PLACEHOLDER = "L2"
+LLM_RESOLVED = "L3"
+LLM_CACHED = "L4"
+LLM_ERROR_PLACEHOLDER = "L5"
+LLM_OTHER = "L9"
+
+# code → text template; "{}" slots are filled from the step's arguments
+STEP_TEMPLATES = {
+    IP_TRIM: "ip_trim",
+    IP_PARSE: "ip_parse",
+    IP_NORMALIZE: "ip_normalize",
+    IP_INVALID: "ip_invalid_{}",
+    MAC_TRIMMED: "mac: trimmed whitespace",
+    MAC_NORMALIZED: "mac: normalized to {}",
+    HOSTNAME_TRIMMED: "hostname: trimmed whitespace",
+    HOSTNAME_LOWERCASED: "hostname: lowercased",
+    HOSTNAME_TRAILING_DOT: "hostname: removed trailing dot",
+    HOSTNAME_FIRST_LABEL: "hostname: extracted first label from FQDN",
+    HOSTNAME_NORMALIZED: "hostname: normalized to {}",
+    FQDN_TRIMMED: "fqdn: trimmed whitespace",
+    FQDN_LOWERCASED: "fqdn: lowercased",
+    FQDN_TRAILING_DOT: "fqdn: removed trailing dot",
+    FQDN_NORMALIZED: "fqdn: normalized to {}",
+    OWNER_TRIMMED: "owner: trimmed",
+    OWNER_EMAIL_EXTRACTED: "owner_email: extracted {}",
+    OWNER_TEAM_BRACKETS: "owner_team: extracted from brackets [{}]",
+    OWNER_TEAM_PARENS: "owner_team: extracted from parentheses ({})",
+    OWNER_TEAM_PREFIX: "owner_team: extracted from prefix Team: {}",
+    OWNER_EMAIL_FOUND: "owner: confident because email found",
+    OWNER_NAME_EXTRACTED: "owner: extracted name {}",
+    OWNER_NAME_FROM_EMAIL: "owner: derived from email as {}",
+    OWNER_TEAM_TAG: "owner: confident because explicit team tag extracted",
+    OWNER_MULTI_WORD_NAME: "owner: confident multi-word name '{}'",
+    OWNER_WHITELIST_TEAM: "owner: single-token whitelist match, team='{}'",
+    OWNER_AMBIGUOUS: "owner: ambiguous '{}', fallback to LLM",
+    OWNER_EMPTY: "owner: empty after parsing, fallback to LLM",
+    OWNER_DIRECTORY_MATCH: "owner: directory {} match '{}'",
+    DEVICE_TYPE_LOWERCASED: "device_type: lowercased",
+    DEVICE_TYPE_MATCHED: "device_type: matched pattern '{}' → {}",
+    SITE_TRIMMED: "site: trimmed",
+    SITE_UPPERCASED: "site: uppercased",
+    SITE_DELIMITERS: "site: delimiters_normalized",
+    SITE_NORMALIZED: "site: normalized to {}",
+    SITE_REGISTRY_MATCH: "site: registry match {} at edit distance {}, confidence {}",
+    LLM_PENDING: "{}: llm_pending",
+    LLM_PLACEHOLDER: "{}: llm_generated_placeholder",
+    LLM_RESOLVED: "{}: llm_resolved",
+    LLM_CACHED: "{}: llm_cached",
+    LLM_ERROR_PLACEHOLDER: "{}: llm_error_placeholder",
+    LLM_OTHER: "{}: {}",
+}
+
+# LLM step labels (backend step_label and resolver outcomes) → code
+_LLM_LABEL_CODES = {
+    "llm_pending": LLM_PENDING,
+    "llm_generated_placeholder": LLM_PLACEHOLDER,
+    "llm_resolved": LLM_RESOLVED,
+    "llm_cached": LLM_CACHED,
+    "llm_error_placeholder": LLM_ERROR_PLACEHOLDER,
+}
+_LLM_CODES = frozenset(_LLM_LABEL_CODES.values()) | {LLM_OTHER}
+
+
+def llm_step(field, label):
+    """Step recording that `field` took the LLM path with outcome `label`."""
+    code = _LLM_LABEL_CODES.get(label)
+    if code is None:
+        return (LLM_OTHER, field, label)
+    return (code, field)
+
+
+def llm_step_field(step):
+    """The field of an LLM step, or None for any other step."""
+    if step.__class__ is tuple and step[0] in _LLM_CODES:
+        return step[1]
+    return None
+
+
+def render_step(step):
+    if step.__class__ is str:
+        return STEP_TEMPLATES[step]
+    return STEP_TEMPLATES[step[0]].format(*step[1:])
+
+
+def render_verbose(steps):
+    """Historical text form of a row's steps."""
+    return STEP_SEPARATOR.join([
+        STEP_TEMPLATES[s] if s.__class__ is str else STEP_TEMPLATES[s[0]].format(*s[1:])
+        for s in steps
+    ])
+
+
+def _escape(arg):
+    return (str(arg).replace("\\", "\\\\").replace("|", "\\|")
+            .replace(",", "\\,").replace("=", "\\="))
+
+
+def render_compact(steps):
+    """Codes with arguments: CODE or CODE=arg1,arg2; \\ | , = in arguments are escaped."""
+    return STEP_SEPARATOR.join([
+        s if s.__class__ is str else f"{s[0]}={','.join(map(_escape, s[1:]))}"
+        for s in steps
+    ])
+
+
+def parse_compact(cell):
+    """Inverse of render_compact: the list of steps encoded in a compact cell."""
+    steps, current, args, escaped = [], [], None, False
+    for ch in cell + STEP_SEPARATOR:
+        if escaped:
+            current.append(ch)
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == "=" and args is None:
+            args, code, current = [], "".join(current), []
+        elif ch == "," and args is not None:
+            args.append("".join(current))
+            current = []
+        elif ch == STEP_SEPARATOR:
+            if args is None:
+                if current:
+                    steps.append("".join(current))
+            else:
+                args.append("".join(current))
+                steps.append((code, *args))
+            current, args = [], None
+        else:
+            current.append(ch)
+    return steps
+
+
+STEP_RENDERERS = {"verbose": render_verbose, "compact": render_compact}
+
+
+def write_legend(path):
+    """Write the code → template table needed to read compact output."""
+    legend = {
+        "separator": STEP_SEPARATOR,
+        "argument_format": "CODE=arg1,arg2 with \\, \\| \\= \\\\ escaped",
+        "codes": STEP_TEMPLATES,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(legend, f, indent=2, ensure_ascii=False)
+        f.write("\n")
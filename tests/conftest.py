@@ -0,0 +1,10 @@
+"""
+Shared pytest setup: the repository modules are flat, so the root goes on
+sys.path, as the benchmarks do.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
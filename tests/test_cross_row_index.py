@@ -0,0 +1,60 @@
+"""
+Regression tests for the cross-row index: every later row repeating an IP is
+flagged duplicate_ip, whatever its source_row_id, in memory and spilled.
+"""
+
+import pytest
+
+import run
+from cross_row_index import CROSS_ROW_ANOMALY_TYPES
+
+
+def _row(ip, hostname, mac="", **extra):
+    return {"ip": ip, "hostname": hostname, "mac": mac, "owner": "", "device_type": "",
+            "site": "", "notes": "", **extra}
+
+
+def _issues(rows, spill):
+    summary = {}
+    results = list(run.validate_rows(rows, summary=summary, cross_row_spill=spill))
+    issues = [[issue for issue in (record or {}).get("issues", ())
+               if issue["type"] in CROSS_ROW_ANOMALY_TYPES]
+              for _, record in results]
+    return issues, summary["cross_row"]
+
+
+@pytest.fixture(params=["memory", "spilled"])
+def spill(request, tmp_path):
+    return str(tmp_path / "cross_row.sqlite") if request.param == "spilled" else None
+
+
+@pytest.mark.parametrize("row_ids", [["7", "7", "7"], ["", "", ""], None],
+                         ids=["shared id", "blank ids", "no id column"])
+def test_repeated_ip_is_flagged_regardless_of_row_id(spill, row_ids):
+    rows = [_row("10.0.0.1", f"host-{i}") for i in range(3)]
+    if row_ids is not None:
+        for row, row_id in zip(rows, row_ids):
+            row["source_row_id"] = row_id
+    issues, counters = _issues(rows, spill)
+    first_id = row_ids[0] if row_ids is not None else ""
+    assert issues[0] == []
+    for later in issues[1:]:
+        assert [(i["type"], i["value"], i["first_source_row_id"]) for i in later] == [
+            ("duplicate_ip", "10.0.0.1", first_id)]
+    assert counters["duplicate_ip"] == 2
+
+
+def test_conflicts_name_the_first_row(spill):
+    rows = [
+        _row("10.0.0.1", "host-a", "AA-BB-CC-DD-EE-FF", source_row_id="1"),
+        _row("10.0.0.2", "host-b", "AA-BB-CC-DD-EE-FF", source_row_id="2"),
+        _row("10.0.0.3", "host-a", source_row_id="3"),
+    ]
+    issues, counters = _issues(rows, spill)
+    assert issues[0] == []
+    assert [(i["type"], i["first_source_row_id"]) for i in issues[1]] == [
+        ("mac_hostname_conflict", "1")]
+    assert [(i["type"], i["first_ip"]) for i in issues[2]] == [
+        ("hostname_ip_conflict", "10.0.0.1")]
+    assert counters == {"duplicate_ip": 0, "mac_hostname_conflict": 1,
+                        "hostname_ip_conflict": 1}
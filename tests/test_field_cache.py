@@ -0,0 +1,90 @@
+"""
+Regression tests for the LRU memoization of the deterministic field parsers.
+"""
+
+import pytest
+
+import run
+from field_cache import FieldCache, clear_field_caches, configure_field_caches
+
+
+def _parser(calls):
+    def parse(raw, notes, steps):
+        calls.append(raw)
+        steps.extend([f"parsed {raw}", f"noted {notes}"])
+        return raw.upper(), len(raw)
+    return parse
+
+
+def test_hit_replays_result_and_steps():
+    cache = FieldCache("test")
+    calls = []
+    first, second = [], ["earlier step"]
+    assert cache.parse(_parser(calls), "ops", "", first) == ("OPS", 3)
+    assert cache.parse(_parser(calls), "ops", "other notes", second) == ("OPS", 3)
+    assert calls == ["ops"]
+    assert first == ["parsed ops", "noted "]
+    assert second == ["earlier step", "parsed ops", "noted "]
+    assert cache.counters() == {"hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FieldCache("test", maxsize=2)
+    calls = []
+    for raw in ("a", "b", "a", "c", "a", "b"):
+        cache.parse(_parser(calls), raw, "", [])
+    # "a" was used after "b", so "c" evicts "b", and "b" evicts "c"
+    assert calls == ["a", "b", "c", "b"]
+    assert cache.counters() == {"hits": 2, "misses": 4, "evictions": 2}
+
+
+@pytest.mark.parametrize("maxsize", [0, -1])
+def test_non_positive_size_disables_caching(maxsize):
+    cache = FieldCache("test", maxsize=maxsize)
+    calls = []
+    steps = []
+    for _ in range(3):
+        cache.parse(_parser(calls), "ops", "", steps)
+    assert calls == ["ops"] * 3
+    assert steps == ["parsed ops", "noted "] * 3
+    assert cache.counters() == {"hits": 0, "misses": 3, "evictions": 0}
+
+
+def test_resize_evicts_oldest_entries():
+    cache = FieldCache("test")
+    calls = []
+    for raw in ("a", "b", "c"):
+        cache.parse(_parser(calls), raw, "", [])
+    cache.resize(1)
+    cache.parse(_parser(calls), "c", "", [])
+    cache.parse(_parser(calls), "a", "", [])
+    assert calls == ["a", "b", "c", "a"]
+    assert cache.evictions == 3
+
+
+def _validate(rows, cache_size):
+    clear_field_caches()
+    summary = {}
+    results = list(run.validate_rows(rows, summary=summary, cache_size=cache_size,
+                                     cross_row_checks=False))
+    configure_field_caches(run.DEFAULT_CACHE_SIZE)
+    return results, summary["field_cache"]
+
+
+def test_cached_validation_matches_uncached():
+    rows = [
+        {"source_row_id": str(i), "ip": f"10.0.0.{i}", "hostname": f"host-{i}",
+         "owner": owner, "device_type": device_type, "site": site, "notes": ""}
+        for i, (owner, device_type, site) in enumerate([
+            ("priya (platform) priya@corp.example.com", "Server", "BLR Campus"),
+            ("Team: Platform", "switch ", "HQ-BUILDING-1"),
+            ("jane@corp.example.com", "printer", "hq"),
+        ] * 4)
+    ]
+    cached, counters = _validate(rows, run.DEFAULT_CACHE_SIZE)
+    uncached, uncached_counters = _validate(rows, 0)
+    assert cached == uncached
+    for field in ("owner", "device_type", "site"):
+        assert counters[field]["misses"] == 3
+        assert counters[field]["hits"] == 9
+        assert uncached_counters[field]["hits"] == 0
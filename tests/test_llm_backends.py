@@ -0,0 +1,102 @@
+"""
+Regression tests for the LLM backend contract: complete() is abstract, and
+HTTPBackend turns every transport or protocol failure, http.client's
+included, into LLMBackendError so the fallback stage can degrade per row.
+"""
+
+import http.client
+import json
+import socketserver
+import threading
+
+import pytest
+
+import run
+from llm_utils import HTTPBackend, LLMBackend, LLMBackendError
+
+ROWS = [
+    {"source_row_id": "1", "ip": "10.0.0.1", "hostname": "host-1", "owner": "ops",
+     "device_type": "server", "site": "HQ", "notes": ""},
+    {"source_row_id": "2", "ip": "10.0.0.2", "hostname": "host-2", "owner": "ops",
+     "device_type": "server", "site": "HQ", "notes": ""},
+]
+
+
+class _CannedHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        length = 0
+        for line in iter(self.rfile.readline, b"\r\n"):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+            if not line:
+                return
+        self.rfile.read(length)
+        self.wfile.write(self.server.response)
+
+
+@pytest.fixture
+def canned_server():
+    """Start a server answering every request with the given raw bytes; yields its URL."""
+    servers = []
+
+    def start(response):
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _CannedHandler)
+        server.daemon_threads = True
+        server.response = response
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/complete"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_backend_must_implement_complete():
+    class Incomplete(LLMBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_backend_subclass_answers_fallback_rows():
+    class Fixed(LLMBackend):
+        calls = []
+
+        def complete(self, field, prompt, count):
+            self.calls.append((field, count))
+            return json.dumps([{"owner": "Ops Team", "owner_email": None,
+                                "owner_team": "ops"}] * count)
+
+    backend = Fixed()
+    results = list(run.validate_rows(ROWS, llm_backend=backend, cross_row_checks=False))
+    # Both rows share one deduplicated owner value
+    assert backend.calls == [("owner", 1)]
+    for clean_row, _ in results:
+        assert (clean_row["owner"], clean_row["owner_team"]) == ("Ops Team", "ops")
+
+
+@pytest.mark.parametrize("response, error", [
+    (b"NOT HTTP\r\n\r\n", http.client.BadStatusLine),
+    (b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\n{\"completion\": ",
+     http.client.IncompleteRead),
+    (b"", http.client.RemoteDisconnected),
+])
+def test_http_client_errors_are_wrapped(canned_server, response, error):
+    backend = HTTPBackend(canned_server(response), timeout=5)
+    with pytest.raises(LLMBackendError) as raised:
+        backend.complete("owner", "prompt", 1)
+    assert isinstance(raised.value.__cause__, error)
+
+
+def test_malformed_response_fails_rows_not_run(canned_server):
+    backend = HTTPBackend(canned_server(b"NOT HTTP\r\n\r\n"), timeout=5)
+    summary = {}
+    results = list(run.validate_rows(ROWS, summary=summary, llm_backend=backend,
+                                     cross_row_checks=False))
+    assert summary["llm"]["errors"] == 1
+    for clean_row, _ in results:
+        assert "owner: llm_error_placeholder" in clean_row["normalization_steps"]
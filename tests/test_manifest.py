@@ -0,0 +1,56 @@
+"""
+Regression tests for incremental runs: a row whose LLM fallback request
+failed is not stored in the manifest, so the next run retries it, while a
+row whose own data merely contains the failure marker text is stored.
+"""
+
+import run
+from llm_utils import LLMBackend, LLMBackendError
+from manifest import RowManifest
+
+OWNER = "priya (platform) priya@corp.example.com"
+ROWS = [
+    {"source_row_id": "1", "ip": "10.0.0.1", "hostname": "host-1", "owner": OWNER,
+     "device_type": "server", "site": "HQ", "notes": ""},
+    # Ambiguous owner: needs the fallback, whose request fails
+    {"source_row_id": "2", "ip": "10.0.0.2", "hostname": "host-2", "owner": "ops",
+     "device_type": "server", "site": "HQ", "notes": ""},
+    # Resolved by the rules, but its notes carry the failure markers
+    {"source_row_id": "3", "ip": "10.0.0.3", "hostname": "host-3", "owner": OWNER,
+     "device_type": "server", "site": "HQ",
+     "notes": "owner: llm_error_placeholder|L5=owner"},
+]
+
+
+class _Unavailable(LLMBackend):
+    def __init__(self):
+        self.calls = 0
+
+    def complete(self, field, prompt, count):
+        self.calls += 1
+        raise LLMBackendError("backend unavailable")
+
+
+def _run(manifest, backend):
+    summary = {}
+    results = list(run.validate_rows(ROWS, summary=summary, llm_backend=backend,
+                                     manifest=manifest, cross_row_checks=False))
+    return results, summary["manifest"]
+
+
+def test_failed_fallback_rows_are_not_stored(tmp_path):
+    backend = _Unavailable()
+    manifest = RowManifest(tmp_path / "manifest.sqlite")
+    try:
+        first, counters = _run(manifest, backend)
+        assert counters == {"reused": 0, "validated": 3, "invalidated": False}
+        assert backend.calls == 1
+        assert len(manifest) == 2
+
+        second, counters = _run(manifest, backend)
+        assert counters == {"reused": 2, "validated": 1, "invalidated": False}
+        assert backend.calls == 2
+        assert second == first
+    finally:
+        manifest.close()
+